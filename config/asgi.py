@@ -0,0 +1,30 @@
+"""
+ASGI config for Work Tracker project.
+
+This module contains the ASGI application used by ASGI servers such as Uvicorn. It should expose a module-level
+variable named ``application``. Read-only tracker endpoints run their sync views on a pool of
+'ASYNC_VIEW_THREADS' threads per process under ASGI, off the event loop's thread, see 'AsyncReadASGIHandler'.
+
+"""
+import os
+import sys
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+# This allows easy placement of apps within the interior
+# work_tracker directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "work_tracker"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# Set up Django as 'get_asgi_application' does, before the handlers are imported.
+django.setup(set_prefix=False)
+
+from work_tracker.apps.api.handlers import APIASGIDispatcher, AsyncReadASGIHandler  # noqa E402
+
+application = AsyncReadASGIHandler()
+# Serve API requests using the lean API middleware stack, see 'API_LEAN_MIDDLEWARE'.
+if settings.API_LEAN_MIDDLEWARE:
+    application = APIASGIDispatcher(application)
@@ -6,6 +6,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import environ
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent.parent
 APPS_DIR = os.path.join(BASE_DIR, "work_tracker/apps")
@@ -30,12 +31,35 @@ LOCALE_PATHS = [str(BASE_DIR / "locale")]
 # ------------------------------------------------------------------------------
 DATABASES = {"default": env.db("DATABASE_URL")}
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read replicas, serving safe requests to the tracker API, see 'work_tracker.apps.routers.PrimaryReplicaRouter'.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), start=1):
+    DATABASES[f"replica_{index}"] = env.db_url_config(url)
+    DATABASE_REPLICAS.append(f"replica_{index}")
+# Shards storing the Projects, Tasks and Entries of Companies, see 'work_tracker.apps.routers.CompanyShardRouter'.
+# Users, Companies and all other data are stored on the default database, which serves as a shard as well.
+DATABASE_SHARDS = ["default"]
+for index, url in enumerate(env.list("DATABASE_SHARD_URLS", default=[]), start=1):
+    DATABASES[f"shard_{index}"] = env.db_url_config(url)
+    DATABASE_SHARDS.append(f"shard_{index}")
+DATABASE_ROUTERS = ["work_tracker.apps.routers.CompanyShardRouter", "work_tracker.apps.routers.PrimaryReplicaRouter"]
+# Users read from the primary database for this many seconds after writing to it, covering replication lag.
+DATABASE_REPLICA_PIN_SECONDS = env.int("DATABASE_REPLICA_PIN_SECONDS", default=5)
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+# Generate time-ordered UUIDv7 primary keys for Tasks and Entries, rather than random UUIDv4 keys.
+TIME_ORDERED_IDS = env.bool("TIME_ORDERED_IDS", default=True)
+
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# Deployments running several processes need a cache shared by all of them, see 'api.checks.check_shared_cache'.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
 
 # URLS
 # ------------------------------------------------------------------------------
 ROOT_URLCONF = "work_tracker.apps.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # APPS
 # ------------------------------------------------------------------------------
@@ -110,6 +134,15 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+# Minimal middleware for JWT-authenticated API requests, used when 'API_LEAN_MIDDLEWARE' is enabled. Requests matching
+# 'API_LEAN_URLS_REGEX' skip the session based middleware, whereas the admin and API docs keep the full stack.
+API_LEAN_MIDDLEWARE = env.bool("API_LEAN_MIDDLEWARE", default=False)
+API_LEAN_URLS_REGEX = r"^/api/(?!schema/|docs/)"
+API_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
 
 # STATIC
 # ------------------------------------------------------------------------------
@@ -210,22 +243,86 @@ LOGGING = {
 # -------------------------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "work_tracker.apps.api.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # JSON is encoded and decoded using orjson. Internal services may request MessagePack instead using the 'Accept'
+    # header, and send it using the 'Content-Type' header.
+    "DEFAULT_RENDERER_CLASSES": (
+        "work_tracker.apps.api.renderers.ORJSONRenderer",
+        "work_tracker.apps.api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "work_tracker.apps.api.parsers.ORJSONParser",
+        "work_tracker.apps.api.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Responses to requests carrying an 'Idempotency-Key' header are stored for this many seconds.
+IDEMPOTENCY_KEY_TIMEOUT = env.int("IDEMPOTENCY_KEY_TIMEOUT", default=60 * 60 * 24)
+
+# Cached list and detail responses of Companies and Projects expire after this many seconds, even if unchanged.
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=60 * 10)
+
+# Sync cursors stay this many seconds behind the current time, so that changes committed late are synced as well. It
+# should exceed the duration of the longest transaction writing synced objects.
+SYNC_WINDOW_SECONDS = env.int("SYNC_WINDOW_SECONDS", default=60)
+
+# Maximum number of sub-requests of a single request to the batch endpoint.
+BATCH_MAX_REQUESTS = env.int("BATCH_MAX_REQUESTS", default=20)
+
+# The dashboard's queries run concurrently on a pool of this many threads per process, each thread using its own
+# database connection. With 0, the queries run one after another on the request's connection.
+DASHBOARD_WORKERS = env.int("DASHBOARD_WORKERS", default=4)
+# Seconds the dashboard's threads keep their database connections open between dashboards, unlike 'CONN_MAX_AGE'.
+DASHBOARD_CONN_MAX_AGE = env.int("DASHBOARD_CONN_MAX_AGE", default=300)
+# Dashboards are cached per User for this many seconds, or until one of the User's Entries or Tasks changes.
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=30)
+
+# Under ASGI, the sync views of read-only endpoints run on a pool of this many threads per process, each thread using
+# its own database connection. It bounds the number of requests a process handles at once.
+ASYNC_VIEW_THREADS = env.int("ASYNC_VIEW_THREADS", default=32)
+
+# Companies, Projects and Tasks are deleted in the background on a pool of this many threads per process, see
+# 'DeletionJob'. With 0, they are deleted once the deleting request's transaction commits, within the request.
+DELETION_WORKERS = env.int("DELETION_WORKERS", default=1)
+# Number of dependent objects removed per transaction when deleting a Company, Project or Task.
+DELETION_BATCH_SIZE = env.int("DELETION_BATCH_SIZE", default=1000)
+
 # django-cors-headers
 CORS_URLS_REGEX = r"^/api/.*$"
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key", "x-company")
 
 # djangorestframework-simplejwt
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=5),
     "LEEWAY": 30,
+    "TOKEN_OBTAIN_SERIALIZER": "work_tracker.apps.api.components.users.serializers.MembershipTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "work_tracker.apps.api.components.users.serializers.MembershipTokenRefreshSerializer",
 }
+# Embed the User's staff status and Project ids in issued tokens, allowing permission checks without database access.
+# Users involved in more Projects than the maximum receive no claims, keeping token size bounded.
+JWT_MEMBERSHIP_CLAIMS = env.bool("JWT_MEMBERSHIP_CLAIMS", default=False)
+JWT_MEMBERSHIP_MAX_PROJECTS = env.int("JWT_MEMBERSHIP_MAX_PROJECTS", default=200)
+# Users authenticated by JWT are cached per process, up to the given number of Users, and in the shared cache for the
+# given number of seconds.
+JWT_USER_CACHE_SIZE = env.int("JWT_USER_CACHE_SIZE", default=1024)
+JWT_USER_CACHE_TIMEOUT = env.int("JWT_USER_CACHE_TIMEOUT", default=60 * 5)
+# Expected number of token revocations within a token's lifetime, and accepted share of tokens needing a database
+# lookup to confirm they have not been revoked.
+JWT_REVOCATION_CAPACITY = env.int("JWT_REVOCATION_CAPACITY", default=100000)
+JWT_REVOCATION_ERROR_RATE = env.float("JWT_REVOCATION_ERROR_RATE", default=0.001)
+
+# Fiscal years start on the first day of the given month. Completed Entries of fiscal years which ended at least the
+# given number of years ago are moved to the archive by the 'archive_entries' command.
+FISCAL_YEAR_START_MONTH = env.int("FISCAL_YEAR_START_MONTH", default=1)
+ENTRY_ARCHIVE_RETENTION_YEARS = env.int("ENTRY_ARCHIVE_RETENTION_YEARS", default=1)
 
 # By Default swagger ui is available only to admin user(s). You can change permission classes to change that
 # See more configuration options at https://drf-spectacular.readthedocs.io/en/latest/settings.html#settings
@@ -3,7 +3,7 @@ With these settings, tests run faster.
 """
 
 from .base import *  # noqa
-from .base import env
+from .base import DATABASES, env
 
 # GENERAL
 # ------------------------------------------------------------------------------
@@ -15,6 +15,23 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# DATABASES
+# ------------------------------------------------------------------------------
+# Replica mirroring the test database, enabled by overriding 'DATABASE_REPLICAS' in tests.
+DATABASES["replica"] = {**DATABASES["default"], "ATOMIC_REQUESTS": False, "TEST": {"MIRROR": "default"}}
+# Second shard, enabled by overriding 'DATABASE_SHARDS' in tests.
+DATABASES["shard_1"] = {**DATABASES["default"], "ATOMIC_REQUESTS": False, "TEST": {"NAME": "test_shard_1"}}
+
+# Test cases run within a transaction, whose data the dashboard's and deletion's worker threads would not see on
+# their connections.
+DASHBOARD_WORKERS = 0
+DELETION_WORKERS = 0
+
+# CACHES
+# ------------------------------------------------------------------------------
+# Tests run in a single process, so the local cache is shared by all of them.
+SILENCED_SYSTEM_CHECKS = ["api.E001"]
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
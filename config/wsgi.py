@@ -17,6 +17,7 @@ import os
 import sys
 from pathlib import Path
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 # This allows easy placement of apps within the interior
@@ -33,6 +34,11 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 # file. This includes Django's development server, if the WSGI_APPLICATION
 # setting points here.
 application = get_wsgi_application()
+# Serve API requests using the lean API middleware stack, see 'API_LEAN_MIDDLEWARE'.
+if settings.API_LEAN_MIDDLEWARE:
+    from work_tracker.apps.api.handlers import APIDispatcher
+
+    application = APIDispatcher(application)
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
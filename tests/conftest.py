@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Clear the cache around each test, as it is not rolled back together with the test database.
+    """
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.api.authentication import CachedJWTAuthentication
+
+
+class BatchAPITestCase(APITestCase, JWTMixin):
+
+    def setUp(self):
+        self.base_url = '/api/batch/'
+        self.user = factories.UserFactory()
+        self.client = self.get_client(self.user)
+        self.company = factories.CompanyFactory()
+        self.project = factories.ProjectFactory(company=self.company)
+        self.project.users.add(self.user)
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+        self.entries = [factories.EntryFactory(task=self.task) for _ in range(3)]
+
+    def test_batch(self):
+        paths = [
+            f'entry/?ids={self.entries[0].pk},{self.entries[2].pk}&fields=id',
+            f'task/{self.task.pk}/',
+            'project/',
+            '/api/company/',
+            'entry/?ids=Moria',
+        ]
+        authenticate = CachedJWTAuthentication.authenticate
+        with patch.object(CachedJWTAuthentication, 'authenticate', autospec=True, side_effect=authenticate) as mock:
+            resp = self.client.post(self.base_url, {'requests': paths}, format='json')
+        assert resp.status_code == 200
+        # Assert the token is only decoded for the batch request itself.
+        assert mock.call_count == 1
+
+        responses = resp.json()
+        assert [response['path'] for response in responses] == paths
+        assert [response['status'] for response in responses] == [200, 200, 200, 200, 400]
+        assert responses[0]['body'] == [{'id': str(self.entries[0].pk)}, {'id': str(self.entries[2].pk)}]
+        assert len(responses[1]['body']['entries']) == 3
+        assert responses[1]['body'] == self.client.get(f'/api/task/{self.task.pk}/').json()
+        assert [project['id'] for project in responses[2]['body']] == [str(self.project.pk)]
+        assert [company['id'] for company in responses[3]['body']] == [str(self.company.pk)]
+        assert 'ids' in responses[4]['body']
+
+    def test_batch_validation(self):
+        resp = self.client.post(self.base_url, {'requests': [
+            'moria/', '../admin/', 'https://example.com/api/entry/', 'batch/', f'entry/{self.entries[0].pk}/'
+        ]}, format='json')
+        assert resp.status_code == 200
+        assert [response['status'] for response in resp.json()] == [404, 400, 400, 400, 200]
+
+        resp = self.client.post(self.base_url, {'requests': []}, format='json')
+        assert resp.status_code == 400
+        with override_settings(BATCH_MAX_REQUESTS=2):
+            resp = self.client.post(self.base_url, {'requests': ['entry/', 'task/', 'project/']}, format='json')
+        assert resp.status_code == 400
+
+        # Assert sub-requests are authenticated as the requesting User.
+        other_client = self.get_client(factories.UserFactory(email='gimli@test.com'))
+        resp = other_client.post(self.base_url, {'requests': [f'entry/{self.entries[0].pk}/', 'entry/']}, format='json')
+        assert [response['status'] for response in resp.json()] == [403, 200]
+        assert resp.json()[1]['body'] == []
+        resp = self.client_class().post(self.base_url, {'requests': ['entry/']}, format='json')
+        assert resp.status_code == 401
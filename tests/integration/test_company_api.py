@@ -74,3 +74,34 @@ class CompanyAPITestCase(APITestCase, JWTMixin):
         resp = self.client.put(url, data)
         assert resp.status_code == 403
         assert str(resp.data['detail']) == 'Only staff users may access this functionality.'
+
+    def test_company_list_conditional(self):
+        resp = self.client.get(self.base_url)
+        assert resp.status_code == 200
+        etag = resp['ETag']
+        assert resp['Last-Modified']
+
+        # Assert unchanged companies are not sent again.
+        resp = self.client.get(self.base_url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 304
+        assert not resp.content
+
+        # Assert updated, created and deleted companies change the ETag.
+        for change in (lambda: self.company.save(), lambda: factories.CompanyFactory(name='Rohan, Inc.'),
+                       lambda: self.company.delete()):
+            change()
+            resp = self.client.get(self.base_url, HTTP_IF_NONE_MATCH=etag)
+            assert resp.status_code == 200
+            assert resp['ETag'] != etag
+            etag = resp['ETag']
+
+    def test_company_detail_conditional(self):
+        url = f'{self.base_url}{self.company.pk.hex}/'
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # Assert projects listed within the company details are reflected in the ETag.
+        factories.ProjectFactory(company=self.company)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert len(resp.data['projects']) == 1
@@ -0,0 +1,154 @@
+import datetime
+import threading
+from decimal import Decimal
+from functools import partial
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.tracker import dashboard
+from work_tracker.apps.tracker.enums import EntryStatus, TaskStatus
+
+
+class DashboardAPITestCase(APITestCase, JWTMixin):
+
+    def setUp(self):
+        cache.clear()
+        self.base_url = '/api/dashboard/'
+        self.user = factories.UserFactory()
+        self.client = self.get_client(self.user)
+        self.project = factories.ProjectFactory(name='Traverse Moria')
+        self.other_project = factories.ProjectFactory(name="Defend Helm's Deep")
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+        self.other_task = factories.TaskFactory(user=self.user, project=self.other_project, code='Helm-1')
+        factories.TaskFactory(user=self.user, project=self.project, code='Moria-2', status=TaskStatus.CLOSED)
+        factories.TaskFactory(user=factories.UserFactory(email='gimli@test.com'), project=self.project)
+
+        now = timezone.now()
+        self.today = timezone.localdate()
+        for task, start_time in ((self.task, now), (self.task, now - datetime.timedelta(days=self.today.weekday())),
+                                 (self.other_task, now - datetime.timedelta(days=7))):
+            factories.EntryFactory(task=task, start_time=start_time, total_time=3600, hours=Decimal('1'),
+                                   bill=Decimal('150'))
+        self.timer = factories.EntryFactory(task=self.other_task, start_time=now, end_time=None,
+                                            status=EntryStatus.PAUSED, total_time=0, hours=0, bill=0)
+
+    def test_dashboard(self):
+        resp = self.client.get(self.base_url)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data['timer']['id'] == str(self.timer.pk)
+        # The second Entry started at the start of the week, which may be today.
+        today_entries = 2 if self.today.weekday() == 0 else 1
+        assert data['today'] == {'total_time': 3600 * today_entries, 'hours': f'{today_entries}.000000',
+                                 'bill': f'{150 * today_entries}.00'}
+        assert data['week']['hours'] == '2.000000'
+        assert [(project['project'], project['hours']) for project in data['projects']] == [
+            ("Defend Helm's Deep", '0.000000'), ('Traverse Moria', '2.000000')
+        ]
+        assert [task['id'] for task in data['open_tasks']] == sorted([str(self.task.pk), str(self.other_task.pk)])
+
+    def test_dashboard_cache(self):
+        resp = self.client.get(self.base_url)
+        # Assert cached dashboards are returned without queries, other than the request's savepoint.
+        with self.assertNumQueries(2):
+            assert self.client.get(self.base_url).json() == resp.json()
+
+        # Assert changes to the User's Entries invalidate the User's dashboard.
+        self.timer.status = EntryStatus.COMPLETE
+        self.timer.save()
+        resp = self.client.get(self.base_url)
+        assert resp.json()['timer'] is None
+        factories.TaskFactory(user=self.user, project=self.project, code='Moria-3')
+        assert len(self.client.get(self.base_url).json()['open_tasks']) == 3
+
+    def test_dashboard_reassigned(self):
+        other_user = factories.UserFactory(email='legolas@test.com')
+        other_client = self.get_client(other_user)
+        assert len(self.client.get(self.base_url).json()['open_tasks']) == 2
+        assert other_client.get(self.base_url).json()['timer'] is None
+
+        # Assert reassigning a Task and moving an Entry update both the previous and the new owner's dashboards.
+        self.task.user = other_user
+        self.task.save()
+        self.timer.task = factories.TaskFactory(user=other_user, project=self.project, code='Moria-3')
+        self.timer.save()
+        data = self.client.get(self.base_url).json()
+        assert [task['id'] for task in data['open_tasks']] == [str(self.other_task.pk)]
+        assert data['timer'] is None
+        data = other_client.get(self.base_url).json()
+        assert str(self.task.pk) in [task['id'] for task in data['open_tasks']]
+        assert data['timer']['id'] == str(self.timer.pk)
+
+
+class DashboardConcurrencyTestCase(APITransactionTestCase, JWTMixin):
+
+    def tearDown(self):
+        # Close the connections the pool's threads keep between dashboards, one call per thread.
+        barrier = threading.Barrier(4, timeout=10)
+
+        def close():
+            barrier.wait()
+            connections.close_all()
+
+        for future in [dashboard.get_executor(4).submit(close) for _ in range(4)]:
+            future.result()
+
+    @override_settings(DASHBOARD_WORKERS=4)
+    def test_dashboard_concurrent_queries(self):
+        cache.clear()
+        user = factories.UserFactory()
+        task = factories.TaskFactory(user=user)
+        entry = factories.EntryFactory(task=task, start_time=timezone.now(), end_time=None, status=EntryStatus.ACTIVE,
+                                       total_time=0, hours=0, bill=0)
+        factories.EntryFactory(task=task, start_time=timezone.now(), total_time=3600, hours=Decimal('1'),
+                               bill=Decimal('150'))
+
+        # Record the threads the dashboard's queries run on, all four queries at once.
+        threads, barrier = set(), threading.Barrier(4, timeout=10)
+        run = dashboard.run_concurrently
+
+        def run_concurrently(*functions):
+            def record(function):
+                threads.add(threading.current_thread().name)
+                barrier.wait()
+                return function()
+
+            return run(*[partial(record, function) for function in functions])
+
+        with patch.object(dashboard, 'run_concurrently', run_concurrently):
+            resp = self.get_client(user).get('/api/dashboard/')
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data['timer']['id'] == str(entry.pk)
+        assert data['today']['hours'] == data['week']['hours'] == '1.000000'
+        assert [project['project_id'] for project in data['projects']] == [str(task.project_id)]
+        assert [t['id'] for t in data['open_tasks']] == [str(task.pk)]
+        assert len(threads) == 4 and all(name.startswith('dashboard') for name in threads)
+
+    @override_settings(DASHBOARD_WORKERS=4)
+    def test_dashboard_connections(self):
+        user = factories.UserFactory()
+        factories.EntryFactory(task=factories.TaskFactory(user=user), start_time=timezone.now())
+        created = []
+
+        def record(sender, connection, **kwargs):
+            if threading.current_thread().name.startswith('dashboard'):
+                created.append(connection.alias)
+
+        connection_created.connect(record)
+        self.addCleanup(connection_created.disconnect, record)
+        client = self.get_client(user)
+        for _ in range(3):
+            cache.clear()
+            assert client.get('/api/dashboard/').status_code == 200
+
+        # Assert the pool's threads keep their connections between dashboards, opening at most one each.
+        assert 1 <= len(created) <= 4
@@ -0,0 +1,264 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.tracker import deletion
+from work_tracker.apps.tracker.enums import DeletionStatus, TimerAction
+from work_tracker.apps.tracker.models import (
+    ArchivedEntry,
+    Company,
+    DeletionJob,
+    Entry,
+    Project,
+    Task,
+    TimerEvent,
+    Tombstone,
+)
+
+
+@override_settings(DELETION_BATCH_SIZE=2)
+class DeletionAPITestCase(APITestCase, JWTMixin):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.staff_user = factories.UserFactory(email='aragorn@test.com', is_staff=True, is_superuser=True)
+        self.client = self.get_client(self.staff_user)
+        self.company = factories.CompanyFactory()
+        self.projects = [factories.ProjectFactory(company=self.company) for _ in range(2)]
+        self.projects[0].users.add(self.user)
+        self.tasks = [factories.TaskFactory(user=self.user, project=project) for project in self.projects]
+        self.entries = [factories.EntryFactory(task=task) for task in self.tasks for _ in range(3)]
+        now = timezone.now()
+        self.archived_entry = ArchivedEntry.objects.create(
+            id=uuid4(), task=self.tasks[0], user=self.user, start_time=now, end_time=now, total_time=0, hours=0,
+            bill=0, created_at=now,
+        )
+        self.timer_event = TimerEvent.objects.create(
+            user=self.user, key=uuid4(), action=TimerAction.START, entry=self.entries[0], status_code=201
+        )
+        self.other_task = factories.TaskFactory(user=self.user)
+        self.other_entry = factories.EntryFactory(task=self.other_task)
+
+    def test_company_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(f'/api/company/{self.company.pk}/')
+        assert resp.status_code == 202
+        assert resp.data['status'] == 'PENDING'
+
+        job = DeletionJob.objects.get(pk=resp.data['id'])
+        assert job.status == DeletionStatus.COMPLETE
+        assert job.user == self.staff_user
+        # Two Projects, two Tasks, six Entries, one archived Entry and the Company itself.
+        assert job.total == job.deleted == 12
+        assert not Company.objects.filter(pk=self.company.pk).exists()
+        assert not Project.objects.filter(company=self.company).exists()
+        assert not Project.users.through.objects.filter(user=self.user).exists()
+        assert list(Task.objects.all()) == [self.other_task]
+        assert list(Entry.objects.all()) == [self.other_entry]
+        assert not ArchivedEntry.objects.exists()
+        self.timer_event.refresh_from_db()
+        assert self.timer_event.entry is None
+
+        # Assert sync clients learn about every removed object.
+        tombstones = {(t.model, t.object_id): t.user_id for t in Tombstone.objects.all()}
+        assert tombstones[('company', self.company.pk)] is None
+        assert all(tombstones[('project', project.pk)] is None for project in self.projects)
+        assert all(tombstones[('task', task.pk)] is None for task in self.tasks)
+        assert all(tombstones[('entry', entry.pk)] == self.user.pk for entry in self.entries)
+
+        resp = self.client.get(f'/api/deletion-job/{job.pk}/')
+        assert resp.status_code == 200
+        assert resp.data['status'] == 'COMPLETE'
+        assert resp.data['deleted'] == resp.data['total'] == 12
+
+    def test_task_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(f'/api/task/{self.tasks[1].pk}/')
+        assert resp.status_code == 202
+        assert DeletionJob.objects.get().deleted == 4
+        assert set(Task.objects.all()) == {self.tasks[0], self.other_task}
+        assert Entry.objects.count() == 4
+        assert not Entry.objects.filter(task=self.tasks[1]).exists()
+
+        resp = self.client.get('/api/deletion-job/')
+        assert resp.status_code == 200
+        assert [(job['model'], job['object_id']) for job in resp.data] == [('task', str(self.tasks[1].pk))]
+
+    def test_delete_validation(self):
+        # Assert non-staff Users may neither delete objects nor list deletions.
+        client = self.get_client(self.user)
+        resp = client.delete(f'/api/project/{self.projects[0].pk}/')
+        assert resp.status_code == 403
+        resp = client.get('/api/deletion-job/')
+        assert resp.status_code == 403
+        assert not DeletionJob.objects.exists()
+
+        # Assert deleting an object twice resumes its unfinished deletion.
+        first = self.client.delete(f'/api/project/{self.projects[0].pk}/')
+        second = self.client.delete(f'/api/project/{self.projects[0].pk}/')
+        assert first.data['id'] == second.data['id']
+        assert Project.objects.filter(pk=self.projects[0].pk).exists()
+
+    def test_delete_rejects_writes(self):
+        resp = self.client.delete(f'/api/project/{self.projects[0].pk}/')
+        assert resp.status_code == 202
+        task, entry = self.tasks[0], self.entries[0]
+
+        # Assert writes to the Project being deleted, or to objects belonging to it, are rejected.
+        resp = self.client.patch(f'/api/project/{self.projects[0].pk}/', {'name': 'Isengard'})
+        assert resp.status_code == 409
+        assert resp.data['detail'].code == 'being_deleted'
+        resp = self.client.post('/api/task/', {
+            'user_id': self.user.pk.hex, 'project_id': self.projects[0].pk.hex, 'name': 'Flee', 'code': 'Flee',
+        })
+        assert resp.status_code == 409
+        assert self.client.patch(f'/api/task/{task.pk}/', {'name': 'Flee'}).status_code == 409
+        client = self.get_client(self.user)
+        assert client.post('/api/entry/', {'start_time': timezone.now(), 'task_id': task.pk.hex}).status_code == 409
+        assert client.patch(f'/api/entry/{entry.pk}/', {'comment': 'Lost'}).status_code == 409
+        # Assert only the timer events naming objects being deleted are rejected.
+        events = [
+            {'key': uuid4(), 'action': TimerAction.START.name, 'task_id': task.pk, 'entry_time': timezone.now()},
+            {'key': uuid4(), 'action': TimerAction.START.name, 'task_id': self.tasks[1].pk,
+             'entry_time': timezone.now()},
+        ]
+        resp = client.post('/api/entry/events/', {'events': events}, format='json')
+        assert [result['status_code'] for result in resp.data['results']] == [409, 201]
+        assert not Entry.objects.filter(task=task).exclude(pk__in=[e.pk for e in self.entries]).exists()
+
+        # Assert other objects remain writable, and deleting the Project again joins its deletion.
+        assert self.client.patch(f'/api/task/{self.tasks[1].pk}/', {'name': 'Stay'}).status_code == 200
+        assert self.client.delete(f'/api/project/{self.projects[0].pk}/').status_code == 202
+
+    def test_delete_resume(self):
+        delete_batch = deletion.delete_batch
+
+        def fail_on_tasks(model, batch, using):
+            if model is Task:
+                raise RuntimeError('Connection lost.')
+            delete_batch(model, batch, using)
+
+        with patch.object(deletion, 'delete_batch', side_effect=fail_on_tasks):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(f'/api/project/{self.projects[0].pk}/')
+        job = DeletionJob.objects.get()
+        assert job.status == DeletionStatus.FAILED
+        assert job.error == 'Connection lost.'
+        # The Project's Entries were deleted before the failure.
+        assert job.deleted == 4
+        assert not Entry.objects.filter(task=self.tasks[0]).exists()
+        assert Task.objects.filter(pk=self.tasks[0].pk).exists()
+
+        out = StringIO()
+        call_command('run_deletion_jobs', stdout=out)
+        job.refresh_from_db()
+        assert job.status == DeletionStatus.COMPLETE
+        assert job.total == job.deleted == 6
+        assert 'deleted 6 of 6 objects' in out.getvalue()
+        assert not Project.objects.filter(pk=self.projects[0].pk).exists()
+
+    def test_admin_delete(self):
+        self.client.force_login(self.staff_user)
+        url = reverse('admin:tracker_company_delete', args=(self.company.pk,))
+        resp = self.client.get(url)
+        assert resp.status_code == 200
+        # Assert dependent objects are counted rather than listed.
+        model_count = dict(resp.context['model_count'])
+        assert model_count['Entries'] == 6
+        assert model_count['Archived entries'] == 1
+        assert model_count['tasks'] == model_count['projects'] == 2
+        assert model_count['Companies'] == 1
+        assert resp.context['deleted_objects'] == [str(self.company)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(url, {'post': 'yes'})
+        assert resp.status_code == 302
+        assert DeletionJob.objects.get().status == DeletionStatus.COMPLETE
+        assert not Company.objects.filter(pk=self.company.pk).exists()
+
+
+@override_settings(DELETION_BATCH_SIZE=2)
+class DeletionWorkersTestCase(APITransactionTestCase, JWTMixin):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.staff_user = factories.UserFactory(email='aragorn@test.com', is_staff=True, is_superuser=True)
+        self.company = factories.CompanyFactory()
+        self.project = factories.ProjectFactory(company=self.company)
+        self.project.users.add(self.user)
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+        self.entries = [factories.EntryFactory(task=self.task) for _ in range(5)]
+
+    def wait_for(self, job_id) -> DeletionJob:
+        deadline = time.monotonic() + 10
+        while (job := DeletionJob.objects.get(pk=job_id)).status in (DeletionStatus.PENDING, DeletionStatus.RUNNING):
+            assert time.monotonic() < deadline, 'Deletion job did not finish.'
+            time.sleep(0.01)
+        return job
+
+    @override_settings(DELETION_WORKERS=2)
+    def test_delete_on_pool(self):
+        # Record the job's progress and thread as seen by each batch, committed by the previous batches.
+        progress, threads = [], set()
+        delete_batch = deletion.delete_batch
+
+        def record_progress(model, batch, using):
+            progress.append(DeletionJob.objects.get().deleted)
+            threads.add(threading.current_thread().name)
+            delete_batch(model, batch, using)
+
+        with patch.object(deletion, 'delete_batch', side_effect=record_progress):
+            resp = self.get_client(self.staff_user).delete(f'/api/company/{self.company.pk}/')
+            assert resp.status_code == 202
+            job = self.wait_for(resp.data['id'])
+
+        assert job.status == DeletionStatus.COMPLETE
+        assert job.error == ''
+        # Five Entries, the Task, the Project and the Company itself.
+        assert job.total == job.deleted == 8
+        # Three batches of Entries, then the Task, the membership and the Project.
+        assert progress == [0, 2, 4, 5, 6, 6]
+        assert threads and all(name.startswith('deletion') for name in threads)
+        assert not Company.objects.filter(pk=self.company.pk).exists()
+        assert not Entry.objects.exists() and not Task.objects.exists()
+        tombstones = {(t.model, t.object_id): t.user_id for t in Tombstone.objects.all()}
+        assert tombstones == {
+            ('company', self.company.pk): None, ('project', self.project.pk): None, ('task', self.task.pk): None,
+            **{('entry', entry.pk): self.user.pk for entry in self.entries},
+        }
+
+    def test_delete_concurrent(self):
+        barrier = threading.Barrier(2, timeout=10)
+
+        def start(first):
+            try:
+                with transaction.atomic():
+                    if not first:
+                        barrier.wait()
+                    job = deletion.start_deletion(Project.objects.get(pk=self.project.pk))
+                    if first:
+                        # Keep the first job uncommitted while the second deletion tries to create its own.
+                        barrier.wait()
+                        time.sleep(0.2)
+                return job.pk
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            job_ids = list(executor.map(start, (True, False)))
+        # Assert both deletions share a single job.
+        assert job_ids[0] == job_ids[1]
+        assert DeletionJob.objects.get().status == DeletionStatus.COMPLETE
+        assert not Project.objects.filter(pk=self.project.pk).exists()
@@ -1,13 +1,27 @@
 import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-
+from io import StringIO
+from unittest.mock import patch
+from uuid import uuid4
+
+import msgpack
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 from tests import factories
 from tests.utils import JWTMixin
-from work_tracker.apps.tracker.enums import EntryAction, EntryStatus
-from work_tracker.apps.tracker.models import Entry
+from work_tracker.apps.api.components.tracker.views import EntryViewSet
+from work_tracker.apps.routers import use_shard
+from work_tracker.apps.tracker.archive import get_archive_cutoff
+from work_tracker.apps.tracker.enums import EntryAction, EntryStatus, TimerAction
+from work_tracker.apps.tracker.models import ArchivedEntry, Entry, Task, TimerEvent
 
 
 class EntryAPITestCase(APITestCase, JWTMixin):
@@ -37,6 +51,30 @@ class EntryAPITestCase(APITestCase, JWTMixin):
         for entry in resp.json():
             assert entry['user'] == self.user.email
 
+    def test_entry_list_stream(self):
+        resp = self.client.get(self.base_url, {'stream': 'true'})
+        assert resp.streaming
+        assert json.loads(b''.join(resp.streaming_content)) == []
+
+        for _ in range(5):
+            factories.EntryFactory(task=self.task_1)
+        factories.EntryFactory(task=self.task_3)
+        expected = self.client.get(self.base_url, {'fields': 'id,user', 'ordering': '-created_at'}).json()
+        with patch.object(EntryViewSet, 'stream_chunk_size', 2):
+            resp = self.client.get(self.base_url, {'stream': 'true', 'fields': 'id,user', 'ordering': '-created_at'})
+            assert resp.status_code == 200
+            assert resp['Content-Type'] == 'application/json'
+            assert resp.has_header('ETag')
+            # Assert the chunks are rendered as they are read.
+            chunks = list(resp.streaming_content)
+        assert len(chunks) == 4
+        assert json.loads(b''.join(chunks)) == expected
+
+        # Assert paginated lists are not streamed.
+        resp = self.client.get(self.base_url, {'stream': 'true', 'limit': 2})
+        assert not resp.streaming
+        assert resp.json()['count'] == 5
+
     def test_entry_detail(self):
         entry = factories.EntryFactory(task=self.task_1)
         url = f'{self.base_url}{entry.pk.hex}/'
@@ -65,6 +103,23 @@ class EntryAPITestCase(APITestCase, JWTMixin):
         assert entry.status == EntryStatus.ACTIVE
         assert entry.total_time == entry.hours == entry.bill == 0
 
+    def test_entry_msgpack(self):
+        entry = factories.EntryFactory(task=self.task_1)
+
+        resp = self.client.get(f'{self.base_url}{entry.pk}/', HTTP_ACCEPT='application/msgpack')
+        assert resp.status_code == 200
+        assert resp['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(resp.content) == self.client.get(f'{self.base_url}{entry.pk}/').json()
+
+        data = msgpack.packb({'start_time': timezone.now().isoformat(), 'task_id': self.task_2.id.hex})
+        resp = self.client.post(self.base_url, data, content_type='application/msgpack',
+                                HTTP_ACCEPT='application/msgpack')
+        assert resp.status_code == 201
+        assert Entry.objects.get(pk=msgpack.unpackb(resp.content)['id']).task == self.task_2
+
+        resp = self.client.post(self.base_url, b'\xc1', content_type='application/msgpack')
+        assert resp.status_code == 400
+
     def test_entry_create_validation(self):
         data = {
             'start_time': timezone.now() + datetime.timedelta(hours=1),
@@ -261,3 +316,298 @@ class EntryAPITestCase(APITestCase, JWTMixin):
         assert resp.status_code == 400
         assert str(resp.data['non_field_errors'][0]) == 'The selected start_time/end_time values may not exceed ' \
                                                         'the current time.'
+
+    def test_entry_events(self):
+        start_time = timezone.now() - datetime.timedelta(hours=4)
+        entry_id = uuid4()
+        events = [
+            {'key': uuid4(), 'action': TimerAction.START.name, 'task_id': self.task_1.pk, 'entry_id': entry_id,
+             'entry_time': start_time},
+            {'key': uuid4(), 'action': TimerAction.PAUSE.name, 'entry_id': entry_id,
+             'entry_time': start_time + datetime.timedelta(hours=1)},
+            {'key': uuid4(), 'action': TimerAction.RESUME.name, 'entry_id': entry_id,
+             'entry_time': start_time + datetime.timedelta(hours=2)},
+            {'key': uuid4(), 'action': TimerAction.COMPLETE.name, 'entry_id': entry_id,
+             'entry_time': start_time + datetime.timedelta(hours=3)},
+        ]
+        url = f'{self.base_url}events/'
+
+        resp = self.client.post(url, {'events': events}, format='json')
+        assert resp.status_code == 200
+        assert [r['status_code'] for r in resp.data['results']] == [201, 200, 200, 200]
+        assert not any(r['replayed'] for r in resp.data['results'])
+        entry = Entry.objects.get(pk=entry_id)
+        assert entry.status == EntryStatus.COMPLETE
+        assert entry.total_time == (2 * 3600)
+        modified_at = entry.modified_at
+
+        # Assert replaying the batch returns the stored results without applying the events again.
+        resp = self.client.post(url, {'events': events}, format='json')
+        assert resp.status_code == 200
+        assert all(r['replayed'] for r in resp.data['results'])
+        assert [r['status_code'] for r in resp.data['results']] == [201, 200, 200, 200]
+        entry.refresh_from_db()
+        assert entry.modified_at == modified_at
+        assert Entry.objects.filter(task=self.task_1).count() == 1
+
+    def test_entry_events_validation(self):
+        entry = factories.EntryFactory(task=self.task_1, status=EntryStatus.ACTIVE, end_time=None)
+        events = [
+            # Entries may only be resumed once paused.
+            {'key': uuid4(), 'action': TimerAction.RESUME.name, 'entry_id': entry.pk,
+             'entry_time': timezone.now()},
+            # Entries of tasks not assigned to the User are not accessible.
+            {'key': uuid4(), 'action': TimerAction.PAUSE.name,
+             'entry_id': factories.EntryFactory(task=self.task_3, status=EntryStatus.ACTIVE).pk,
+             'entry_time': timezone.now()},
+            {'key': uuid4(), 'action': TimerAction.PAUSE.name, 'entry_id': entry.pk, 'entry_time': timezone.now()},
+        ]
+        resp = self.client.post(f'{self.base_url}events/', {'events': events}, format='json')
+        assert resp.status_code == 200
+        results = resp.data['results']
+        assert [r['status_code'] for r in results] == [400, 404, 200]
+        assert str(results[0]['result']['non_field_errors'][0]) == 'You cannot resume an already active entry.'
+        assert str(results[1]['result']['detail']) == 'The selected entry does not exist.'
+        entry.refresh_from_db()
+        assert entry.status == EntryStatus.PAUSED
+
+        # Assert events missing the entry they act upon are rejected.
+        events = [{'key': uuid4(), 'action': TimerAction.PAUSE.name, 'entry_time': timezone.now()}]
+        resp = self.client.post(f'{self.base_url}events/', {'events': events}, format='json')
+        assert resp.status_code == 400
+        assert str(resp.data['events'][0]['entry_id'][0]) == 'An entry is required to pause, resume or complete it.'
+
+        # Assert Entries may not be started using the id of an existing Entry.
+        entry.delete()
+        completed = factories.EntryFactory(task=self.task_1, status=EntryStatus.COMPLETE)
+        events = [{'key': uuid4(), 'action': TimerAction.START.name, 'task_id': self.task_1.pk,
+                   'entry_id': completed.pk, 'entry_time': timezone.now()}]
+        resp = self.client.post(f'{self.base_url}events/', {'events': events}, format='json')
+        assert resp.status_code == 200
+        assert resp.data['results'][0]['status_code'] == 400
+        assert str(resp.data['results'][0]['result']['entry_id']) == 'This entry already exists.'
+        assert Entry.objects.filter(pk=completed.pk).count() == 1
+
+    def test_entry_create_idempotency(self):
+        data = {
+            'start_time': timezone.now(),
+            'task_id': self.task_1.id.hex
+        }
+        key = uuid4().hex
+        with self.captureOnCommitCallbacks() as callbacks:
+            resp = self.client.post(self.base_url, data, HTTP_IDEMPOTENCY_KEY=key)
+        assert resp.status_code == 201
+        assert 'Idempotent-Replayed' not in resp
+        # Assert the response is only stored once the request's transaction commits.
+        assert self.client.post(self.base_url, data, HTTP_IDEMPOTENCY_KEY=key).status_code == 409
+        for callback in callbacks:
+            callback()
+
+        # Assert retried requests are answered from the stored response, without creating another entry.
+        replay = self.client.post(self.base_url, data, HTTP_IDEMPOTENCY_KEY=key)
+        assert replay.status_code == 201
+        assert replay['Idempotent-Replayed'] == 'true'
+        assert replay.data == resp.data
+        assert Entry.objects.filter(task=self.task_1).count() == 1
+
+        # Assert keys can not be reused for a different request.
+        data['task_id'] = self.task_2.id.hex
+        resp = self.client.post(self.base_url, data, HTTP_IDEMPOTENCY_KEY=key)
+        assert resp.status_code == 422
+        assert str(resp.data['detail']) == 'This Idempotency-Key has already been used for a different request.'
+
+        # Assert keys are scoped to the requesting User.
+        client = self.get_client(self.task_3.user)
+        data['task_id'] = self.task_3.id.hex
+        resp = client.post(self.base_url, data, HTTP_IDEMPOTENCY_KEY=key)
+        assert resp.status_code == 201
+        assert Entry.objects.filter(task=self.task_3).count() == 1
+
+    def test_entry_report(self):
+        now = timezone.now()
+        cutoff = get_archive_cutoff()
+        old_entry = factories.EntryFactory(task=self.task_1, start_time=cutoff - datetime.timedelta(days=30),
+                                           end_time=cutoff - datetime.timedelta(days=30, hours=-2), total_time=7200,
+                                           hours=Decimal(2), bill=Decimal(20))
+        factories.EntryFactory(task=self.task_1, start_time=now - datetime.timedelta(hours=1), end_time=now,
+                               total_time=3600, hours=Decimal(1), bill=Decimal(10))
+        # Entries which are still running are never archived.
+        active_entry = factories.EntryFactory(task=self.task_2, start_time=cutoff - datetime.timedelta(days=30),
+                                              end_time=None, status=EntryStatus.ACTIVE)
+        factories.EntryFactory(task=self.task_3, start_time=cutoff - datetime.timedelta(days=30),
+                               end_time=cutoff - datetime.timedelta(days=29))
+
+        call_command('archive_entries', batch_size=1, stdout=StringIO())
+        assert not Entry.objects.filter(pk=old_entry.pk).exists()
+        assert Entry.objects.filter(pk=active_entry.pk).exists()
+        assert ArchivedEntry.objects.get(task=self.task_1).pk == old_entry.pk
+        assert ArchivedEntry.objects.count() == 2
+
+        # Assert reports covering archived periods include archived Entries.
+        resp = self.client.get(f'{self.base_url}report/')
+        assert resp.status_code == 200
+        totals = {total['task_id']: total for total in resp.json()}
+        assert set(totals) == {str(self.task_1.pk), str(self.task_2.pk)}
+        assert totals[str(self.task_1.pk)]['entries'] == 2
+        assert totals[str(self.task_1.pk)]['total_time'] == 10800
+        assert Decimal(totals[str(self.task_1.pk)]['bill']) == Decimal(30)
+
+        resp = self.client.get(f'{self.base_url}report/', {'start_date': now.date().isoformat()})
+        assert [(total['task_id'], total['entries']) for total in resp.json()] == [(str(self.task_1.pk), 1)]
+
+        resp = self.client.get(f'{self.base_url}report/', {'start_date': '2020-02-01', 'end_date': '2020-01-01'})
+        assert resp.status_code == 400
+        assert str(resp.data['end_date'][0]) == "A report's end date may not precede its start date."
+
+    def test_entry_task_reassigned(self):
+        entry = factories.EntryFactory(task=self.task_1)
+        assert (entry.user, entry.project) == (self.user, self.task_1.project)
+        resp = self.client.get(self.base_url)
+        assert [item['id'] for item in resp.json()] == [str(entry.pk)]
+
+        # Assert saving a Task with the same owner and Project leaves its Entries alone.
+        task = Task.objects.get(pk=self.task_1.pk)
+        task.name = 'Renamed'
+        with self.assertNumQueries(1):
+            task.save()
+
+        # Assert reassigned Tasks move their Entries to the new owner and Project.
+        self.task_1.user = self.task_3.user
+        self.task_1.project = self.task_2.project
+        self.task_1.save()
+        entry.refresh_from_db()
+        assert (entry.user, entry.project) == (self.task_3.user, self.task_2.project)
+        resp = self.client.get(self.base_url)
+        assert resp.json() == []
+        resp = self.client.get(f'{self.base_url}{entry.pk.hex}/')
+        assert resp.status_code == 403
+
+        # Assert Tasks moved to another Project only move their Entries as well.
+        task = Task.objects.get(pk=self.task_1.pk)
+        task.project = self.task_3.project
+        task.save()
+        entry.refresh_from_db()
+        assert (entry.user, entry.project) == (self.task_3.user, self.task_3.project)
+
+    def test_entry_list_filters(self):
+        now = timezone.now()
+        entry_1 = factories.EntryFactory(task=self.task_1, start_time=now - datetime.timedelta(days=2))
+        entry_2 = factories.EntryFactory(task=self.task_2, start_time=now - datetime.timedelta(days=1),
+                                         end_time=None, status=EntryStatus.ACTIVE)
+        entry_3 = factories.EntryFactory(task=self.task_2, start_time=now - datetime.timedelta(hours=1))
+        factories.EntryFactory(task=self.task_3, start_time=now - datetime.timedelta(hours=1))
+
+        def get_ids(params):
+            resp = self.client.get(self.base_url, params)
+            assert resp.status_code == 200
+            return [entry['id'] for entry in resp.json()]
+
+        assert get_ids({'project': self.task_2.project_id}) == [str(entry_2.pk), str(entry_3.pk)]
+        assert get_ids({'task': self.task_1.pk}) == [str(entry_1.pk)]
+        assert get_ids({'ids': f'{entry_3.pk},{entry_1.pk}'}) == [str(entry_1.pk), str(entry_3.pk)]
+        assert get_ids({'status': EntryStatus.ACTIVE.name}) == [str(entry_2.pk)]
+        start_range = {'start_time_after': now - datetime.timedelta(days=1, hours=1), 'start_time_before': now}
+        assert get_ids(start_range) == [str(entry_2.pk), str(entry_3.pk)]
+        assert get_ids({'ordering': '-start_time'}) == [str(entry_3.pk), str(entry_2.pk), str(entry_1.pk)]
+
+        # Assert lists are paginated when a limit is given.
+        resp = self.client.get(self.base_url, {'ordering': 'start_time', 'limit': 2, 'offset': 1})
+        assert resp.json()['count'] == 3
+        assert [entry['id'] for entry in resp.json()['results']] == [str(entry_2.pk), str(entry_3.pk)]
+
+        resp = self.client.get(self.base_url, {'status': 'DONE', 'task': 'Rabbit-stew-1'})
+        assert resp.status_code == 400
+        assert set(resp.data) == {'status', 'task'}
+
+    def test_entry_list_sparse_fields(self):
+        entry = factories.EntryFactory(task=self.task_1)
+        select = 'SELECT "tracker_entry"."id"'
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.base_url, {'fields': 'id,status,start_time'})
+        assert resp.status_code == 200
+        assert resp.json() == [{'id': str(entry.pk), 'status': entry.status.name,
+                                'start_time': entry.start_time.strftime('%Y-%m-%d %H:%M:%S')}]
+        # Assert unrequested columns and relations are not loaded.
+        query = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith(select))
+        assert 'JOIN' not in query and '"comment"' not in query and '"bill"' not in query
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.base_url, {'fields': 'id,user', 'expand': 'task'})
+        assert resp.json() == [{'id': str(entry.pk), 'user': self.user.email, 'task': {
+            'id': str(self.task_1.pk), 'user_id': str(self.user.pk), 'project_id': str(self.task_1.project_id),
+            'project': self.task_1.project.name, 'name': self.task_1.name, 'code': self.task_1.code,
+        }}]
+        query = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith(select))
+        assert query.count('JOIN') == 3 and '"tracker_task"."description"' not in query
+
+        resp = self.client.get(f'{self.base_url}{entry.pk}/', {'fields': 'id,hours'})
+        assert resp.status_code == 200
+        assert set(resp.json()) == {'id', 'hours'}
+
+        resp = self.client.get(self.base_url, {'fields': 'id,password', 'expand': 'project'})
+        assert resp.status_code == 400
+        assert set(resp.data) == {'expand'}
+        resp = self.client.get(self.base_url, {'fields': 'id,password'})
+        assert resp.status_code == 400
+        assert set(resp.data) == {'fields'}
+
+
+class EntryEventsConcurrencyTestCase(APITransactionTestCase, JWTMixin):
+    databases = {'default', 'shard_1'}
+
+    def upload_concurrently(self, user, events) -> list:
+        # Both uploads find the event unapplied before either applies it.
+        barrier = threading.Barrier(2, timeout=10)
+        apply_timer_event = EntryViewSet.apply_timer_event
+
+        def apply_concurrently(view, event):
+            barrier.wait()
+            return apply_timer_event(view, event)
+
+        def upload():
+            try:
+                return self.get_client(user).post('/api/entry/events/', {'events': events}, format='json')
+            finally:
+                connections.close_all()
+
+        with patch.object(EntryViewSet, 'apply_timer_event', autospec=True, side_effect=apply_concurrently):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                return list(executor.map(lambda _: upload(), range(2)))
+
+    def test_entry_events_concurrent(self):
+        user = factories.UserFactory()
+        task = factories.TaskFactory(user=user)
+        task.project.users.add(user)
+        entry_id = uuid4()
+        events = [{'key': uuid4(), 'action': TimerAction.START.name, 'task_id': task.pk, 'entry_id': entry_id,
+                   'entry_time': timezone.now()}]
+        responses = self.upload_concurrently(user, events)
+
+        # Assert the upload losing the race returns the stored outcome instead of failing.
+        assert [resp.status_code for resp in responses] == [200, 200]
+        results = sorted((resp.data['results'][0] for resp in responses), key=lambda result: result['replayed'])
+        assert [(r['status_code'], r['replayed']) for r in results] == [(201, False), (201, True)]
+        assert results[0]['result'] == results[1]['result']
+        assert Entry.objects.filter(pk=entry_id).count() == 1
+        assert TimerEvent.objects.filter(user=user).count() == 1
+
+    @override_settings(DATABASE_SHARDS=['default', 'shard_1'])
+    def test_entry_events_concurrent_shard(self):
+        user = factories.UserFactory()
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project = factories.ProjectFactory(company=company)
+            project.users.add(user)
+            task = factories.TaskFactory(user=user, project=project)
+        entry_id = uuid4()
+        events = [{'key': uuid4(), 'action': TimerAction.START.name, 'task_id': task.pk, 'entry_id': entry_id,
+                   'entry_time': timezone.now()}]
+        # Assert events are applied on the shard of their Task, without an 'X-Company' header, and that the upload
+        # losing the race is rolled back on that shard.
+        responses = self.upload_concurrently(user, events)
+        assert [resp.status_code for resp in responses] == [200, 200]
+        assert sorted(resp.data['results'][0]['replayed'] for resp in responses) == [False, True]
+        assert Entry.objects.using('shard_1').filter(pk=entry_id).count() == 1
+        assert TimerEvent.objects.using('shard_1').filter(user=user).count() == 1
+        assert not TimerEvent.objects.using('default').exists()
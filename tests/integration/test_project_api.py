@@ -1,3 +1,5 @@
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from tests import factories
@@ -82,3 +84,56 @@ class ProjectAPITestCase(APITestCase, JWTMixin):
         resp = self.client.put(url, data)
         assert resp.status_code == 403
         assert str(resp.data['detail']) == 'Only staff users may access this functionality.'
+
+    def test_project_detail_conditional(self):
+        url = f'{self.base_url}{self.project.pk.hex}/'
+        etag = self.client.get(url)['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # Assert membership changes are reflected in the ETag, even if the number of users remains the same.
+        self.project.users.remove(self.user_1)
+        self.project.users.add(factories.UserFactory(email='pippin@test.com'))
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert len(resp.data['users']) == 2
+
+    def test_project_detail_cache(self):
+        url = f'{self.base_url}{self.project.pk.hex}/'
+        resp = self.client.get(url)
+        assert resp['X-Cache'] == 'MISS'
+        resp = self.client.get(url)
+        assert resp['X-Cache'] == 'HIT'
+        assert len(resp.data['users']) == 2
+
+        # Assert cached responses are invalidated by membership changes.
+        self.project.users.remove(self.user_1)
+        resp = self.client.get(url)
+        assert resp['X-Cache'] == 'MISS'
+        assert len(resp.data['users']) == 1
+
+        # Assert cache metrics are exposed to staff users only.
+        stats_url = '/api/cache-stats/'
+        assert self.client.get(stats_url).status_code == 403
+        resp = self.get_client(self.staff_user).get(stats_url)
+        assert resp.status_code == 200
+        assert resp.data['ProjectViewSet']['hits'] == 1
+        assert resp.data['ProjectViewSet']['misses'] == 2
+
+        # Assert cached responses are only invalidated by changes to the members' details they include.
+        self.client.get(url)
+        self.user_1.last_login = timezone.now()
+        self.user_1.save(update_fields=['last_login'])
+        self.user.rate = 10
+        self.user.save()
+        assert self.client.get(url)['X-Cache'] == 'HIT'
+        self.user.first_name = 'Sam'
+        self.user.save()
+        resp = self.client.get(url)
+        assert resp['X-Cache'] == 'MISS'
+        assert resp.data['users'][0]['name'] == 'Sam Gamgee'
+
+        # Assert cached responses expire even if unchanged.
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            self.client.get(f'{url}?expiry=1')
+            resp = self.client.get(f'{url}?expiry=1')
+        assert resp['X-Cache'] == 'MISS'
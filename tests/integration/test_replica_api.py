@@ -0,0 +1,46 @@
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITransactionTestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaAPITestCase(APITransactionTestCase, JWTMixin):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = factories.SuperUserFactory()
+        self.client = self.get_client(self.user)
+        self.company = factories.CompanyFactory()
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                resp = self.client.get(url)
+        return resp, primary, replica
+
+    def test_replica_reads(self):
+        resp, primary, replica = self.get(f'/api/company/{self.company.pk}/')
+        assert resp.status_code == 200
+        # Assert the Company is read from the replica, without opening a transaction on the primary database.
+        assert any('tracker_company' in q['sql'] for q in replica.captured_queries)
+        assert not any('tracker_company' in q['sql'] for q in primary.captured_queries)
+        assert not any(q['sql'].startswith('SAVEPOINT') for q in primary.captured_queries)
+
+    def test_read_your_writes(self):
+        resp = self.client.put(f'/api/company/{self.company.pk}/', {'name': 'Rivendell', 'description': 'Elves'})
+        assert resp.status_code == 200
+
+        # Assert the User reads their own writes from the primary database, while other Users use the replica.
+        resp, primary, replica = self.get(f'/api/company/{self.company.pk}/')
+        assert resp.data['name'] == 'Rivendell'
+        assert any('tracker_company' in q['sql'] for q in primary.captured_queries)
+        assert not replica.captured_queries
+
+        self.client = self.get_client(factories.UserFactory())
+        resp, primary, replica = self.get('/api/task/')
+        assert resp.status_code == 200
+        assert any('tracker_task' in q['sql'] for q in replica.captured_queries)
@@ -0,0 +1,70 @@
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.tracker.models import ENTRY_SEARCH_VECTOR, SEARCH_CONFIG, TASK_SEARCH_VECTOR, Entry, Task
+
+
+class SearchAPITestCase(APITestCase, JWTMixin):
+
+    def setUp(self):
+        self.base_url = '/api/search/'
+        self.user = factories.UserFactory()
+        self.client = self.get_client(self.user)
+        self.project = factories.ProjectFactory(name='Traverse Moria')
+        self.project.users.add(self.user)
+        other_project = factories.ProjectFactory(name='Defend Helm\'s Deep')
+
+        self.task = factories.TaskFactory(user=self.user, project=self.project, code='Moria-1', name='Cross the bridge',
+                                          description='Run from the Balrog across the bridge of Khazad-dum.')
+        self.other_task = factories.TaskFactory(user=self.user, project=self.project, code='Moria-2',
+                                                name='Read the book of Mazarbul', description='Drums in the deep.')
+        self.hidden_task = factories.TaskFactory(user=self.user, project=other_project, code='Helm-1',
+                                                 name='Hold the bridge', description='Guard the causeway.')
+        self.entry = factories.EntryFactory(task=self.other_task, comment='Bridges were broken, waited for Gandalf.')
+        gimli_task = factories.TaskFactory(user=factories.UserFactory(email='gimli@test.com'), project=self.project)
+        factories.EntryFactory(task=gimli_task, comment='Bridge crossed.')
+
+    def test_search(self):
+        resp = self.client.get(self.base_url, {'q': 'bridge'})
+        assert resp.status_code == 200
+        results = resp.json()['results']
+        # Assert Tasks of other Projects and Entries of other Users are excluded, and name matches rank highest.
+        assert [(result['kind'], result['id']) for result in results] == [
+            ('task', str(self.task.pk)), ('entry', str(self.entry.pk))
+        ]
+        assert results[1]['task_id'] == str(self.other_task.pk)
+        assert results[1]['project_id'] == str(self.project.pk)
+        assert results[0]['rank'] > results[1]['rank']
+
+        resp = self.client.get(self.base_url, {'q': '"book of mazarbul" -bridge'})
+        assert [result['id'] for result in resp.json()['results']] == [str(self.other_task.pk)]
+
+        resp = self.client.get(self.base_url, {'q': 'bridge', 'limit': 1, 'offset': 1})
+        assert resp.json()['count'] == 2
+        assert [result['id'] for result in resp.json()['results']] == [str(self.entry.pk)]
+
+        staff_client = self.get_client(factories.SuperUserFactory(email='gandalf@test.com'))
+        resp = staff_client.get(self.base_url, {'q': 'bridge'})
+        assert {result['id'] for result in resp.json()['results']} == {str(self.task.pk), str(self.hidden_task.pk)}
+
+    def test_search_validation(self):
+        resp = self.client.get(self.base_url)
+        assert resp.status_code == 400
+        assert resp.data['q']
+
+    def test_search_index(self):
+        # Assert the search vectors match the GIN indexes, so that searches do not scan the tables.
+        query = SearchQuery('bridge', config=SEARCH_CONFIG, search_type='websearch')
+        querysets = {
+            'tracker_task_search_idx': Task.objects.annotate(search=TASK_SEARCH_VECTOR).filter(search=query),
+            'tracker_entry_search_idx': Entry.objects.annotate(search=ENTRY_SEARCH_VECTOR).filter(search=query),
+        }
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            for index, queryset in querysets.items():
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN {sql}', params)
+                assert index in '\n'.join(row[0] for row in cursor.fetchall())
@@ -0,0 +1,217 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from tests import factories
+from tests.factories import SuperUserFactory
+from tests.utils import JWTMixin
+from work_tracker.apps.routers import COMPANY_SHARD_KEY, use_shard
+from work_tracker.apps.tracker.enums import EntryStatus, TaskStatus, TaskType, TimerAction
+from work_tracker.apps.tracker.management.commands import move_company
+from work_tracker.apps.tracker.models import Company, DeletionJob, Entry, Project, Task, TimerEvent
+
+
+@override_settings(DATABASE_SHARDS=['default', 'shard_1'])
+class ShardAPITestCase(APITestCase, JWTMixin):
+    databases = {'default', 'shard_1'}
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.client = self.get_client(self.user)
+
+    def create_company_data(self, company):
+        project = factories.ProjectFactory(company=company)
+        project.users.add(self.user)
+        task = factories.TaskFactory(user=self.user, project=project)
+        entry = factories.EntryFactory(task=task)
+        return project, task, entry
+
+    def test_shard_routing(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project, task, entry = self.create_company_data(company)
+        # Assert the Company's data is stored on its shard only.
+        assert Entry.objects.using('shard_1').filter(pk=entry.pk, task__project__company=company).exists()
+        assert not Project.objects.using('default').filter(pk=project.pk).exists()
+
+        # Assert requests naming the Company are served from its shard.
+        resp = self.client.get('/api/task/', HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 200
+        assert [t['id'] for t in resp.data] == [str(task.pk)]
+        resp = self.client.get(f'/api/entry/{entry.pk}/', HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 200
+        resp = self.client.get('/api/task/')
+        assert resp.status_code == 200
+        assert not resp.data
+        # Assert streamed lists are read from the shard, although they are read after the view returns.
+        resp = self.client.get('/api/task/', {'stream': 'true', 'expand': 'entries'}, HTTP_X_COMPANY=str(company.pk))
+        tasks = json.loads(b''.join(resp.streaming_content))
+        assert [(t['id'], [e['id'] for e in t['entries']]) for t in tasks] == [(str(task.pk), [str(entry.pk)])]
+
+    def test_shard_derived(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project, task, entry = self.create_company_data(company)
+
+        # Assert requests naming an object are served from the object's shard, without an 'X-Company' header.
+        resp = self.client.get(f'/api/entry/{entry.pk}/')
+        assert resp.status_code == 200
+        assert resp.data['id'] == str(entry.pk)
+        resp = self.client.get(f'/api/task/{task.pk}/')
+        assert resp.status_code == 200
+
+        # Assert writes are stored on the shard of the Project or Task they refer to.
+        client = self.get_client(factories.UserFactory(email='aragorn@test.com', is_staff=True))
+        data = {'user_id': self.user.pk.hex, 'project_id': project.pk.hex, 'name': 'Cross the Anduin', 'code': 'Boats',
+                'type': TaskType.FEATURE.name, 'description': 'Paddle south.'}
+        resp = client.post('/api/task/', data)
+        assert resp.status_code == 201
+        assert Task.objects.using('shard_1').filter(pk=resp.data['id'], project=project).exists()
+        assert not Task.objects.using('default').filter(pk=resp.data['id']).exists()
+        data = {'description': 'Hold the bridge.', 'status': TaskStatus.COMPLETED.name}
+        resp = client.put(f'/api/task/{task.pk}/', data)
+        assert resp.status_code == 200
+        assert Task.objects.using('shard_1').get(pk=task.pk).description == 'Hold the bridge.'
+
+    def test_events_shard(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project, task, _ = self.create_company_data(company)
+            entry = factories.EntryFactory(task=task, status=EntryStatus.ACTIVE, end_time=None)
+        other_task = factories.TaskFactory(user=self.user)
+        other_task.project.users.add(self.user)
+
+        # Assert timer events are applied on the shard of the Entries they name.
+        events = [{'key': uuid4(), 'action': TimerAction.PAUSE.name, 'entry_id': entry.pk,
+                   'entry_time': timezone.now()}]
+        resp = self.client.post('/api/entry/events/', {'events': events}, format='json')
+        assert resp.status_code == 200
+        assert resp.data['results'][0]['status_code'] == 200
+        assert TimerEvent.objects.using('shard_1').filter(entry_id=entry.pk, task=task).exists()
+
+        # Assert batches spanning several Companies are rejected, rather than applied on a single shard.
+        events.append({'key': uuid4(), 'action': TimerAction.START.name, 'task_id': other_task.pk,
+                       'entry_time': timezone.now()})
+        resp = self.client.post('/api/entry/events/', {'events': events}, format='json')
+        assert resp.status_code == 400
+        assert str(resp.data['events']) == 'The events of a batch must belong to a single Company.'
+
+    def test_company_header(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            self.create_company_data(company)
+        other_company = factories.CompanyFactory(shard='shard_1')
+
+        # Assert Users may only name Companies whose Projects they are involved in.
+        resp = self.client.get('/api/task/', HTTP_X_COMPANY=str(other_company.pk))
+        assert resp.status_code == 403
+        client = self.get_client(factories.UserFactory(email='gimli@test.com'))
+        resp = client.get('/api/task/', HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 403
+        resp = self.get_client(SuperUserFactory()).get('/api/task/', HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 200
+        assert len(resp.data) == 1
+
+    def test_admin_shard(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project, task, entry = self.create_company_data(company)
+        admin_user = SuperUserFactory()
+        self.client.login(email=admin_user.email, password=admin_user._PASSWORD)
+
+        # Assert the admin changes objects on their shard, and adds objects to the shard of their Task.
+        resp = self.client.get(reverse('admin:tracker_task_change', args=(task.pk,)))
+        assert resp.status_code == 200
+        start_time = timezone.now() - timedelta(hours=2)
+        data = {
+            'task': task.pk.hex, 'start_time_0': start_time.date(), 'start_time_1': start_time.time(),
+            'end_time_0': timezone.now().date(), 'end_time_1': timezone.now().time(), 'comment': 'Shard one.',
+        }
+        resp = self.client.post(reverse('admin:tracker_entry_add'), data)
+        assert resp.status_code == 302
+        assert Entry.objects.using('shard_1').filter(task=task, comment='Shard one.').exists()
+        assert not Entry.objects.using('default').filter(comment='Shard one.').exists()
+
+    def test_move_company(self):
+        company = factories.CompanyFactory()
+        project, task, entry = self.create_company_data(company)
+        other_project = factories.ProjectFactory(name='Moria')
+        # Failed events have no Entry, but move along with their Task.
+        failed_event = TimerEvent.objects.create(
+            user=self.user, key=uuid4(), action=TimerAction.START, task=task, status_code=400
+        )
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            call_command('move_company', str(company.pk), 'shard_1', batch_size=1, stdout=None)
+        # Assert only the moved Company and its rows are locked, leaving other Companies writable.
+        locks = [query['sql'] for query in queries if 'FOR UPDATE' in query['sql']]
+        assert any(sql.startswith('SELECT "tracker_company"."id"') for sql in locks)
+        assert all(str(company.pk) in sql for sql in locks)
+        assert not any(query['sql'].startswith('LOCK') for query in queries)
+
+        company.refresh_from_db()
+        assert company.shard == 'shard_1'
+        assert not Task.objects.using('default').filter(pk=task.pk).exists()
+        assert Project.objects.using('default').filter(pk=other_project.pk).exists()
+        assert not TimerEvent.objects.using('default').exists()
+        assert TimerEvent.objects.using('shard_1').filter(pk=failed_event.pk).exists()
+        with use_shard('shard_1'):
+            moved_project = Project.objects.get(pk=project.pk)
+            assert list(moved_project.users.all()) == [self.user]
+            assert Entry.objects.get(pk=entry.pk).task_id == task.pk
+
+        resp = self.client.get(f'/api/entry/{entry.pk}/', HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 200
+
+    def test_move_company_writes(self):
+        company = factories.CompanyFactory()
+        project, task, entry = self.create_company_data(company)
+        copy_late = move_company.Command.copy_late
+
+        def write_late(command, model, queryset, target, since):
+            # Write to the source shard after the switch, as a request blocked by the move's locks would.
+            if model is Project:
+                Task.objects.using('default').filter(pk=task.pk).update(
+                    description='Written late.', modified_at=timezone.now()
+                )
+            copy_late(command, model, queryset, target, since)
+
+        with patch.object(move_company.Command, 'copy_late', autospec=True, side_effect=write_late):
+            call_command('move_company', str(company.pk), 'shard_1', stdout=None)
+        # Assert writes reaching the source shard after the switch are kept.
+        assert Task.objects.using('shard_1').get(pk=task.pk).description == 'Written late.'
+        assert not Task.objects.using('default').filter(pk=task.pk).exists()
+
+        # Assert API writes routed to the old shard are rejected, rather than written to it.
+        cache.set(COMPANY_SHARD_KEY.format(company.pk), 'default')
+        client = self.get_client(factories.UserFactory(email='aragorn@test.com', is_staff=True))
+        data = {'description': 'Hold the bridge.', 'status': TaskStatus.COMPLETED.name}
+        resp = client.put(f'/api/task/{task.pk}/', data, HTTP_X_COMPANY=str(company.pk))
+        assert resp.status_code == 503
+        assert Task.objects.using('shard_1').get(pk=task.pk).description == 'Written late.'
+
+    def test_delete_company(self):
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            project, task, entry = self.create_company_data(company)
+        client = self.get_client(factories.UserFactory(email='aragorn@test.com', is_staff=True))
+
+        # Assert the Company's data is deleted from its shard, along with the Company's copies.
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = client.delete(f'/api/company/{company.pk}/')
+        assert resp.status_code == 202
+        assert not Company.objects.using('default').filter(pk=company.pk).exists()
+        assert not Company.objects.using('shard_1').filter(pk=company.pk).exists()
+        for model, obj in ((Project, project), (Task, task), (Entry, entry)):
+            assert not model.objects.using('shard_1').filter(pk=obj.pk).exists()
+        assert DeletionJob.objects.get().deleted == 4
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.tracker.enums import EntryStatus
+from work_tracker.apps.tracker.models import Entry
+
+
+@override_settings(SYNC_WINDOW_SECONDS=0)
+class SyncAPITestCase(APITestCase, JWTMixin):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.client = self.get_client(self.user)
+        self.company = factories.CompanyFactory()
+        self.project = factories.ProjectFactory(company=self.company)
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+
+    def test_entry_sync(self):
+        entry_1 = factories.EntryFactory(task=self.task)
+        entry_2 = factories.EntryFactory(task=self.task)
+        # Entries of other Users are not part of the requesting User's feed.
+        other_task = factories.TaskFactory(user=factories.UserFactory(email='gollum@test.com'), project=self.project)
+        factories.EntryFactory(task=other_task)
+
+        resp = self.client.get('/api/entry/sync/')
+        assert resp.status_code == 200
+        assert {e['id'] for e in resp.data['upserts']} == {str(entry_1.pk), str(entry_2.pk)}
+        assert not resp.data['tombstones']
+        assert not resp.data['has_more']
+        cursor = resp.data['cursor']
+
+        # Assert an unchanged feed returns nothing.
+        resp = self.client.get('/api/entry/sync/', {'since': cursor})
+        assert resp.status_code == 200
+        assert not resp.data['upserts']
+        assert resp.data['cursor'] == cursor
+
+        # Assert only changed and removed entries are returned after the cursor.
+        entry_1.status = EntryStatus.PAUSED
+        entry_1.save()
+        entry_2_id = entry_2.pk
+        entry_2.delete()
+        resp = self.client.get('/api/entry/sync/', {'since': cursor})
+        assert resp.status_code == 200
+        assert [e['id'] for e in resp.data['upserts']] == [str(entry_1.pk)]
+        assert resp.data['upserts'][0]['status'] == EntryStatus.PAUSED.name
+        assert [(t['model'], t['id']) for t in resp.data['tombstones']] == [('entry', str(entry_2_id))]
+
+    def test_entry_sync_moved(self):
+        entries = [factories.EntryFactory(task=self.task) for _ in range(3)]
+        other_user = factories.UserFactory(email='gollum@test.com')
+        other_client = self.get_client(other_user)
+        cursor = self.client.get('/api/entry/sync/').data['cursor']
+        other_cursor = other_client.get('/api/entry/sync/').data['cursor']
+
+        # Assert the previous owner of an Entry moved to another User's Task is told to drop it.
+        entries[0].task = factories.TaskFactory(user=other_user, project=self.project)
+        entries[0].save()
+        resp = self.client.get('/api/entry/sync/', {'since': cursor})
+        assert not resp.data['upserts']
+        assert [t['id'] for t in resp.data['tombstones']] == [str(entries[0].pk)]
+        cursor = resp.data['cursor']
+
+        # Assert reassigning a Task moves its Entries to the new owner's feed.
+        self.task.user = other_user
+        self.task.save()
+        resp = self.client.get('/api/entry/sync/', {'since': cursor})
+        assert {t['id'] for t in resp.data['tombstones']} == {str(entries[1].pk), str(entries[2].pk)}
+        resp = other_client.get('/api/entry/sync/', {'since': other_cursor})
+        assert {e['id'] for e in resp.data['upserts']} == {str(entry.pk) for entry in entries}
+        assert not resp.data['tombstones']
+
+    @override_settings(SYNC_WINDOW_SECONDS=60)
+    def test_sync_window(self):
+        entry = factories.EntryFactory(task=self.task)
+        resp = self.client.get('/api/entry/sync/')
+        assert [e['id'] for e in resp.data['upserts']] == [str(entry.pk)]
+        cursor = resp.data['cursor']
+
+        # Assert Entries stamped before the last synced Entry, but committed after the sync, are synced as well.
+        late_entry = factories.EntryFactory(task=self.task)
+        Entry.objects.filter(pk=late_entry.pk).update(modified_at=entry.modified_at - timedelta(seconds=1))
+        resp = self.client.get('/api/entry/sync/', {'since': cursor})
+        assert {e['id'] for e in resp.data['upserts']} == {str(entry.pk), str(late_entry.pk)}
+        assert not resp.data['has_more']
+
+    def test_sync_pagination(self):
+        for i in range(5):
+            factories.CompanyFactory(name=f'Company {i}')
+
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            params = {'limit': 2, 'since': cursor} if cursor else {'limit': 2}
+            resp = self.client.get('/api/company/sync/', params)
+            assert resp.status_code == 200
+            assert len(resp.data['upserts']) <= 2
+            seen += [c['id'] for c in resp.data['upserts']]
+            cursor, has_more = resp.data['cursor'], resp.data['has_more']
+        assert len(seen) == len(set(seen)) == 6
+
+    def test_sync_tombstones(self):
+        resp = self.client.get('/api/task/sync/')
+        cursor = resp.data['cursor']
+
+        task_id = self.task.pk
+        self.task.delete()
+        user = factories.UserFactory(email='boromir@test.com')
+        user.is_active = False
+        user.deactivated_at = timezone.now()
+        user.save()
+
+        resp = self.client.get('/api/task/sync/', {'since': cursor})
+        assert resp.status_code == 200
+        assert not resp.data['upserts']
+        tombstones = [(t['model'], t['id']) for t in resp.data['tombstones']]
+        assert tombstones == [('task', str(task_id)), ('user', str(user.pk))]
+
+    def test_sync_validation(self):
+        resp = self.client.get('/api/project/sync/', {'since': 'not-a-cursor'})
+        assert resp.status_code == 400
+        assert str(resp.data['since'][0]) == 'Invalid sync cursor.'
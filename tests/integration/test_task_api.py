@@ -1,10 +1,14 @@
 from copy import deepcopy
+from unittest.mock import patch
 from uuid import uuid4
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from tests import factories
 from tests.utils import JWTMixin
+from work_tracker.apps.api.filters import QueryParamFilter
 from work_tracker.apps.tracker.enums import EntryStatus, TaskStatus, TaskType
 from work_tracker.apps.tracker.models import Task
 
@@ -70,6 +74,56 @@ class TaskAPITestCase(APITestCase, JWTMixin):
         assert resp.status_code == 200
         assert len(resp.data) == Task.objects.count()
 
+    def test_task_list_filters(self):
+        other_user = factories.UserFactory(email='gimli@test.com')
+        project = factories.ProjectFactory(company=self.company, name='Traverse Moria')
+        task_2 = factories.TaskFactory(user=other_user, name='Through Moria', code='Moria-1', project=project,
+                                       type=TaskType.BUG, status=TaskStatus.IN_PROGRESS)
+        task_3 = factories.TaskFactory(user=self.user, name='Cross the bridge', code='Moria-2', project=project)
+
+        def get_ids(params):
+            resp = self.client.get(self.base_url, params)
+            assert resp.status_code == 200
+            return {task['id'] for task in resp.json()}
+
+        assert get_ids({'project': project.pk}) == {str(task_2.pk), str(task_3.pk)}
+        assert get_ids({'assignee': self.user.pk}) == {str(self.task.pk), str(task_3.pk)}
+        assert get_ids({'status': TaskStatus.IN_PROGRESS.name}) == {str(task_2.pk)}
+        assert get_ids({'type': TaskType.BUG.name, 'project': self.project.pk}) == set()
+        resp = self.client.get(self.base_url, {'ordering': '-code', 'project': project.pk})
+        assert [task['code'] for task in resp.json()] == ['Moria-2', 'Moria-1']
+
+        resp = self.client.get(self.base_url, {'type': 'EPIC'})
+        assert resp.status_code == 400
+
+    def test_task_list_expand(self):
+        entry = factories.EntryFactory(task=self.task)
+
+        resp = self.client.get(self.base_url)
+        assert 'entries' not in resp.json()[0]
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.base_url, {'fields': 'id,code', 'expand': 'entries'})
+        assert resp.status_code == 200
+        # Assert the Tasks are loaded without joins and their Entries using a single prefetch.
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('SELECT "tracker_task"', 'SELECT "tracker_entry"'))
+        ]
+        assert len(selects) == 2
+        assert selects[0].startswith('SELECT "tracker_task"."id", "tracker_task"."code" FROM "tracker_task" ORDER')
+        assert selects[1].startswith('SELECT "tracker_entry"."id"') and '"comment"' not in selects[1]
+        assert set(resp.json()[0]) == {'id', 'code', 'entries'}
+        assert [item['id'] for item in resp.json()[0]['entries']] == [str(entry.pk)]
+        assert resp.json()[0]['entries'][0]['user'] == self.user.email
+
+        # Assert Users outside the Task's Project see none of its Entries.
+        client = self.get_client(factories.UserFactory(email='gimli@test.com'))
+        resp = client.get(self.base_url, {'expand': 'entries'})
+        assert resp.status_code == 200
+        assert [(task['id'], task['entries']) for task in resp.json()] == [(str(self.task.pk), [])]
+        resp = client.get(self.base_url, {'fields': 'id,entries', 'expand': 'entries'})
+        assert [task['entries'] for task in resp.json()] == [[]]
+
     def test_task_create(self):
         client = self.get_client(self.staff_user)
         resp = client.post(self.base_url, self.create_data)
@@ -133,3 +187,32 @@ class TaskAPITestCase(APITestCase, JWTMixin):
         resp = self.client.put(url, data)
         assert resp.status_code == 403
         assert str(resp.data['detail']) == 'Only staff users may access this functionality.'
+
+    def test_task_list_filtered_once(self):
+        filter_queryset = QueryParamFilter.filter_queryset
+        with patch.object(QueryParamFilter, 'filter_queryset', autospec=True, side_effect=filter_queryset) as mock:
+            resp = self.client.get(self.base_url, {'status': TaskStatus.NEW.name})
+        assert resp.status_code == 200
+        assert [task['id'] for task in resp.data] == [str(self.task.pk)]
+        # Assert the list is filtered once, for both its ETag and its content.
+        assert mock.call_count == 1
+
+    def test_task_detail_conditional(self):
+        url = f'{self.base_url}{self.task.pk.hex}/'
+        resp = self.client.get(url)
+        etag = resp['ETag']
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # Assert changes to the task's entries are reflected in the ETag.
+        entry = factories.EntryFactory(task=self.task)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        etag = resp['ETag']
+        entry.delete()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert not resp.data['entries']
+
+        # Assert ETags are not shared between Users.
+        client = self.get_client(self.staff_user)
+        assert client.get(url, HTTP_IF_NONE_MATCH=resp['ETag']).status_code == 200
@@ -100,6 +100,16 @@ class UserAPITestCase(APITestCase, JWTMixin):
         assert resp.status_code == 200
         assert resp.data['status'] == 'success'
         assert resp.data['message'] == 'Your password has successfully been updated.'
+        assert resp.data['data']['token'] == resp.data['data']['access']
+        assert user.token_revocation.revoked_at
+
+        # Assert tokens issued before the change are revoked, even within the same second, unlike the new pair.
+        assert client.put(url, update_data).status_code == 401
+        tokens = resp.data['data']
+        resp = self.client.post(reverse('api:auth-token-refresh'), {'refresh': tokens['refresh']})
+        assert resp.status_code == 200
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        assert client.put(url, {'current_password': new_password, 'new_password': current_password}).status_code == 200
 
     def test_user_update_password_validation(self):
         current_password = new_password = 'SamTheGardener12!'
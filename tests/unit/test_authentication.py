@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tests import factories
+from work_tracker.apps.api.authentication import USER_CACHE_FIELDS, CachedJWTAuthentication
+from work_tracker.apps.api.revocation import REVOCATION_LABEL, BloomFilter, revocation_list
+from work_tracker.apps.tracker.versions import get_user_version, get_versions
+from work_tracker.apps.users.models import TokenRevocation
+
+
+class TestCachedJWTAuthentication(TestCase):
+
+    def setUp(self):
+        CachedJWTAuthentication.local_cache.clear()
+        self.user = factories.UserFactory()
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.authentication = CachedJWTAuthentication()
+
+    def test_user_cached(self):
+        with self.assertNumQueries(1):
+            user = self.authentication.get_user(self.token)
+        assert user == self.user
+
+        # Assert a warm token needs no queries, and returns an instance of its own.
+        with self.assertNumQueries(0):
+            cached_user = self.authentication.get_user(self.token)
+            assert (cached_user.email, cached_user.is_staff) == (self.user.email, self.user.is_staff)
+        assert cached_user == self.user
+        assert cached_user is not user
+        cached_user.is_staff = True
+        assert self.authentication.get_user(self.token).is_staff is False
+        # Assert only the fields needed for authentication are cached, other fields are loaded when accessed.
+        assert set(cache.get(f'auth-user:{self.user.pk}:{get_user_version(self.user.pk)}')) == set(USER_CACHE_FIELDS)
+        assert cached_user.rate == self.user.rate
+
+        # Assert the shared cache is used by other processes.
+        CachedJWTAuthentication.local_cache.clear()
+        with self.assertNumQueries(0):
+            assert self.authentication.get_user(self.token) == self.user
+
+    def test_user_invalidated(self):
+        self.authentication.get_user(self.token)
+        self.user.rate = 250
+        self.user.save()
+        with self.assertNumQueries(1):
+            user = self.authentication.get_user(self.token)
+        assert user.rate == 250
+
+        # Assert soft deleted Users are no longer authenticated.
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+
+class TestTokenRevocation(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.authentication = CachedJWTAuthentication()
+
+    def get_token(self, issued_at):
+        token = RefreshToken.for_user(self.user).access_token
+        token.set_iat(at_time=issued_at)
+        return str(token)
+
+    def test_bloom_filter(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [str(i) for i in range(1000)]
+        for value in values:
+            bloom_filter.add(value)
+        assert all(value in bloom_filter for value in values)
+        # Assert the false positive rate is close to the configured error rate.
+        false_positives = sum(str(i) in bloom_filter for i in range(1000, 11000))
+        assert false_positives < 200
+
+    def test_token_revoked(self):
+        token = self.get_token(timezone.now() - timedelta(minutes=1))
+        revocation_list.refresh()
+        # Assert tokens of Users without revocations are accepted without database access.
+        with self.assertNumQueries(0):
+            assert not revocation_list.is_revoked(self.authentication.get_validated_token(token))
+
+        TokenRevocation.objects.revoke(self.user)
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(token)
+        # Assert tokens issued after the revocation are accepted.
+        self.authentication.get_validated_token(self.get_token(timezone.now() + timedelta(seconds=1)))
+
+    def test_filter_rebuilt(self):
+        token = self.get_token(timezone.now() - timedelta(minutes=1))
+        revocation_list.refresh()
+        TokenRevocation.objects.revoke(self.user)
+        # Assert revocations whose version change went unnoticed are picked up when the filter is rebuilt.
+        revocation_list.version = get_versions(REVOCATION_LABEL)[REVOCATION_LABEL]
+        assert not revocation_list.is_revoked(self.authentication.get_validated_token(token))
+        revocation_list.built_at -= revocation_list.rebuild_interval
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(token)
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase, override_settings
+
+from work_tracker.apps.api.checks import check_shared_cache
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+SHARED_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache'}}
+
+
+class TestSharedCacheCheck(SimpleTestCase):
+
+    @override_settings(CACHES=LOCAL_CACHE, DEBUG=False)
+    def test_local_cache(self):
+        errors = check_shared_cache(None)
+        assert [error.id for error in errors] == ['api.E001']
+        assert 'JWT revocation' in errors[0].msg
+        assert 'membership claims' not in errors[0].msg
+        assert 'read replica pins' not in errors[0].msg
+        with override_settings(JWT_MEMBERSHIP_CLAIMS=True, DATABASE_REPLICAS=['replica']):
+            errors = check_shared_cache(None)
+        assert 'JWT membership claims' in errors[0].msg
+        assert 'read replica pins' in errors[0].msg
+
+    def test_allowed_caches(self):
+        # Assert shared caches pass, as do local caches of single-process development servers.
+        with override_settings(CACHES=SHARED_CACHE, DEBUG=False):
+            assert check_shared_cache(None) == []
+        with override_settings(CACHES=LOCAL_CACHE, DEBUG=True):
+            assert check_shared_cache(None) == []
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import LazySettings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.client import RequestFactory
+
+from tests import factories
+from tests.utils import JWTMixin
+from work_tracker.apps.api.components.tracker.views import EntryViewSet
+from work_tracker.apps.api.handlers import (
+    APIASGIDispatcher,
+    APIASGIHandler,
+    APIDispatcher,
+    APIWSGIHandler,
+    AsyncReadASGIHandler,
+)
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class TestAPIDispatcher(TestCase):
+
+    def setUp(self):
+        # Keep the test transaction open between requests, as the test client does.
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def request(self, application, path):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response.update(status=status, headers=dict(headers))
+
+        b''.join(application(RequestFactory().get(path, HTTP_HOST='localhost').environ, start_response))
+        return response
+
+    def test_lean_middleware(self):
+        # Assert the global settings are never modified, as other handlers may be loading their middleware.
+        with patch.object(LazySettings, '__setattr__', side_effect=AssertionError('Settings modified.')):
+            handler = APIWSGIHandler()
+            async_handler = APIASGIHandler()
+        assert len(handler._view_middleware) < len(WSGIHandler()._view_middleware)
+        assert async_handler._middleware_chain is not None
+
+    def test_dispatch(self):
+        application = APIDispatcher(WSGIHandler())
+        # Assert API requests skip the full middleware stack, whereas the docs keep it.
+        resp = self.request(application, '/api/company/')
+        assert resp['status'].startswith('401')
+        assert 'X-Frame-Options' not in resp['headers']
+        resp = self.request(application, '/api/docs/')
+        assert 'X-Frame-Options' in resp['headers']
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_middleware', requests=2, stdout=out)
+        assert 'saved:' in out.getvalue()
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class TestAsyncReadASGIHandler(TransactionTestCase, JWTMixin):
+    """
+    Async views run on other threads, which only see committed data.
+    """
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.task = factories.TaskFactory(user=self.user)
+        self.task.project.users.add(self.user)
+        self.entries = [factories.EntryFactory(task=self.task) for _ in range(3)]
+
+    def request(self, application, path, method='GET', query=''):
+        return asyncio.run(self.arequest(application, path, method=method, query=query))
+
+    async def arequest(self, application, path, method='GET', query='', delay=0):
+        messages = []
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'server': ('localhost', 80),
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {self.get_token(self.user)}'.encode())],
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+            # Slow clients keep their streams open while other requests are served.
+            await asyncio.sleep(delay)
+
+        await application(scope, receive, send)
+        return messages[0]['status'], b''.join(message.get('body', b'') for message in messages[1:])
+
+    def test_resolve_request(self):
+        handler = AsyncReadASGIHandler()
+        # Assert only the safe requests to the ViewSet's async actions are served by async views.
+        for method, path, is_async in (
+            ('GET', '/api/entry/', True), ('GET', '/api/entry/report/', True), ('POST', '/api/entry/', False),
+            ('GET', '/api/dashboard/', False),
+        ):
+            request = RequestFactory().generic(method, path)
+            match = handler.resolve_request(request)
+            assert asyncio.iscoroutinefunction(match.func) is is_async
+            assert request.resolver_match.func is match.func
+
+    def test_async_views(self):
+        status, body = self.request(AsyncReadASGIHandler(), '/api/entry/')
+        assert status == 200
+        assert sorted(entry['id'] for entry in json.loads(body)) == sorted(str(entry.pk) for entry in self.entries)
+
+        # Assert streamed lists are read from the database off the event loop's thread.
+        status, body = self.request(APIASGIDispatcher(AsyncReadASGIHandler()), '/api/entry/', query='stream=1')
+        assert status == 200
+        assert len(json.loads(body)) == 3
+
+        status, body = self.request(AsyncReadASGIHandler(), f'/api/task/{self.task.pk}/')
+        assert status == 200
+        assert len(json.loads(body)['entries']) == 3
+
+    @override_settings(ASYNC_VIEW_THREADS=1)
+    def test_concurrent_streams(self):
+        handler = AsyncReadASGIHandler()
+
+        async def stream(index):
+            await asyncio.sleep(index / 10)
+            return await self.arequest(handler, '/api/entry/', query='stream=1', delay=0.05)
+
+        async def stream_all():
+            return await asyncio.gather(*(stream(index) for index in range(4)))
+
+        # Assert concurrent streams, read one Entry at a time while other requests run on the async views' threads,
+        # keep their cursors open until they finish.
+        with patch.object(EntryViewSet, 'stream_chunk_size', 1):
+            responses = asyncio.run(stream_all())
+        for status, body in responses:
+            assert status == 200
+            assert sorted(entry['id'] for entry in json.loads(body)) == sorted(str(entry.pk) for entry in self.entries)
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_asgi', path='/api/entry/', requests=4, threads=2, latency=0, email=self.user.email, stdout=out
+        )
+        assert 'status 200' in out.getvalue()
+        assert 'with 2 workers of 2 threads' in out.getvalue()
+        assert 'speedup:' in out.getvalue()
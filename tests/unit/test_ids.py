@@ -0,0 +1,36 @@
+from io import StringIO
+from uuid import UUID
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tests import factories
+from work_tracker.apps.tracker.ids import time_ordered_id, uuid7
+from work_tracker.apps.tracker.models import Entry
+
+
+class TestTimeOrderedIds(TestCase):
+
+    def test_uuid7(self):
+        ids = [uuid7() for _ in range(1000)]
+        assert all(value.version == 7 and value.variant == 'specified in RFC 4122' for value in ids)
+        assert len(set(ids)) == len(ids)
+        # Assert ids are ordered by their creation time, up to a fraction of a millisecond.
+        assert all(a.int >> 80 <= b.int >> 80 for a, b in zip(ids, ids[1:]))
+
+    def test_time_ordered_id(self):
+        assert time_ordered_id().version == 7
+        with override_settings(TIME_ORDERED_IDS=False):
+            assert time_ordered_id().version == 4
+
+    def test_mixed_ids(self):
+        entry = factories.EntryFactory()
+        assert entry.pk.version == 7
+        legacy_entry = factories.EntryFactory(id=UUID('4e5b2b7a-3f5d-4c6e-9a1b-2c3d4e5f6a7b'), task=entry.task)
+        assert set(Entry.objects.values_list('id', flat=True)) == {entry.pk, legacy_entry.pk}
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_ids', rows=200, batch_size=50, stdout=out)
+        assert 'uuid4:' in out.getvalue()
+        assert 'uuid7:' in out.getvalue()
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.utils import timezone
+
+from tests import factories
+from work_tracker.apps.tracker.models import Entry
+from work_tracker.apps.tracker.partitions import (
+    add_months,
+    get_partitions,
+    is_partitioned,
+    partition_name,
+    partition_table,
+    unpartition_table,
+)
+
+
+class TestEntryPartitions(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        self.current = now.date().replace(day=1)
+        self.old_entry = factories.EntryFactory(start_time=now - timedelta(days=100))
+        self.entry = factories.EntryFactory(task=self.old_entry.task, start_time=now)
+
+    def get_partition(self, entry):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM tracker_entry WHERE id = %s', [entry.pk])
+            return cursor.fetchone()[0]
+
+    def test_partition_table(self):
+        partition_table(connection)
+        assert is_partitioned(connection)
+        partitions = dict(get_partitions(connection))
+        assert partition_name(add_months(self.current, 3)) in partitions
+
+        # Assert Entries are stored in the partition of their month, and remain accessible through the ORM.
+        assert self.get_partition(self.old_entry) == partition_name(self.old_entry.start_time.date())
+        assert self.get_partition(self.entry) == partition_name(self.current)
+        self.entry.start_time -= timedelta(days=100)
+        self.entry.save()
+        assert set(Entry.objects.values_list('id', flat=True)) == {self.old_entry.pk, self.entry.pk}
+        assert self.get_partition(self.entry) == self.get_partition(self.old_entry)
+
+        # Assert date-filtered queries only scan the matching partitions.
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN SELECT * FROM tracker_entry WHERE start_time >= %s', [timezone.now()])
+            plan = ' '.join(row[0] for row in cursor.fetchall())
+        assert partition_name(self.current) in plan
+        assert partition_name(self.old_entry.start_time.date()) not in plan
+
+        unpartition_table(connection)
+        assert not is_partitioned(connection)
+        assert Entry.objects.count() == 2
+
+    def test_entry_id_unique(self):
+        partition_table(connection)
+        # Assert Entry ids remain unique, although the partitioned table's primary key includes 'start_time'.
+        entry = Entry(id=self.old_entry.pk, task=self.entry.task, start_time=self.entry.start_time)
+        with self.assertRaises(IntegrityError):
+            entry.save()
+        assert Entry.objects.filter(pk=self.old_entry.pk).count() == 1
+        self.entry.comment = 'Updated.'
+        self.entry.save()
+        assert Entry.objects.get(pk=self.entry.pk).comment == 'Updated.'
+
+    def test_maintain_partitions(self):
+        out = StringIO()
+        call_command('maintain_entry_partitions', database=['default'], stdout=out)
+        assert 'not partitioned' in out.getvalue()
+
+        partition_table(connection, months_ahead=1)
+        call_command('maintain_entry_partitions', database=['default'], months_ahead=2, stdout=out)
+        assert partition_name(add_months(self.current, 2)) in out.getvalue()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE indexdef LIKE '%%USING brin%%'")
+            indexes = [row[0] for row in cursor.fetchall()]
+        assert f'{partition_name(self.old_entry.start_time.date())}_start_brin' in indexes
+        assert f'{partition_name(add_months(self.current, -1))}_start_brin' not in indexes
+        assert f'{partition_name(self.current)}_start_brin' not in indexes
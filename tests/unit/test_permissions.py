@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests import factories
+from work_tracker.apps.api.components.users.serializers import MembershipTokenRefreshSerializer
+from work_tracker.apps.api.permissions import MembershipIndex, ProjectSpecificTasks, UserSpecificEntries
+from work_tracker.apps.api.tokens import decode_ids, encode_ids, get_membership_claims, get_token_for_user
+from work_tracker.apps.routers import use_shard
+
+
+class TestMembershipIndex(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.project.users.add(self.user)
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+        other_user = factories.UserFactory(email='gollum@test.com')
+        self.other_task = factories.TaskFactory(user=other_user, project=factories.ProjectFactory(name='Moria'))
+
+    def get_request(self, user):
+        request = Request(APIRequestFactory().get('/'))
+        request.user, request.auth = user, None
+        return request
+
+    def test_membership_loaded_once(self):
+        request = self.get_request(self.user)
+        entries = [factories.EntryFactory(task=self.task), factories.EntryFactory(task=self.other_task)]
+
+        # Assert each set of ids is loaded with a single query, shared by every check made during the request.
+        with self.assertNumQueries(1):
+            assert ProjectSpecificTasks().has_object_permission(request, None, self.task)
+            assert not ProjectSpecificTasks().has_object_permission(request, None, self.other_task)
+        # Assert Entries are checked against their owner without any query.
+        with self.assertNumQueries(0):
+            assert UserSpecificEntries().has_object_permission(request, None, entries[0])
+            assert not UserSpecificEntries().has_object_permission(request, None, entries[1])
+        # Assert the index is shared by every DRF Request wrapping the same HttpRequest.
+        other_request = Request(request._request)
+        other_request.user, other_request.auth = self.user, None
+        assert MembershipIndex.for_request(other_request) is MembershipIndex.for_request(request)
+
+    def test_membership_staff(self):
+        request = self.get_request(factories.SuperUserFactory())
+        with self.assertNumQueries(0):
+            assert ProjectSpecificTasks().has_object_permission(request, None, self.other_task)
+
+
+@override_settings(JWT_MEMBERSHIP_CLAIMS=True)
+class TestMembershipClaims(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.project.users.add(self.user)
+        self.task = factories.TaskFactory(user=self.user, project=self.project)
+        self.other_task = factories.TaskFactory(user=self.user, project=factories.ProjectFactory(name='Moria'))
+
+    def get_request(self, token):
+        request = Request(APIRequestFactory().get('/'))
+        request.user, request.auth = self.user, token
+        return request
+
+    def test_encode_ids(self):
+        ids = {self.project.pk, self.task.pk}
+        assert decode_ids(encode_ids(ids)) == ids
+        assert len(encode_ids(ids)) == 43
+        assert decode_ids(encode_ids([])) == set()
+
+    def test_membership_claims(self):
+        token = get_token_for_user(self.user).access_token
+        assert token['staff'] is False
+        assert get_membership_claims(token) == {'is_staff': False, 'project_ids': {self.project.pk}}
+
+        # Assert permission checks are made against the token's claims, without database access.
+        with self.assertNumQueries(0):
+            request = self.get_request(token)
+            assert ProjectSpecificTasks().has_object_permission(request, None, self.task)
+            assert not ProjectSpecificTasks().has_object_permission(request, None, self.other_task)
+
+    def test_membership_claims_outdated(self):
+        refresh = get_token_for_user(self.user)
+        token = refresh.access_token
+        self.other_task.project.users.add(self.user)
+
+        # Assert membership changes outdate the token, falling back to the database.
+        assert get_membership_claims(token) is None
+        assert cache.get(f'model-modified:membership:{self.user.pk}') is None
+        with self.assertNumQueries(1):
+            assert ProjectSpecificTasks().has_object_permission(self.get_request(token), None, self.other_task)
+
+        # Assert refreshing the token re-issues the claims.
+        serializer = MembershipTokenRefreshSerializer(data={'refresh': str(refresh)})
+        serializer.is_valid(raise_exception=True)
+        token = AccessToken(serializer.validated_data['access'])
+        assert get_membership_claims(token)['project_ids'] == {self.project.pk, self.other_task.project_id}
+
+    @override_settings(JWT_MEMBERSHIP_MAX_PROJECTS=1)
+    def test_membership_claims_limit(self):
+        self.other_task.project.users.add(self.user)
+        token = get_token_for_user(self.user).access_token
+        assert 'prj' not in token
+        assert get_membership_claims(token) is None
+
+
+@override_settings(JWT_MEMBERSHIP_CLAIMS=True, DATABASE_SHARDS=['default', 'shard_1'])
+class TestMembershipClaimsShards(TestCase):
+    databases = {'default', 'shard_1'}
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.project.users.add(self.user)
+        company = factories.CompanyFactory(shard='shard_1')
+        with use_shard('shard_1'):
+            self.shard_project = factories.ProjectFactory(name='Moria', company=company)
+            self.shard_project.users.add(self.user)
+
+    def test_membership_claims_shards(self):
+        # Assert the claims include the Projects of every shard.
+        token = get_token_for_user(self.user).access_token
+        assert get_membership_claims(token)['project_ids'] == {self.project.pk, self.shard_project.pk}
+
+    @override_settings(JWT_MEMBERSHIP_MAX_PROJECTS=1)
+    def test_membership_claims_shards_limit(self):
+        token = get_token_for_user(self.user).access_token
+        assert get_membership_claims(token) is None
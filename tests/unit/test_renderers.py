@@ -0,0 +1,57 @@
+import datetime
+import json
+from decimal import Decimal
+from io import BytesIO
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import msgpack
+import pytest
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from work_tracker.apps.api.parsers import MessagePackParser, ORJSONParser
+from work_tracker.apps.api.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+class TestRenderers(SimpleTestCase):
+
+    def setUp(self):
+        now = datetime.datetime(2023, 3, 14, 15, 9, 26, 535897, tzinfo=datetime.timezone.utc)
+        entry = ReturnDict(serializer=None)
+        entry.update({
+            'id': uuid4(), 'hours': Decimal('1.250000'), 'bill': '187.50', 'start_time': now,
+            'end_time': now.astimezone(ZoneInfo('Africa/Johannesburg')), 'pause_time': None,
+            'date': now.date(), 'time': now.time(), 'total_time': datetime.timedelta(minutes=75),
+            'comment': 'Fly, you fools!  é', 'status': gettext_lazy('Complete'), 'tags': ('a', 'b'),
+            'active': False,
+        })
+        self.data = ReturnList([entry, {'id': 1}], serializer=None)
+
+    def test_json_renderer(self):
+        # Integers exceeding 64 bits are not supported by orjson.
+        self.data[1]['count'] = 2 ** 70
+        content = ORJSONRenderer().render(self.data, 'application/json')
+        expected = JSONRenderer().render(self.data, 'application/json')
+        assert json.loads(content) == json.loads(expected)
+        assert b'\\u2028' in content
+        assert ORJSONRenderer().render(None) == b''
+        # Assert indented output is rendered as DRF does.
+        assert ORJSONRenderer().render(self.data, 'application/json; indent=4') == JSONRenderer().render(
+            self.data, 'application/json; indent=4'
+        )
+
+    def test_msgpack_renderer(self):
+        content = MessagePackRenderer().render(self.data, 'application/msgpack')
+        assert msgpack.unpackb(content) == json.loads(JSONRenderer().render(self.data))
+
+    def test_parsers(self):
+        data = {'task_id': str(uuid4()), 'start_time': '2023-03-14 15:09:26', 'hours': 1.25, 'tags': ['a']}
+        assert ORJSONParser().parse(BytesIO(json.dumps(data).encode())) == data
+        assert MessagePackParser().parse(BytesIO(msgpack.packb(data))) == data
+        for parser, content in ((ORJSONParser(), b'{"hours": NaN}'), (MessagePackParser(), b'\xc1')):
+            with pytest.raises(ParseError):
+                parser.parse(BytesIO(content))
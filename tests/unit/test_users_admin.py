@@ -42,3 +42,5 @@ class TestUserAdmin(TestCase):
         user.refresh_from_db()
         assert not user.is_active
         assert user.deactivated_at
+        # Assert the User's tokens were revoked
+        assert user.token_revocation.revoked_at
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "work_tracker.apps.api"
+
+    def ready(self):
+        import work_tracker.apps.api.checks  # noqa F401
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from work_tracker.apps.api.revocation import revocation_list
+from work_tracker.apps.tracker.versions import get_user_version
+
+USER_CACHE_KEY = "auth-user:{}:{}"
+# Fields of authenticated Users held in the caches, leaving out credentials and other personal data.
+USER_CACHE_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+class UserCache:
+    """
+    Thread-safe, size-bounded LRU cache of User fields, keyed by User id and version.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.users = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            user = self.users.get(key)
+            if user is not None:
+                self.users.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.users[key] = user
+            self.users.move_to_end(key)
+            while len(self.users) > self.maxsize:
+                self.users.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving Users through a per-process LRU cache backed by the shared cache, instead of querying
+    the database on every request. Only the 'USER_CACHE_FIELDS' of Users are cached, keyed by the User's version,
+    which changes whenever the User is saved, so a single cache lookup detects outdated copies.
+    """
+
+    local_cache = UserCache(settings.JWT_USER_CACHE_SIZE)
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = USER_CACHE_KEY.format(user_id, get_user_version(user_id))
+        values = self.local_cache.get(key)
+        if values is None:
+            values = cache.get(key)
+            if values is None:
+                users = self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                values = users.values(*USER_CACHE_FIELDS).first()
+                if values is None:
+                    raise AuthenticationFailed(_("User not found"), code="user_not_found")
+                cache.set(key, values, timeout=settings.JWT_USER_CACHE_TIMEOUT)
+            self.local_cache.set(key, values)
+
+        if not values["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Each request gets a User instance of its own, whose remaining fields are loaded when first accessed.
+        field_names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in values]
+        return self.user_model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    OpenAPI security scheme of 'CachedJWTAuthentication', documented as plain JWT authentication.
+    """
+    target_class = "work_tracker.apps.api.authentication.CachedJWTAuthentication"
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+# Features keeping state shared by all processes in the default cache, with a callable telling whether each is enabled.
+SHARED_CACHE_FEATURES = {
+    "JWT revocation": lambda: True,
+    "JWT membership claims": lambda: settings.JWT_MEMBERSHIP_CLAIMS,
+    "cached responses": lambda: True,
+    "idempotency keys": lambda: True,
+    "read replica pins": lambda: bool(settings.DATABASE_REPLICAS),
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs) -> list:
+    """
+    Check the default cache is shared by all processes, as version counters and other state of the enabled features
+    in 'SHARED_CACHE_FEATURES' kept in a per-process cache would diverge between processes. Single-process setups with
+    'DEBUG' enabled, such as the development server, may use a local cache.
+
+    Returns:
+        list: Errors found.
+    """
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    if settings.DEBUG or not isinstance(cache, (LocMemCache, DummyCache)):
+        return []
+    features = [name for name, is_enabled in SHARED_CACHE_FEATURES.items() if is_enabled()]
+    if not features:
+        return []
+    return [
+        Error(
+            f"The default cache ({type(cache).__name__}) is not shared between processes, which {', '.join(features)} "
+            "rely on.",
+            hint="Set 'CACHE_URL' to a shared cache, such as Redis or Memcached.",
+            id="api.E001",
+        )
+    ]
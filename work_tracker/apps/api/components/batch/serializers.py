@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=serializers.CharField(max_length=2000), min_length=1,
+        help_text="Paths of the GET requests to make, relative to the API root, such as 'entry/?ids=<id>,<id>'.",
+    )
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests.")
+        return value
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    path = serializers.CharField(read_only=True)
+    status = serializers.IntegerField(read_only=True)
+    body = serializers.JSONField(read_only=True)
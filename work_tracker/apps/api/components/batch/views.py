@@ -0,0 +1,75 @@
+import json
+from copy import copy
+from urllib.parse import urljoin, urlsplit
+
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+from work_tracker.apps.api.components.batch import serializers
+from work_tracker.apps.api.permissions import MembershipIndex
+
+# Headers of the batch request which do not apply to its sub-requests.
+EXCLUDED_HEADERS = (
+    "CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_IDEMPOTENCY_KEY", "HTTP_IF_MODIFIED_SINCE", "HTTP_IF_NONE_MATCH"
+)
+
+
+class BatchView(GenericAPIView):
+    """
+    Makes up to 'BATCH_MAX_REQUESTS' GET requests to other API endpoints in a single round trip, returning their
+    statuses and bodies in the order requested. Sub-requests are handled by the endpoints' own views, authenticated as
+    the requesting User without decoding the token again, and share request-scoped state such as the User's
+    MembershipIndex. Headers such as 'X-Company' apply to all sub-requests.
+    """
+    serializer_class = serializers.BatchRequestSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Loaded once and stored on the request, which sub-requests are copied from.
+        MembershipIndex.for_request(request)
+        responses = [self.get_response(request, path) for path in serializer.validated_data["requests"]]
+        return Response(serializers.BatchResponseSerializer(responses, many=True).data)
+
+    def get_response(self, request, path: str) -> dict:
+        """
+        Make a GET request to the API endpoint at the given path, relative to the API root.
+
+        Returns:
+            dict: Path, status code and body of the response.
+        """
+        root = urljoin(request.path, "../")
+        url = urlsplit(urljoin(root, path))
+        if url.scheme or url.netloc or not url.path.startswith(root):
+            return {"path": path, "status": status.HTTP_400_BAD_REQUEST,
+                    "body": {"detail": "Paths must be relative to the API root."}}
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {"path": path, "status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+        if getattr(match.func, "cls", None) is type(self):
+            return {"path": path, "status": status.HTTP_400_BAD_REQUEST,
+                    "body": {"detail": "Batch requests may not be nested."}}
+
+        sub_request = copy(request._request)
+        sub_request.method = "GET"
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.GET = QueryDict(url.query)
+        sub_request.META = {key: value for key, value in request.META.items() if key not in EXCLUDED_HEADERS}
+        sub_request.META.update(
+            REQUEST_METHOD="GET", PATH_INFO=url.path, QUERY_STRING=url.query, HTTP_ACCEPT="application/json"
+        )
+        sub_request.resolver_match = match
+        # DRF authenticates requests carrying a forced User as that User.
+        sub_request._force_auth_user, sub_request._force_auth_token = request.user, request.auth
+        response = match.func(sub_request, *match.args, **match.kwargs)
+
+        if isinstance(response, Response):
+            body = response.data
+        else:
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            body = json.loads(content) if content else None
+        return {"path": path, "status": response.status_code, "body": body}
@@ -1,19 +1,21 @@
 from django.utils import timezone
 from rest_framework import serializers
 
-from work_tracker.apps.api.fields import EnumField
-from work_tracker.apps.tracker.enums import EntryAction, EntryStatus, TaskStatus, TaskType
-from work_tracker.apps.tracker.models import Company, Entry, Project, Task
+from work_tracker.apps.api.fields import CommaSeparatedListField, EnumField
+from work_tracker.apps.api.permissions import MembershipIndex
+from work_tracker.apps.api.serializers import ScopedListSerializer, SparseFieldsetSerializerMixin
+from work_tracker.apps.tracker.enums import DeletionStatus, EntryAction, EntryStatus, TaskStatus, TaskType, TimerAction
+from work_tracker.apps.tracker.models import Company, DeletionJob, Entry, Project, Task, Tombstone
 from work_tracker.apps.users.models import User
 from work_tracker.apps.utils import calculate_billables
 
 # ENTRY SERIALIZERS
 
 
-class EntryListSerializer(serializers.ModelSerializer):
+class EntryListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
-    task_id = serializers.UUIDField(read_only=True, source="task.id")
-    user = serializers.ReadOnlyField(source="task.user.email")
+    task_id = serializers.UUIDField(read_only=True)
+    user = serializers.ReadOnlyField(source="user.email")
     start_time = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M:%S")
     pause_time = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M:%S")
     end_time = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M:%S")
@@ -23,6 +25,9 @@ class EntryListSerializer(serializers.ModelSerializer):
         model = Entry
         fields = ("id", "task_id", "user", "start_time", "pause_time", "end_time", "status")
 
+    def get_expandable_fields(self) -> dict:
+        return {"task": TaskListSerializer(read_only=True)}
+
 
 class EntryDetailSerializer(EntryListSerializer):
     hours = serializers.DecimalField(max_digits=10, decimal_places=6, read_only=True)
@@ -185,10 +190,83 @@ class EntryManualCreateSerializer(serializers.ModelSerializer):
         fields = ("id", "task_id", "start_time", "end_time", "comment", "status", "total_time", "hours", "bill")
 
 
+class EntryFilterSerializer(serializers.Serializer):
+    ids = CommaSeparatedListField(child=serializers.UUIDField(), required=False, max_length=100,
+                                  help_text="Comma-separated ids of the Entries.")
+    project = serializers.UUIDField(required=False, help_text="Id of the Entries' Project.")
+    task = serializers.UUIDField(required=False, help_text="Id of the Entries' Task.")
+    status = EnumField(EntryStatus, required=False, help_text="Status of the Entries.")
+    start_time_after = serializers.DateTimeField(required=False, help_text="Earliest start time, inclusive.")
+    start_time_before = serializers.DateTimeField(required=False, help_text="Latest start time, exclusive.")
+
+    lookups = {
+        "ids": "id__in",
+        "project": "project_id",
+        "task": "task_id",
+        "start_time_after": "start_time__gte",
+        "start_time_before": "start_time__lt",
+    }
+
+
+class EntryReportSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if "start_date" in attrs and "end_date" in attrs and attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError({"end_date": "A report's end date may not precede its start date."})
+        return attrs
+
+
+class EntryTotalsSerializer(serializers.Serializer):
+    task_id = serializers.UUIDField(read_only=True)
+    entries = serializers.IntegerField(read_only=True)
+    total_time = serializers.IntegerField(read_only=True)
+    hours = serializers.DecimalField(max_digits=14, decimal_places=6, read_only=True)
+    bill = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+
+class TimerEventSerializer(serializers.Serializer):
+    key = serializers.UUIDField()
+    action = EnumField(TimerAction)
+    entry_id = serializers.UUIDField(required=False)
+    task_id = serializers.UUIDField(required=False)
+    entry_time = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        # Started entries require a task, whereas all other events act upon an existing entry.
+        if attrs["action"] == TimerAction.START:
+            if "task_id" not in attrs:
+                raise serializers.ValidationError({"task_id": "A task is required to start an entry."})
+        elif "entry_id" not in attrs:
+            raise serializers.ValidationError({"entry_id": "An entry is required to pause, resume or complete it."})
+        return attrs
+
+
+class TimerEventBatchSerializer(serializers.Serializer):
+    events = TimerEventSerializer(many=True, allow_empty=False, max_length=500)
+
+
 # TASK SERIALIZERS
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskEntryListSerializer(ScopedListSerializer):
+    """
+    Entries of a Task, only listed to staff and Users involved in the Task's Project, as in the Task's detail view.
+    """
+
+    def scope_queryset(self, queryset):
+        request = self.context.get("request")
+        if request is None:
+            return queryset.none()
+        membership = MembershipIndex.for_request(request)
+        if membership.is_staff:
+            return queryset
+        # Entries share their Task's Project, see 'Entry.project'.
+        return queryset.filter(project_id__in=membership.project_ids)
+
+
+class TaskListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     user_id = serializers.UUIDField(read_only=True)
     project_id = serializers.UUIDField(read_only=True)
@@ -200,6 +278,10 @@ class TaskListSerializer(serializers.ModelSerializer):
         model = Task
         fields = ('id', 'user_id', 'project_id', 'project', 'name', 'code')
 
+    def get_expandable_fields(self) -> dict:
+        # The list includes Tasks of other Projects, whose Entries are hidden as in the detail view.
+        return {'entries': TaskEntryListSerializer(child=EntryDetailSerializer(), read_only=True)}
+
 
 class TaskDetailSerializer(TaskListSerializer):
     description = serializers.CharField(read_only=True)
@@ -212,6 +294,27 @@ class TaskDetailSerializer(TaskListSerializer):
         fields = ('id', 'user_id', 'project_id', 'project', 'name', 'code', 'description', 'type', 'status', 'entries')
 
 
+class TaskSyncSerializer(TaskListSerializer):
+    description = serializers.CharField(read_only=True)
+    type = EnumField(TaskType, read_only=True)
+    status = EnumField(TaskStatus, read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ('id', 'user_id', 'project_id', 'project', 'name', 'code', 'description', 'type', 'status')
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    ids = CommaSeparatedListField(child=serializers.UUIDField(), required=False, max_length=100,
+                                  help_text="Comma-separated ids of the Tasks.")
+    project = serializers.UUIDField(required=False, help_text="Id of the Tasks' Project.")
+    assignee = serializers.UUIDField(required=False, help_text="Id of the User the Tasks are assigned to.")
+    status = EnumField(TaskStatus, required=False, help_text="Status of the Tasks.")
+    type = EnumField(TaskType, required=False, help_text="Type of the Tasks.")
+
+    lookups = {"ids": "id__in", "project": "project_id", "assignee": "user_id"}
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     user_id = serializers.UUIDField()
@@ -252,7 +355,7 @@ class TaskUpdateSerializer(TaskListSerializer):
 # PROJECT SERIALIZERS
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     name = serializers.CharField(read_only=True)
     description = serializers.CharField(read_only=True)
@@ -261,6 +364,9 @@ class ProjectListSerializer(serializers.ModelSerializer):
         model = Project
         fields = ('id', 'name', 'description')
 
+    def get_expandable_fields(self) -> dict:
+        return {'company': CompanyListSerializer(read_only=True)}
+
 
 class ProjectDetailSerializer(ProjectListSerializer):
     users = serializers.SerializerMethodField()
@@ -277,6 +383,14 @@ class ProjectDetailSerializer(ProjectListSerializer):
         fields = ('id', 'name', 'description', 'users', 'company_id', 'company')
 
 
+class ProjectSyncSerializer(ProjectListSerializer):
+    company_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = ('id', 'name', 'description', 'company_id')
+
+
 class ProjectCreateSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     company_id = serializers.UUIDField()
@@ -310,7 +424,7 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
 # COMPANY SERIALIZERS
 
 
-class CompanyListSerializer(serializers.ModelSerializer):
+class CompanyListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     name = serializers.CharField(read_only=True)
     description = serializers.CharField(read_only=True)
@@ -344,3 +458,67 @@ class CompanyUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = ('id', 'name', 'description')
+
+
+# SYNC SERIALIZERS
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(read_only=True, source='object_id')
+    model = serializers.CharField(read_only=True)
+    removed_at = serializers.DateTimeField(read_only=True, source='modified_at')
+
+    class Meta:
+        model = Tombstone
+        fields = ('id', 'model', 'removed_at')
+
+
+# SEARCH SERIALIZERS
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=200)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    kind = serializers.CharField(read_only=True)
+    id = serializers.UUIDField(read_only=True, source="object_id")
+    task_id = serializers.UUIDField(read_only=True, source="task_pk")
+    project_id = serializers.UUIDField(read_only=True, source="project_pk")
+    text = serializers.CharField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+
+# DASHBOARD SERIALIZERS
+
+
+class DashboardTotalsSerializer(serializers.Serializer):
+    total_time = serializers.IntegerField(read_only=True)
+    hours = serializers.DecimalField(max_digits=14, decimal_places=6, read_only=True)
+    bill = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+
+class DashboardProjectTotalsSerializer(DashboardTotalsSerializer):
+    project_id = serializers.UUIDField(read_only=True)
+    project = serializers.CharField(read_only=True)
+
+
+class DashboardSerializer(serializers.Serializer):
+    timer = EntryListSerializer(read_only=True, allow_null=True)
+    today = DashboardTotalsSerializer(read_only=True)
+    week = DashboardTotalsSerializer(read_only=True)
+    projects = DashboardProjectTotalsSerializer(read_only=True, many=True)
+    open_tasks = TaskListSerializer(read_only=True, many=True)
+
+
+# DELETION SERIALIZERS
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    status = EnumField(DeletionStatus, read_only=True)
+
+    class Meta:
+        model = DeletionJob
+        fields = (
+            "id", "model", "object_id", "name", "status", "total", "deleted", "error", "created_at", "modified_at"
+        )
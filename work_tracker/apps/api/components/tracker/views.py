@@ -1,57 +1,105 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
 from work_tracker.apps.api.components.tracker import serializers
-from work_tracker.apps.api.mixins import ActionSerializerMixin
-from work_tracker.apps.api.permissions import IsAuthorisedUser, ProjectSpecificTasks, UserSpecificEntries
-from work_tracker.apps.tracker.models import Company, Entry, Project, Task
+from work_tracker.apps.api.filters import QueryParamFilter
+from work_tracker.apps.api.mixins import (
+    ActionSerializerMixin,
+    BackgroundDeletionMixin,
+    CachedResponseMixin,
+    CompanyShardMixin,
+    ConditionalGetMixin,
+    DeletionGuardMixin,
+    IdempotencyMixin,
+    ReplicaReadMixin,
+    SparseFieldsetMixin,
+    StreamingListMixin,
+    SyncMixin,
+)
+from work_tracker.apps.api.pagination import OptionalLimitOffsetPagination, SearchPagination
+from work_tracker.apps.api.permissions import (
+    IsAuthorisedUser,
+    MembershipIndex,
+    ProjectSpecificTasks,
+    UserSpecificEntries,
+)
+from work_tracker.apps.routers import current_shard, find_company_ids
+from work_tracker.apps.tracker.archive import get_entry_totals
+from work_tracker.apps.tracker.dashboard import DASHBOARD_KEY, get_dashboard_data
+from work_tracker.apps.tracker.enums import EntryAction, TimerAction
+from work_tracker.apps.tracker.models import Company, DeletionJob, Entry, Project, Task, TimerEvent
+from work_tracker.apps.tracker.search import search
 
 
-class CompanyViewSet(ActionSerializerMixin, ModelViewSet):
+class CompanyViewSet(
+    DeletionGuardMixin, CompanyShardMixin, ReplicaReadMixin, CachedResponseMixin, IdempotencyMixin, SyncMixin,
+    SparseFieldsetMixin, BackgroundDeletionMixin, ActionSerializerMixin, ModelViewSet,
+):
     """
     ViewSet that allows for CRUD functionality on the 'Company' Database table.
     Regular authenticated Users will be able to perform 'GET' requests. However, 'POST',
     'PATCH', 'PUT' and 'DELETE' requests are reserved for staff and superusers.
+    Responses are cached until a Company or Project changes. Companies are deleted in the background.
     """
 
     basename = "company"
     serializer_class = serializers.CompanyListSerializer
     permission_classes = (IsAuthenticated, IsAuthorisedUser)
+    async_actions = ("list", "retrieve")
     action_serializers = {
         "retrieve": serializers.CompanyDetailSerializer,
         "create": serializers.CompanyCreateSerializer,
         "update": serializers.CompanyUpdateSerializer,
+        "sync": serializers.CompanyListSerializer,
     }
+    cache_dependencies = ("tracker.company", "tracker.project")
 
     def get_queryset(self):
-        return Company.objects.prefetch_related('projects').all()
+        return Company.objects.all()
 
     def get_object(self):
         company = get_object_or_404(Company, pk=self.kwargs.get("pk", ""))
         return company
 
 
-class ProjectViewSet(ActionSerializerMixin, ModelViewSet):
+class ProjectViewSet(
+    DeletionGuardMixin, CompanyShardMixin, ReplicaReadMixin, CachedResponseMixin, IdempotencyMixin, SyncMixin,
+    SparseFieldsetMixin, BackgroundDeletionMixin, ActionSerializerMixin, ModelViewSet,
+):
     """
     ViewSet that allows for CRUD functionality on the 'Project' Database table.
     Regular authenticated Users will be able to perform 'GET' requests. However, 'POST',
     'PATCH', 'PUT' and 'DELETE' requests are reserved for staff and superusers.
+    Responses are cached until a Project, its Company or its Users change. Projects are deleted in the background.
     """
     basename = "project"
     serializer_class = serializers.ProjectListSerializer
     permission_classes = (IsAuthenticated, IsAuthorisedUser)
+    async_actions = ("list", "retrieve")
     action_serializers = {
         "retrieve": serializers.ProjectDetailSerializer,
         "create": serializers.ProjectCreateSerializer,
         "update": serializers.ProjectUpdateSerializer,
+        "sync": serializers.ProjectSyncSerializer,
     }
+    cache_dependencies = ("tracker.project", "tracker.company", "users.user")
 
     def get_queryset(self):
-        return Project.objects.prefetch_related('tasks').all()
+        return Project.objects.all()
 
     def get_object(self):
         project = get_object_or_404(Project, pk=self.kwargs.get("pk", ""))
@@ -62,32 +110,60 @@ class ProjectViewSet(ActionSerializerMixin, ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class EntryViewSet(ActionSerializerMixin, ModelViewSet):
+class EntryViewSet(
+    DeletionGuardMixin, CompanyShardMixin, ReplicaReadMixin, ConditionalGetMixin, IdempotencyMixin, SyncMixin,
+    SparseFieldsetMixin, StreamingListMixin, ActionSerializerMixin, ModelViewSet,
+):
     """
     ViewSet that allows for CRUD functionality on the 'Entry' Database table.
     Endpoints are focused on the requesting User's Entries and include the functionality to
     start an Entry using a 'POST' call, pause, resume and complete an Entry using a 'PUT' with a
     'status' action call or manually create an Entry using the 'manualentry' endpoint.
+    Timer events recorded while offline can be uploaded in batches using the 'events' endpoint.
+    Totals per Task, including archived Entries, are available through the 'report' endpoint.
+    Lists are filtered by the query parameters of 'EntryFilterSerializer', ordered by an indexed field given as
+    'ordering' and paginated when a 'limit' is given, or streamed when 'stream' is set.
     """
     basename = "entry"
     serializer_class = serializers.EntryListSerializer
     permission_classes = (IsAuthenticated, UserSpecificEntries)
+    async_actions = ("list", "retrieve", "report")
     action_serializers = {
         "retrieve": serializers.EntryDetailSerializer,
         "create": serializers.EntryCreateSerializer,
         "update": serializers.EntryUpdateSerializer,
         "manualentry": serializers.EntryManualCreateSerializer,
+        "sync": serializers.EntryDetailSerializer,
+        "events": serializers.TimerEventBatchSerializer,
+        "report": serializers.EntryReportSerializer,
     }
+    conditional_relations = {"list": ("user",), "retrieve": ("user",)}
+    filter_backends = (QueryParamFilter, OrderingFilter)
+    filter_serializer_class = serializers.EntryFilterSerializer
+    ordering_fields = ("created_at", "start_time")
+    pagination_class = OptionalLimitOffsetPagination
 
     def get_queryset(self):
         user = self.request.user
-        return Entry.objects.select_related("task").filter(task__user=user).order_by("created_at", "status")
+        return Entry.objects.select_related("user").filter(user=user).order_by("created_at", "status")
 
     def get_object(self):
         entry = get_object_or_404(Entry, pk=self.kwargs.get("pk", ""))
         self.check_object_permissions(self.request, entry)
         return entry
 
+    def get_object_company_id(self, request):
+        if self.action != "events":
+            return super().get_object_company_id(request)
+        # Timer events name their Entries and Tasks within the batch, which is applied on the shard of their Company.
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        events = [event for event in events if isinstance(event, dict)] if isinstance(events, list) else []
+        company_ids = find_company_ids(Entry, [event["entry_id"] for event in events if event.get("entry_id")])
+        company_ids |= find_company_ids(Task, [event["task_id"] for event in events if event.get("task_id")])
+        if len(company_ids) > 1:
+            raise ValidationError({"events": "The events of a batch must belong to a single Company."})
+        return next(iter(company_ids), None)
+
     def update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
@@ -103,26 +179,146 @@ class EntryViewSet(ActionSerializerMixin, ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(methods=["POST"], detail=False)
+    def events(self, request, *args, **kwargs):
+        """
+        Endpoint replaying an ordered batch of timer events which were recorded while the client was offline.
+        Each event carries a client-generated 'key'. Events whose key has already been applied are not applied again,
+        instead the result stored when the event was first applied is returned.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        events = serializer.validated_data["events"]
+        keys = [event["key"] for event in events]
+        applied = {event.key: event for event in TimerEvent.objects.filter(user=request.user, key__in=keys)}
+
+        results = []
+        # Events are written to the Company's shard, where their savepoints must be made as well.
+        using = current_shard.get()
+        with transaction.atomic(using=using):
+            for event in events:
+                timer_event = applied.get(event["key"])
+                replayed = timer_event is not None
+                if not replayed:
+                    try:
+                        with transaction.atomic(using=using):
+                            timer_event = self.apply_timer_event(event)
+                    except IntegrityError:
+                        # A concurrent upload of the same event stored it first, so its outcome is returned instead
+                        # and the event's second application is rolled back.
+                        timer_event = TimerEvent.objects.filter(user=request.user, key=event["key"]).first()
+                        if timer_event is None:
+                            raise
+                        replayed = True
+                    applied[event["key"]] = timer_event
+                results.append({
+                    "key": timer_event.key,
+                    "status_code": timer_event.status_code,
+                    "result": timer_event.result,
+                    "replayed": replayed,
+                })
+        return Response({"results": results})
+
+    @action(methods=["GET"], detail=False)
+    def report(self, request, *args, **kwargs):
+        """
+        Endpoint returning the requesting User's totals per Task for Entries started between the optional 'start_date'
+        and 'end_date' query parameters, both inclusive. Archived Entries are included when the range requires it.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        start_date, end_date = serializer.validated_data.get("start_date"), serializer.validated_data.get("end_date")
+        start = timezone.make_aware(datetime.combine(start_date, time.min)) if start_date else None
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)) if end_date else None
+        totals = get_entry_totals(request.user, start=start, end=end)
+        return Response(serializers.EntryTotalsSerializer(totals, many=True).data)
+
+    def apply_timer_event(self, event: dict) -> TimerEvent:
+        """
+        Apply a single timer event using the same validation as the Entry create and update endpoints, storing the
+        outcome of the event under its key.
+
+        Returns:
+            TimerEvent: Stored timer event.
+        """
+        timer_action = event["action"]
+        context = self.get_serializer_context()
+        entry = None
+        try:
+            # Failed events are rolled back individually, without affecting the remaining events of the batch.
+            with transaction.atomic(using=current_shard.get()):
+                # Only the events naming objects being deleted are rejected, not the whole batch.
+                if timer_action == TimerAction.START:
+                    self.check_not_deleted(Task, event.get("task_id"))
+                    serializer = serializers.EntryCreateSerializer(
+                        data={"task_id": event["task_id"], "start_time": event["entry_time"]}, context=context
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    # Clients may generate the Entry id, allowing subsequent offline events to refer to the Entry.
+                    entry_id = event.get("entry_id")
+                    try:
+                        entry = serializer.save(**({"id": entry_id} if entry_id else {}))
+                    except IntegrityError:
+                        # The id is checked to be unused by 'Entry.save', see 'partitions'.
+                        if not entry_id:
+                            raise
+                        raise ValidationError({"entry_id": "This entry already exists."})
+                    status_code = status.HTTP_201_CREATED
+                else:
+                    self.check_not_deleted(Entry, event.get("entry_id"))
+                    entry = self.get_queryset().filter(pk=event["entry_id"]).first()
+                    if entry is None:
+                        raise NotFound("The selected entry does not exist.")
+                    data = {"action": EntryAction[timer_action.name].name, "entry_time": event["entry_time"]}
+                    serializer = serializers.EntryUpdateSerializer(entry, data=data, context=context, partial=True)
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save()
+                    status_code = status.HTTP_200_OK
+                result = serializer.data
+        except APIException as exc:
+            # Mirror the error format of DRF's exception handler.
+            status_code = exc.status_code
+            result = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            if timer_action == TimerAction.START:
+                entry = None
+        return TimerEvent.objects.create(
+            user=self.request.user, key=event["key"], action=timer_action, entry=entry,
+            task_id=entry.task_id if entry else event.get("task_id"), status_code=status_code, result=result,
+        )
 
-class TaskViewSet(ActionSerializerMixin, ModelViewSet):
+
+class TaskViewSet(
+    DeletionGuardMixin, CompanyShardMixin, ReplicaReadMixin, ConditionalGetMixin, IdempotencyMixin, SyncMixin,
+    SparseFieldsetMixin, StreamingListMixin, BackgroundDeletionMixin, ActionSerializerMixin, ModelViewSet,
+):
     """
     ViewSet that allows for CRUD functionality on the 'Task' Database table.
     Regular authenticated Users will be able to perform 'GET' requests. However, 'POST',
     'PATCH', 'PUT' and 'DELETE' requests are reserved for staff and superusers.
     Additionally, Users not involved in the Task's Project may not access the Task's detail view as
     it lists Entry details pertaining to the Task.
+    Lists are filtered by the query parameters of 'TaskFilterSerializer', ordered by an indexed field given as
+    'ordering' and paginated when a 'limit' is given, or streamed when 'stream' is set.
+    Tasks are deleted in the background, along with their Entries.
     """
     basename = "project"
     serializer_class = serializers.TaskListSerializer
     permission_classes = (IsAuthenticated, IsAuthorisedUser, ProjectSpecificTasks)
+    async_actions = ("list", "retrieve")
     action_serializers = {
         "retrieve": serializers.TaskDetailSerializer,
         "create": serializers.TaskCreateSerializer,
         "update": serializers.TaskUpdateSerializer,
+        "sync": serializers.TaskSyncSerializer,
     }
+    conditional_relations = {"list": ("project",), "retrieve": ("project", "user", "entries")}
+    filter_backends = (QueryParamFilter, OrderingFilter)
+    filter_serializer_class = serializers.TaskFilterSerializer
+    ordering_fields = ("status", "code")
+    pagination_class = OptionalLimitOffsetPagination
 
     def get_queryset(self):
-        return Task.objects.select_related('user', 'project').all()
+        return Task.objects.select_related('user', 'project').order_by('status', 'id')
 
     def get_object(self):
         project = get_object_or_404(Task, pk=self.kwargs.get("pk", ""))
@@ -132,3 +328,63 @@ class TaskViewSet(ActionSerializerMixin, ModelViewSet):
     def update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
+
+
+class SearchView(CompanyShardMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    Ranked full-text search over the Tasks of the requesting User's Projects and the User's own Entries, given the
+    'q' query parameter. Staff Users search the Tasks of all Projects. Results are paginated.
+    """
+    serializer_class = serializers.SearchResultSerializer
+    pagination_class = SearchPagination
+
+    def get(self, request, *args, **kwargs):
+        params = serializers.SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        membership = MembershipIndex.for_request(request)
+        project_ids = None if membership.is_staff else membership.project_ids
+        results = search(params.validated_data["q"], request.user, project_ids=project_ids)
+        page = self.paginate_queryset(results)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class DashboardView(CompanyShardMixin, ReplicaReadMixin, GenericAPIView):
+    """
+    The requesting User's running Entry, the hours and bill of today and this week, this week's totals per Project and
+    the User's open Tasks, see 'get_dashboard_data'. Responses are cached per User for 'DASHBOARD_CACHE_TIMEOUT'
+    seconds, or until one of the User's Entries or Tasks changes.
+    """
+    serializer_class = serializers.DashboardSerializer
+
+    def get(self, request, *args, **kwargs):
+        key = DASHBOARD_KEY.format(request.user.pk, current_shard.get())
+        data = cache.get(key)
+        if data is None:
+            data = self.get_serializer(get_dashboard_data(request.user)).data
+            cache.set(key, data, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+        return Response(data)
+
+
+class DeletionJobViewSet(ReadOnlyModelViewSet):
+    """
+    Lists the background deletions of Companies, Projects and Tasks along with their progress, the most recent first.
+    Reserved for staff users, who are the only ones allowed to delete these objects.
+    """
+    basename = "deletion-job"
+    serializer_class = serializers.DeletionJobSerializer
+    permission_classes = (IsAdminUser,)
+    pagination_class = OptionalLimitOffsetPagination
+
+    def get_queryset(self):
+        return DeletionJob.objects.all()
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Lists the response cache hits and misses of the cached ViewSets. Reserved for staff users.
+    """
+    permission_classes = (IsAdminUser,)
+    cached_viewsets = (CompanyViewSet, ProjectViewSet)
+
+    def get(self, request, *args, **kwargs):
+        return Response({viewset.__name__: viewset.get_cache_metrics() for viewset in self.cached_viewsets})
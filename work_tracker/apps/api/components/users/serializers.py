@@ -1,7 +1,18 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 from work_tracker.apps.api.fields import PasswordField
+from work_tracker.apps.api.revocation import revocation_list
+from work_tracker.apps.api.tokens import (
+    PreciseRefreshToken,
+    add_membership_claims,
+    get_membership_claims,
+    get_token_for_user,
+)
 from work_tracker.apps.users.models import User
 
 
@@ -44,7 +55,7 @@ class RegistrationSerializer(serializers.ModelSerializer):
         """
         if obj:
             if isinstance(obj, User):
-                token = RefreshToken.for_user(obj)
+                token = get_token_for_user(obj)
                 return str(token.access_token)
         return None
 
@@ -59,3 +70,34 @@ class ChangePasswordSerializer(serializers.Serializer):
                 {"new_password":  "New password matches current password."}
             )
         return attrs
+
+
+class MembershipTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer embedding the User's membership claims, see 'JWT_MEMBERSHIP_CLAIMS'.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return get_token_for_user(user)
+
+
+class MembershipTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer rejecting revoked refresh tokens, and re-issuing outdated membership claims instead of
+    leaving permission checks to fall back to the database for the remaining lifetime of the refresh token.
+    """
+    token_class = PreciseRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(attrs["refresh"], verify=False)
+        if revocation_list.is_revoked(refresh):
+            raise InvalidToken(_("Token has been revoked"))
+        if settings.JWT_MEMBERSHIP_CLAIMS and get_membership_claims(refresh) is None:
+            try:
+                user = User.objects.get(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+            except User.DoesNotExist:
+                return data
+            data["access"] = str(add_membership_claims(refresh, user).access_token)
+        return data
@@ -3,9 +3,11 @@ from rest_framework.generics import CreateAPIView, UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from work_tracker.apps.api.authentication import CachedJWTAuthentication
 from work_tracker.apps.api.components.users.serializers import ChangePasswordSerializer, RegistrationSerializer
+from work_tracker.apps.api.tokens import get_token_for_user
+from work_tracker.apps.users.models import TokenRevocation
 
 
 class RegistrationThrottle(UserRateThrottle):
@@ -30,7 +32,7 @@ class PasswordChangeView(UpdateAPIView):
     Allows Users to update their current password.
     """
     permission_classes = (IsAuthenticated,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     serializer_class = ChangePasswordSerializer
 
     def get_object(self):
@@ -53,12 +55,17 @@ class PasswordChangeView(UpdateAPIView):
             new_password = serializer.validated_data.get("new_password", "")
             user.set_password(new_password)
             user.save()
+            # Revoke tokens issued before the change, issuing a new token pair to the current client. 'token' repeats
+            # the access token for existing clients.
+            TokenRevocation.objects.revoke(user)
+            refresh = get_token_for_user(user)
+            access = str(refresh.access_token)
 
             response = {
                 "status": "success",
                 "code": status.HTTP_200_OK,
                 "message": "Your password has successfully been updated.",
-                "data": {},
+                "data": {"refresh": str(refresh), "access": access, "token": access},
             }
             return Response(response)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
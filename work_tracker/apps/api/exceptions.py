@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request using this Idempotency-Key is still being processed."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key has already been used for a different request."
+    default_code = "idempotency_key_mismatch"
+
+
+class CompanyMoved(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "This Company has been moved to another database, retry the request."
+    default_code = "company_moved"
+
+
+class ObjectBeingDeleted(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This object is being deleted."
+    default_code = "being_deleted"
@@ -44,6 +44,20 @@ class PasswordField(serializers.CharField):
         super().__init__(**kwargs)
 
 
+class CommaSeparatedListField(serializers.ListField):
+    """
+    List field accepting comma-separated values, such as the query parameter 'ids=<id>,<id>', as well as repeated
+    parameters.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        if isinstance(data, list):
+            data = [value for item in data for value in str(item).split(",") if value]
+        return super().to_internal_value(data)
+
+
 class EnumField(serializers.ChoiceField):
     """
     Custom Enum Serializer field to be used with the 'django-enumfields' library to easily serialize and display enum
@@ -0,0 +1,33 @@
+from rest_framework.filters import BaseFilterBackend
+
+
+class QueryParamFilter(BaseFilterBackend):
+    """
+    Filter backend validating the list query parameters using the view's 'filter_serializer_class' and filtering by
+    the valid parameters given. The serializer maps each parameter to a queryset lookup in its 'lookups' attribute,
+    defaulting to the parameter's name. Invalid parameters result in a '400 Bad Request'.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        serializer_class = getattr(view, "filter_serializer_class", None)
+        if serializer_class is None:
+            return queryset
+        serializer = serializer_class(data=request.query_params, context=view.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        lookups = getattr(serializer_class, "lookups", {})
+        return queryset.filter(**{lookups.get(name, name): value for name, value in serializer.validated_data.items()})
+
+    def get_schema_operation_parameters(self, view):
+        serializer_class = getattr(view, "filter_serializer_class", None)
+        if serializer_class is None:
+            return []
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": str(field.help_text or ""),
+                "schema": {"type": "string"},
+            }
+            for name, field in serializer_class().fields.items()
+        ]
@@ -0,0 +1,220 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache, partial, wraps
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import close_old_connections, connections
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+
+
+class APIMiddlewareMixin:
+    """
+    Handler mixin running requests through 'API_MIDDLEWARE' instead of 'MIDDLEWARE'. API clients authenticate using
+    JWT, so sessions, CSRF protection, messages, locale and clickjacking protection only add overhead to their
+    requests. Without 'AuthenticationMiddleware', DRF's 'SessionAuthentication' finds no session User and leaves
+    authentication to JWT.
+    """
+
+    def load_middleware(self, is_async=False):
+        """
+        Build the middleware chain from 'API_MIDDLEWARE', following Django's 'BaseHandler.load_middleware', which only
+        reads 'MIDDLEWARE'. The global settings are left untouched, as other handlers may load theirs concurrently.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, "sync_capable", True)
+            middleware_can_async = getattr(middleware, "async_capable", False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    f"Middleware {middleware_path} must have at least one of sync_capable/async_capable set to True."
+                )
+            middleware_is_async = middleware_can_async if handler_is_async or not middleware_can_sync else False
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async, handler, handler_is_async, debug=settings.DEBUG,
+                    name=f"middleware {middleware_path}",
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            if mw_instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+            handler = adapted_handler
+
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response)
+                )
+            if hasattr(mw_instance, "process_exception"):
+                # Exception middleware always runs synchronously, as in Django.
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        # Assigned last, as Django treats the chain as the flag that loading completed.
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class APIWSGIHandler(APIMiddlewareMixin, WSGIHandler):
+    """
+    WSGI handler using the lean API middleware stack, see 'APIMiddlewareMixin'.
+    """
+
+
+class APIDispatcher:
+    """
+    WSGI application passing requests matching 'API_LEAN_URLS_REGEX' to the lean API handler, and all other requests,
+    e.g. to the admin or API documentation, to the default handler with the full middleware stack.
+    """
+
+    def __init__(self, default: WSGIHandler, api: WSGIHandler = None):
+        self.default = default
+        self.api = api or APIWSGIHandler()
+        self.api_urls = re.compile(settings.API_LEAN_URLS_REGEX)
+
+    def __call__(self, environ, start_response):
+        handler = self.api if self.api_urls.match(environ.get("PATH_INFO", "")) else self.default
+        return handler(environ, start_response)
+
+
+@lru_cache
+def get_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="async-view")
+
+
+async def run_in_executor(executor: ThreadPoolExecutor, function, *args, **kwargs):
+    """
+    Call the sync function on a thread of the given pool, by default the process' pool of 'ASYNC_VIEW_THREADS'
+    threads, within the caller's context.
+
+    Returns:
+        Result of the function.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor(settings.ASYNC_VIEW_THREADS)
+    return await loop.run_in_executor(executor, copy_context().run, partial(function, *args, **kwargs))
+
+
+def async_view(view, executor: ThreadPoolExecutor = None):
+    """
+    Return a coroutine function wrapping the given sync view, so that the event loop's thread does not block on it.
+    This is not an async view in the sense of async database access, which Django 4.0 lacks: the whole view, including
+    its queries and rendering, runs unchanged on a thread of the given pool, see 'run_in_executor', each thread using
+    its own connection. A worker process thus serves as many slow requests at once as its pool has threads, like a
+    threaded WSGI worker of the same size.
+    """
+
+    def handle(request, *args, **kwargs):
+        # The pool's threads are not part of the request, whose signals only close the connections of its own.
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_in_executor(executor, handle, request, *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncReadASGIHandler(ASGIHandler):
+    """
+    ASGI handler serving the safe requests to the ViewSet actions listed in the ViewSet's 'async_actions' off the
+    event loop's thread, on the given pool of threads, see 'async_view'. Such ViewSets handle transactions themselves
+    instead of using 'ATOMIC_REQUESTS', which coroutine views do not support. Streamed responses are read on a thread
+    of their own, see 'send_response'.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor = None):
+        super().__init__()
+        self.executor = executor
+
+    def resolve_request(self, request):
+        match = super().resolve_request(request)
+        actions = getattr(match.func, "actions", {})
+        async_actions = getattr(getattr(match.func, "cls", None), "async_actions", ())
+        if request.method in SAFE_METHODS and actions.get(request.method.lower()) in async_actions:
+            match.func = request.resolver_match.func = async_view(match.func, self.executor)
+        return match
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        # Streamed content may be read from the database while it is iterated, which is not allowed on the event
+        # loop's thread. Its server-side cursor belongs to the connection of the thread opening it, which the view
+        # pool's threads close between requests, so each streamed response is read on a thread of its own.
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-stream")
+        loop, context = asyncio.get_running_loop(), copy_context()
+
+        def read(function, *args):
+            return loop.run_in_executor(reader, context.run, function, *args)
+
+        try:
+            headers = [
+                (str(header).encode("ascii"), str(value).encode("latin1")) for header, value in response.items()
+            ]
+            headers += [(b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+                        for cookie in response.cookies.values()]
+            await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+            parts = iter(response)
+            while (part := await read(next, parts, None)) is not None:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body"})
+        finally:
+            await read(self.close_stream, response)
+            reader.shutdown(wait=False)
+
+    @staticmethod
+    def close_stream(response):
+        """
+        Close the streamed response and the connections of the thread it was read on, which ends with the response.
+        """
+        try:
+            response.close()
+        finally:
+            connections.close_all()
+
+
+class APIASGIHandler(APIMiddlewareMixin, AsyncReadASGIHandler):
+    """
+    ASGI handler using the lean API middleware stack, see 'APIMiddlewareMixin'.
+    """
+
+
+class APIASGIDispatcher:
+    """
+    ASGI application passing requests matching 'API_LEAN_URLS_REGEX' to the lean API handler, and all other requests
+    to the default handler, see 'APIDispatcher'.
+    """
+
+    def __init__(self, default: ASGIHandler, api: ASGIHandler = None):
+        self.default = default
+        self.api = api or APIASGIHandler()
+        self.api_urls = re.compile(settings.API_LEAN_URLS_REGEX)
+
+    async def __call__(self, scope, receive, send):
+        handler = self.api if self.api_urls.match(scope.get("path", "")) else self.default
+        return await handler(scope, receive, send)
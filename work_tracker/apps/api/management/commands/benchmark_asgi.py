@@ -0,0 +1,150 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test.client import RequestFactory
+
+from work_tracker.apps.api.handlers import AsyncReadASGIHandler
+from work_tracker.apps.api.tokens import get_token_for_user
+from work_tracker.apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of concurrent API requests served by the WSGI and the ASGI handler, using the same "
+        "number of workers and threads per worker. Each WSGI worker serves one request per thread, each ASGI worker "
+        "runs an event loop handing the sync views to a pool of its own threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/entry/report/", help="API path requested.")
+        parser.add_argument("--requests", type=int, default=200, help="Number of requests per handler.")
+        parser.add_argument("--workers", type=int, default=2, help="Number of workers per handler.")
+        parser.add_argument(
+            "--threads", type=int, default=settings.ASYNC_VIEW_THREADS, help="Number of threads per worker."
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.05, help="Seconds added to each query, simulating a slow database."
+        )
+        parser.add_argument("--host", default="localhost", help="Host requested, must be in 'ALLOWED_HOSTS'.")
+        parser.add_argument("--email", help="Email of the User authenticating the requests, none by default.")
+
+    def handle(self, *args, **options):
+        headers = {"HTTP_HOST": options["host"]}
+        if options["email"]:
+            try:
+                user = User.objects.get(email=options["email"])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['email']}' does not exist.")
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {get_token_for_user(user).access_token}"
+
+        def delay(execute, *args):
+            sleep(options["latency"])
+            return execute(*args)
+
+        def add_latency(sender, connection, **kwargs):
+            # Connections reconnect on the same wrapper, which keeps its execute wrappers.
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        # Every thread opens connections of its own, which all get the added latency.
+        connection_created.connect(add_latency)
+        try:
+            results = {
+                "wsgi": self.benchmark_wsgi(
+                    options["path"], options["requests"], options["workers"], options["threads"], headers
+                ),
+                "asgi": self.benchmark_asgi(
+                    options["path"], options["requests"], options["workers"], options["threads"], headers
+                ),
+            }
+        finally:
+            connection_created.disconnect(add_latency)
+
+        for name, (status_code, elapsed) in results.items():
+            self.stdout.write(
+                f"{name}: {options['requests'] / elapsed:.1f} requests/s with {options['workers']} workers of "
+                f"{options['threads']} threads (status {status_code})"
+            )
+        self.stdout.write(self.style.SUCCESS(f"speedup: {results['wsgi'][1] / results['asgi'][1]:.1f}x"))
+
+    @staticmethod
+    def benchmark_wsgi(path: str, count: int, workers: int, threads: int, headers: dict) -> tuple:
+        """
+        Send the given number of GET requests through the WSGI handler, from the given number of threads per worker.
+
+        Returns:
+            tuple: Status code of the last response and total time, in seconds.
+        """
+        handler = WSGIHandler()
+        environ = RequestFactory().get(path, **headers).environ
+
+        def request(_=None) -> int:
+            response = {}
+
+            def start_response(status, response_headers, exc_info=None):
+                response["status"] = int(status.split(" ", 1)[0])
+
+            b"".join(handler(dict(environ), start_response))
+            return response["status"]
+
+        request()
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * threads) as executor:
+            statuses = list(executor.map(request, range(count)))
+        return statuses[-1], perf_counter() - start
+
+    @staticmethod
+    def benchmark_asgi(path: str, count: int, workers: int, threads: int, headers: dict) -> tuple:
+        """
+        Send the given number of GET requests through the ASGI handler, concurrently on one event loop per worker. As
+        in separate worker processes, each worker's handler runs the views on a pool of the given number of threads.
+
+        Returns:
+            tuple: Status code of the last response and total time, in seconds.
+        """
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": url.path,
+            "query_string": url.query.encode(),
+            "headers": [
+                (key[5:].lower().replace("_", "-").encode(), value.encode())
+                for key, value in headers.items() if key.startswith("HTTP_")
+            ],
+            "server": (headers["HTTP_HOST"], 80),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send_request(handler: AsyncReadASGIHandler) -> int:
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await handler(dict(scope), receive, send)
+            return messages[0]["status"]
+
+        def run_worker(requests: int) -> list:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="async-view") as executor:
+                handler = AsyncReadASGIHandler(executor)
+
+                async def send_requests():
+                    return await asyncio.gather(*(send_request(handler) for _ in range(requests)))
+
+                return asyncio.run(send_requests())
+
+        run_worker(1)
+        start = perf_counter()
+        shares = [count // workers + (index < count % workers) for index in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            statuses = [status for results in executor.map(run_worker, shares) for status in results]
+        return statuses[-1], perf_counter() - start
@@ -0,0 +1,66 @@
+from time import perf_counter
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test.client import RequestFactory
+
+from work_tracker.apps.api.handlers import APIWSGIHandler
+from work_tracker.apps.api.tokens import get_token_for_user
+from work_tracker.apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare the per-request time of API requests handled with the full and the lean API middleware stack."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/company/", help="API path requested.")
+        parser.add_argument("--requests", type=int, default=1000, help="Number of requests per middleware stack.")
+        parser.add_argument("--host", default="localhost", help="Host requested, must be in 'ALLOWED_HOSTS'.")
+        parser.add_argument("--email", help="Email of the User authenticating the requests, none by default.")
+
+    def handle(self, *args, **options):
+        headers = {"HTTP_HOST": options["host"]}
+        if options["email"]:
+            try:
+                user = User.objects.get(email=options["email"])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['email']}' does not exist.")
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {get_token_for_user(user).access_token}"
+
+        # Keep the connection open between requests, as the test client does.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            results = {
+                "full": self.benchmark(WSGIHandler(), options["path"], options["requests"], headers),
+                "lean": self.benchmark(APIWSGIHandler(), options["path"], options["requests"], headers),
+            }
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        for name, (status_code, elapsed) in results.items():
+            self.stdout.write(f"{name}: {elapsed * 1e6:.1f}µs per request (status {status_code})")
+        saved = results["full"][1] - results["lean"][1]
+        self.stdout.write(self.style.SUCCESS(f"saved: {saved * 1e6:.1f}µs per request"))
+
+    @staticmethod
+    def benchmark(handler: WSGIHandler, path: str, count: int, headers: dict) -> tuple:
+        """
+        Send the given number of GET requests through the handler, after a warm-up request.
+
+        Returns:
+            tuple: Status code of the last response and mean time per request, in seconds.
+        """
+        environ = RequestFactory().get(path, **headers).environ
+
+        def start_response(status, response_headers, exc_info=None):
+            start_response.status_code = int(status.split(" ", 1)[0])
+
+        b"".join(handler(dict(environ), start_response))
+        start = perf_counter()
+        for _ in range(count):
+            b"".join(handler(dict(environ), start_response))
+        return start_response.status_code, (perf_counter() - start) / count
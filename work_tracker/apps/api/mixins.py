@@ -1,3 +1,55 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from contextlib import ExitStack, nullcontext
+from contextvars import copy_context
+from datetime import timedelta
+from functools import partial
+from hashlib import sha256
+from heapq import merge
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max, Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_etags
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from work_tracker.apps.api.components.tracker.serializers import DeletionJobSerializer, TombstoneSerializer
+from work_tracker.apps.api.exceptions import (
+    CompanyMoved,
+    IdempotencyKeyInUse,
+    IdempotencyKeyMismatch,
+    ObjectBeingDeleted,
+)
+from work_tracker.apps.api.permissions import MembershipIndex
+from work_tracker.apps.api.serializers import get_sparse_queryset
+from work_tracker.apps.routers import (
+    current_shard,
+    find_company_id,
+    get_company_shard,
+    is_pinned,
+    lock_company_shard,
+    pin_primary,
+    replica_reads,
+    use_shard,
+)
+from work_tracker.apps.tracker.deletion import find_deletion_job, start_deletion
+from work_tracker.apps.tracker.models import Company, Project, Task, Tombstone
+from work_tracker.apps.tracker.versions import get_last_modified, get_versions
+from work_tracker.apps.users.models import User
+
+
 class ActionSerializerMixin:
     """
     Support to configure a Serializer Class per 'action' received.
@@ -16,3 +68,571 @@ class ActionSerializerMixin:
             return self.action_serializers[action]
         else:
             return super().get_serializer_class()
+
+
+class SparseFieldsetMixin:
+    """
+    Support for the 'fields' and 'expand' query parameters on the list and retrieve endpoints, given as comma-separated
+    field names. 'fields' limits the response to the given fields, and 'expand' adds nested data declared by the
+    serializer's 'get_expandable_fields'. Lists only load the columns and related objects the response requires.
+    """
+    sparse_actions = ("list", "retrieve")
+
+    def get_sparse_fieldset(self, param: str) -> list:
+        if self.action not in self.sparse_actions:
+            return []
+        value = self.request.query_params.get(param, "")
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["expand"] = self.get_sparse_fieldset("fields"), self.get_sparse_fieldset("expand")
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fieldset("fields") or self.get_sparse_fieldset("expand"):
+            queryset = get_sparse_queryset(queryset, self.get_serializer().fields)
+        return queryset
+
+
+class StreamingListMixin:
+    """
+    Streams the list endpoint's JSON array when requested using a 'stream=true' query parameter. Objects are read
+    using a server-side cursor and serialized and sent in chunks of 'stream_chunk_size', so memory use does not grow
+    with the size of the list and the first objects are sent before the last ones are read. Paginated lists and other
+    media types are not streamed.
+    """
+    stream_chunk_size = 500
+
+    def is_streamed(self) -> bool:
+        request = self.request
+        return (
+            request.query_params.get("stream") in ("1", "true")
+            and isinstance(request.accepted_renderer, JSONRenderer)
+            and (self.paginator is None or self.paginator.get_limit(request) is None)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streamed():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # The response is streamed after the view returns, so the chunks are read within the request's database
+        # routing context, such as its shard.
+        context, chunks = copy_context(), self.stream_list(queryset)
+        content = iter(lambda: context.run(next, chunks, None), None)
+        return StreamingHttpResponse(content, content_type=request.accepted_renderer.media_type)
+
+    def stream_list(self, queryset):
+        """
+        Yield the rendered JSON array of the serialized objects in the queryset, one chunk of objects at a time.
+        """
+        renderer, separator = self.request.accepted_renderer, b"["
+        objects = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(objects, self.stream_chunk_size)):
+            # Iterators skip the queryset's prefetches, which are made per chunk instead.
+            prefetch_related_objects(chunk, *queryset._prefetch_related_lookups)
+            content = renderer.render(self.get_serializer(chunk, many=True).data, self.request.accepted_media_type)
+            yield separator + content.strip()[1:-1]
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+
+class BackgroundDeletionMixin:
+    """
+    Delete objects in the background along with everything depending on them, see 'DeletionJob'. Responds with
+    '202 Accepted' and the job, whose progress is available from the deletion job endpoint.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        job = start_deletion(self.get_object(), user=request.user)
+        return Response(DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class DeletionGuardMixin:
+    """
+    Reject writes to objects being deleted in the background, or to objects belonging to them, see 'DeletionJob'.
+    Objects written meanwhile would be missed by the deletion's batches, and loaded into memory when the deleted object
+    itself is removed. The written objects are those 'CompanyShardMixin' routes the request by, so this mixin must
+    precede it. Deleting such objects again joins the unfinished deletion.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS or self.action == "destroy":
+            return
+        for model, pk in self.get_written_objects(request):
+            self.check_not_deleted(model, pk)
+
+    def get_written_objects(self, request) -> list:
+        """
+        Return the object named by the URL, or the objects the request body refers to, see 'CompanyShardMixin'.
+
+        Returns:
+            list: Tuples of model and primary key.
+        """
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            return [(self.get_queryset().model, lookup)]
+        if not isinstance(request.data, dict):
+            return []
+        return [(model, request.data[field]) for field, model in self.shard_fields if request.data.get(field)]
+
+    @staticmethod
+    def check_not_deleted(model, pk):
+        """
+        Raise 'ObjectBeingDeleted' if the object with the given primary key is being deleted.
+        """
+        if find_deletion_job(model, pk) is not None:
+            raise ObjectBeingDeleted()
+
+
+class CompanyShardMixin:
+    """
+    Serve requests from the shard storing the Projects, Tasks and Entries of the Company they concern, see
+    'Company.shard'. The Company is that of the object named by the URL or, for writes, that of the 'company_id',
+    'project_id' or 'task_id' in the request body, falling back to the Company given by the 'X-Company' header. Users
+    may only name Companies they are involved in by the header. Requests concerning no Company are served from the
+    default shard. Unsafe requests run in a transaction on the shard.
+    """
+    # Request body fields referring to the Company of the written objects, along with the model they refer to.
+    shard_fields = (("company_id", Company), ("project_id", Project), ("task_id", Task))
+    shard_context = None
+    atomic_shard = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # The shard is entered by 'initial' once the User is authenticated, and left when the request finishes.
+        with ExitStack() as self.shard_context:
+            response = super().dispatch(request, *args, **kwargs)
+            # Handled errors are turned into responses, so roll back explicitly as 'ATOMIC_REQUESTS' would.
+            if self.atomic_shard and getattr(response, "exception", False):
+                transaction.set_rollback(True, using=self.atomic_shard)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        company_id = self.get_request_company_id(request)
+        shard = DEFAULT_DB_ALIAS if company_id is None else get_company_shard(company_id)
+        self.shard_context.enter_context(use_shard(shard))
+        if request.method in SAFE_METHODS:
+            return
+        if shard != DEFAULT_DB_ALIAS:
+            self.shard_context.enter_context(transaction.atomic(using=shard))
+            self.atomic_shard = shard
+        # Writes hold the Company on its shard, rejecting those routed to the shard the Company is being moved from.
+        if company_id is not None and len(settings.DATABASE_SHARDS) > 1 and not lock_company_shard(company_id, shard):
+            raise CompanyMoved()
+
+    def get_request_company_id(self, request):
+        """
+        Return the id of the Company the request concerns.
+
+        Returns:
+            UUID: Id of the Company, or None if the request concerns no Company.
+        """
+        company_id = self.get_header_company_id(request)
+        if len(settings.DATABASE_SHARDS) > 1:
+            company_id = self.get_object_company_id(request) or company_id
+        return company_id
+
+    @staticmethod
+    def get_header_company_id(request):
+        """
+        Return the id of the Company given by the request's 'X-Company' header, if the requesting User is staff or
+        involved in one of the Company's Projects.
+
+        Returns:
+            UUID: Id of the Company, or None if the header is missing or invalid.
+        """
+        try:
+            company_id = UUID(request.headers.get("X-Company", ""))
+        except ValueError:
+            return None
+        if not MembershipIndex.for_request(request).is_staff:
+            projects = Project.objects.using(get_company_shard(company_id)).filter(company_id=company_id)
+            if not projects.filter(users=request.user).exists():
+                raise PermissionDenied("You are not involved in any Project of this Company.")
+        return company_id
+
+    def get_object_company_id(self, request):
+        """
+        Return the id of the Company owning the object named by the URL, or the objects written by the request body.
+
+        Returns:
+            UUID: Id of the Company, or None if the request names no existing object.
+        """
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            return find_company_id(self.get_queryset().model, lookup)
+        if request.method in SAFE_METHODS or not isinstance(request.data, dict):
+            return None
+        for field, model in self.shard_fields:
+            if request.data.get(field):
+                return find_company_id(model, request.data[field])
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from the read replicas, without wrapping them in a transaction. Unsafe requests run in a
+    transaction on the primary database, after which the requesting User's reads stay on the primary database for
+    'DATABASE_REPLICA_PIN_SECONDS', so that they read their own writes.
+    """
+    replica_reads_token = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        # Opt out of 'ATOMIC_REQUESTS', transactions are handled by 'dispatch' instead.
+        view._non_atomic_requests = {DEFAULT_DB_ALIAS}
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            # Errors roll back the innermost transaction, so safe requests made within a transaction, e.g. in tests,
+            # still get a savepoint of their own.
+            in_transaction = transaction.get_connection().in_atomic_block
+            try:
+                with transaction.atomic() if in_transaction else nullcontext():
+                    return super().dispatch(request, *args, **kwargs)
+            finally:
+                if self.replica_reads_token is not None:
+                    replica_reads.reset(self.replica_reads_token)
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+        if not status.is_server_error(response.status_code):
+            pin_primary(self.request.user)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication reads the User from the primary database, as it decides where the remaining reads go.
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            self.replica_reads_token = replica_reads.set(True)
+        super().initial(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified support for the list and retrieve endpoints. Both are derived from the latest 'modified_at'
+    of the objects being returned, which is evaluated before any serialization takes place, allowing an unchanged
+    response to be answered with a '304 Not Modified'.
+
+    Related objects included in a response are declared per action in 'conditional_relations', so that changes to
+    those objects are reflected in the ETag as well.
+    """
+    conditional_relations = {}
+    conditional_headers = None
+    # Filtered queryset of the list, evaluated for the ETag and reused to build the response.
+    conditional_queryset = None
+
+    def get_conditional_state(self, queryset) -> dict:
+        """
+        Return the aggregated modification state of the objects in the queryset and their related objects. Objects
+        removed from a response are detected through the counts of the objects and their reverse relations.
+
+        Returns:
+            dict: Latest modification times and object counts.
+        """
+        aggregates = {"modified_at": Max("modified_at"), "count": Count("pk", distinct=True)}
+        for relation in self.conditional_relations.get(self.action, ()):
+            aggregates[f"{relation}__modified_at"] = Max(f"{relation}__modified_at")
+            field = queryset.model._meta.get_field(relation.split("__")[0])
+            if field.one_to_many or field.many_to_many:
+                aggregates[f"{relation}__count"] = Count(relation, distinct=True)
+        return queryset.order_by().aggregate(**aggregates)
+
+    def evaluate_conditional_request(self, queryset):
+        """
+        Store the ETag and Last-Modified values of the response to the current request.
+
+        Returns:
+            Response: Empty '304 Not Modified' response if the client's copy is current, otherwise None.
+        """
+        state = self.get_conditional_state(queryset)
+        # Representations differ per User, query parameters, media type and shard, which are part of the ETag as well.
+        request = self.request
+        values = [request.get_full_path(), str(request.user.pk), str(request.accepted_media_type), current_shard.get()]
+        values += [str(value) for _, value in sorted(state.items())]
+        etag = f'W/"{sha256("|".join(values).encode()).hexdigest()[:32]}"'
+        last_modified = max((v for k, v in state.items() if k.endswith("modified_at") and v), default=None)
+        self.conditional_headers = {"ETag": etag}
+        if last_modified:
+            self.conditional_headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+        # ETags are compared weakly, as the representation itself may be encoded differently between requests.
+        etags = {tag.removeprefix("W/") for tag in parse_etags(request.headers.get("If-None-Match", ""))}
+        if "*" in etags or etag.removeprefix("W/") in etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def filter_queryset(self, queryset):
+        if self.conditional_queryset is not None:
+            return self.conditional_queryset.all()
+        return super().filter_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        not_modified = self.evaluate_conditional_request(queryset)
+        if not_modified:
+            return not_modified
+        self.conditional_queryset = queryset
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        queryset = self.get_queryset().model._default_manager.filter(pk=instance.pk)
+        not_modified = self.evaluate_conditional_request(queryset)
+        if not_modified:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.conditional_headers and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            for header, value in self.conditional_headers.items():
+                response[header] = value
+            patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Caches the responses of the list and retrieve endpoints under the version counters of the models they are built
+    from, as listed in 'cache_dependencies'. Counters are incremented whenever one of these models changes, so that
+    a cached response never outlives the data it was built from. The counters double as the responses' ETag, which
+    then no longer requires a database query.
+
+    Cached responses are shared between Users and skip object lookups, so this is only suited to endpoints whose
+    responses do not depend on the requesting User. The counters must be kept in a cache shared by all processes, see
+    'check_shared_cache'. Responses expire after 'RESPONSE_CACHE_TIMEOUT' seconds regardless.
+    """
+    # Lowercase labels of the models responses are built from.
+    cache_dependencies = ()
+    METRICS_KEY = "response-cache:{}:{}"
+
+    def get_conditional_state(self, queryset) -> dict:
+        state = {f"{label}__version": version for label, version in get_versions(*self.cache_dependencies).items()}
+        state["modified_at"] = get_last_modified(*self.cache_dependencies)
+        return state
+
+    def record_cache_metric(self, metric: str):
+        key = self.METRICS_KEY.format(type(self).__name__, metric)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+    @classmethod
+    def get_cache_metrics(cls) -> dict:
+        """
+        Return the number of cache hits and misses of the viewset's responses.
+
+        Returns:
+            dict: Hits, misses and hit ratio.
+        """
+        hits, misses = (cache.get(cls.METRICS_KEY.format(cls.__name__, m), 0) for m in ("hits", "misses"))
+        return {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4) if hits else 0}
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        not_modified = self.evaluate_conditional_request(None)
+        if not_modified:
+            return not_modified
+
+        versions = [f"{label}:{version}" for label, version in get_versions(*self.cache_dependencies).items()]
+        values = [type(self).__name__, self.action, request.get_full_path(), str(request.accepted_media_type)]
+        values += [current_shard.get(), *versions]
+        key = f"response:{sha256('|'.join(values).encode()).hexdigest()}"
+        data = cache.get(key)
+        if data is not None:
+            self.record_cache_metric("hits")
+            response = Response(data)
+        else:
+            self.record_cache_metric("misses")
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "HIT" if data is not None else "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class IdempotencyMixin:
+    """
+    Support for an 'Idempotency-Key' request header on unsafe requests. The response to the first request using a key
+    is stored for 'IDEMPOTENCY_KEY_TIMEOUT' seconds, once the request's transaction commits, in the cache shared by all
+    processes. Repeating the request with the same key returns the stored response without validating or writing
+    anything again. Should the commit fail, the key remains claimed for 'idempotency_claim_timeout' seconds.
+    """
+    idempotent_methods = ("POST", "PUT", "PATCH")
+    # Seconds a key remains claimed by a request in progress, should the request fail without a response.
+    idempotency_claim_timeout = 60
+    idempotency_key = None
+
+    def get_idempotency_fingerprint(self, request) -> str:
+        """
+        Return a digest identifying the request, used to detect keys being reused for a different request.
+
+        Returns:
+            str: Hex digest of the request method, path and body.
+        """
+        digest = sha256(f"{request.method} {request.get_full_path()}".encode())
+        digest.update(request._request.body)
+        return digest.hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = request.headers.get("Idempotency-Key")
+        if request.method not in self.idempotent_methods or not key:
+            return
+
+        # Keys are scoped to the requesting User, allowing clients to generate them independently.
+        cache_key = f"idempotency:{request.user.pk}:{key}"
+        fingerprint = self.get_idempotency_fingerprint(request)
+        # Claim the key for the duration of the request, preventing concurrent retries from being processed.
+        if cache.add(cache_key, {"fingerprint": fingerprint}, timeout=self.idempotency_claim_timeout):
+            self.idempotency_key = (cache_key, fingerprint)
+            return
+
+        stored = cache.get(cache_key, {})
+        if stored.get("fingerprint", fingerprint) != fingerprint:
+            raise IdempotencyKeyMismatch()
+        if "status" not in stored:
+            raise IdempotencyKeyInUse()
+        response = Response(stored["data"], status=stored["status"], headers={"Idempotent-Replayed": "true"})
+        # Replace the handler of the current request method, so that the stored response is returned as is.
+        setattr(self, request.method.lower(), lambda *args, **kwargs: response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.idempotency_key:
+            cache_key, fingerprint = self.idempotency_key
+            if response.status_code >= 500:
+                # Server errors are not stored, allowing the request to be retried.
+                cache.delete(cache_key)
+            else:
+                stored = {"fingerprint": fingerprint, "status": response.status_code, "data": response.data}
+                store = partial(cache.set, cache_key, stored, timeout=settings.IDEMPOTENCY_KEY_TIMEOUT)
+                if getattr(response, "exception", False):
+                    # Rejected requests are rolled back, so there is no commit to wait for.
+                    store()
+                else:
+                    # Responses are only replayed once the request's writes are committed on its shard.
+                    transaction.on_commit(store, using=current_shard.get())
+        return response
+
+
+class SyncMixin:
+    """
+    Adds a 'sync' endpoint returning the objects changed and removed since a client's last sync.
+
+    Objects and Tombstones are ordered by their (modified_at, id) cursor. Clients pass the 'cursor' of their previous
+    sync as the 'since' query parameter and keep syncing while 'has_more' is set.
+
+    Rows are stamped with 'modified_at' before their transaction commits, so a row committed late may land behind a
+    cursor already handed out. The cursor of the last page therefore never passes 'SYNC_WINDOW_SECONDS' before the
+    current time, and the next sync returns the changes of that window again. Clients apply upserts and Tombstones by
+    id, so repeated changes are harmless, and transactions shorter than the window are never missed.
+    """
+    sync_page_size = 500
+    max_sync_page_size = 1000
+
+    def get_sync_queryset(self):
+        return self.get_queryset()
+
+    def get_tombstone_queryset(self):
+        model_names = (self.get_queryset().model._meta.model_name, User._meta.model_name)
+        user_filter = Q(user__isnull=True) | Q(user=self.request.user)
+        return Tombstone.objects.filter(user_filter, model__in=model_names)
+
+    @staticmethod
+    def encode_cursor(modified_at, pk) -> str:
+        """
+        Return the opaque sync cursor pointing at the given (modified_at, id) position.
+
+        Returns:
+            str: URL-safe cursor value.
+        """
+        value = f"{modified_at.isoformat()}|{pk}"
+        return urlsafe_b64encode(value.encode()).decode()
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> tuple:
+        """
+        Return the (modified_at, id) position the given sync cursor points at.
+
+        Returns:
+            tuple: Modification time and id.
+        """
+        try:
+            modified_at, pk = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            modified_at, pk = parse_datetime(modified_at), UUID(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            modified_at = None
+        if modified_at is None:
+            raise serializers.ValidationError({"since": ["Invalid sync cursor."]})
+        return modified_at, pk
+
+    def decode_cursor(self, cursor: str) -> Q:
+        """
+        Return a filter selecting every object positioned after the given sync cursor.
+
+        Returns:
+            Q: Filter on the (modified_at, id) cursor.
+        """
+        modified_at, pk = self.parse_cursor(cursor)
+        return Q(modified_at__gt=modified_at) | Q(modified_at=modified_at, id__gt=pk)
+
+    def get_sync_limit(self) -> int:
+        try:
+            limit = int(self.request.query_params.get("limit", self.sync_page_size))
+        except ValueError:
+            raise serializers.ValidationError({"limit": ["A valid integer is required."]})
+        return max(1, min(limit, self.max_sync_page_size))
+
+    @action(methods=["GET"], detail=False)
+    def sync(self, request, *args, **kwargs):
+        """
+        Endpoint returning objects updated and removed since the cursor given in the 'since' query parameter.
+        """
+        since = request.query_params.get("since")
+        limit = self.get_sync_limit()
+        ordering = ("modified_at", "id")
+
+        queryset = self.get_sync_queryset().order_by(*ordering)
+        tombstones = self.get_tombstone_queryset().order_by(*ordering)
+        if since:
+            after = self.decode_cursor(since)
+            queryset, tombstones = queryset.filter(after), tombstones.filter(after)
+        else:
+            # An initial sync downloads every object, so there is nothing to remove client-side.
+            tombstones = tombstones.none()
+
+        # Both feeds are already ordered by cursor, so merging the first 'limit + 1' rows of each is sufficient.
+        feed = merge(queryset[:limit + 1], tombstones[:limit + 1], key=lambda obj: (obj.modified_at, obj.pk))
+        changes = list(islice(feed, limit + 1))
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            position = (changes[-1].modified_at, changes[-1].pk)
+        else:
+            position = self.parse_cursor(since) if since else None
+        if not has_more:
+            # Keep the cursor behind the window of changes whose transactions may still be committing.
+            window = (timezone.now() - timedelta(seconds=settings.SYNC_WINDOW_SECONDS), UUID(int=0))
+            position = min(position, window) if position else window
+
+        upserts = [obj for obj in changes if not isinstance(obj, Tombstone)]
+        removed = [obj for obj in changes if isinstance(obj, Tombstone)]
+        return Response({
+            "upserts": self.get_serializer(upserts, many=True).data,
+            "tombstones": TombstoneSerializer(removed, many=True).data,
+            "cursor": self.encode_cursor(*position),
+            "has_more": has_more,
+        })
@@ -0,0 +1,18 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class OptionalLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination applied only to requests passing a 'limit' query parameter, so that existing clients
+    keep receiving unpaginated lists. Pages hold at most 'max_limit' objects.
+    """
+    default_limit = None
+    max_limit = 1000
+
+
+class SearchPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination of search results, which are always paginated.
+    """
+    default_limit = 20
+    max_limit = 100
@@ -1,5 +1,49 @@
+from functools import cached_property
+
 from rest_framework.permissions import BasePermission
 
+from work_tracker.apps.api.tokens import get_membership_claims
+
+
+class MembershipIndex:
+    """
+    Index of the ids of the Projects a User is involved in. The ids are loaded using a single query when first
+    required, after which permission checks are a set lookup. Staff status and Project ids are read from
+    the access token instead, when it carries current membership claims.
+    """
+
+    def __init__(self, user, claims=None):
+        self.user = user
+        self.claims = claims
+
+    @classmethod
+    def for_request(cls, request) -> "MembershipIndex":
+        """
+        Return the index of the requesting User, shared by all permission checks made during the request.
+
+        Returns:
+            MembershipIndex: Index of the requesting User.
+        """
+        # Stored on the underlying HttpRequest, which may be wrapped by more than one DRF Request.
+        http_request = getattr(request, "_request", request)
+        index = getattr(http_request, "membership_index", None)
+        if index is None or index.user != request.user:
+            claims = get_membership_claims(getattr(request, "auth", None))
+            index = http_request.membership_index = cls(request.user, claims=claims)
+        return index
+
+    @property
+    def is_staff(self) -> bool:
+        if self.claims:
+            return self.claims["is_staff"]
+        return bool(self.user.is_staff or self.user.is_superuser)
+
+    @cached_property
+    def project_ids(self) -> set:
+        if self.claims:
+            return self.claims["project_ids"]
+        return set(self.user.projects.values_list("id", flat=True))
+
 
 class IsAuthorisedUser(BasePermission):
     """
@@ -10,7 +54,7 @@ class IsAuthorisedUser(BasePermission):
 
     def has_permission(self, request, view):
         if request.method in self.PROTECTED_METHODS:
-            return bool(request.user.is_staff or request.user.is_superuser)
+            return MembershipIndex.for_request(request).is_staff
         return True
 
 
@@ -22,9 +66,8 @@ class ProjectSpecificTasks(BasePermission):
     message = 'You cannot access Task details for tasks not assigned to you.'
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        has_permission = any([user.is_staff, user.is_superuser]) or obj.project in request.user.projects.all()
-        return has_permission
+        membership = MembershipIndex.for_request(request)
+        return membership.is_staff or obj.project_id in membership.project_ids
 
 
 class UserSpecificEntries(BasePermission):
@@ -34,6 +77,4 @@ class UserSpecificEntries(BasePermission):
     message = 'You cannot access Entries for tasks not assigned to you.'
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        has_permission = any([user.is_staff, user.is_superuser]) or obj.task in request.user.tasks.all()
-        return has_permission
+        return obj.user_id == request.user.pk or MembershipIndex.for_request(request).is_staff
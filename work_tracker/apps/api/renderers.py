@@ -0,0 +1,45 @@
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+# Types without a native encoding, such as Decimals, timedeltas and lazy strings, are encoded as by DRF's JSON encoder.
+encode_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer using orjson, which encodes UUIDs, datetimes, dates and times natively and several times faster than
+    the standard library. Its output is equivalent to that of DRF's JSONRenderer, which still renders indented output,
+    such as the browsable API's.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=encode_default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Values orjson does not support, such as integers exceeding 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Line and paragraph separators are escaped to keep the output a strict subset of JavaScript, as DRF does.
+        return content.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    MessagePack renderer for internal services, selected using an 'Accept: application/msgpack' header. Values are
+    encoded as they are in JSON responses, so UUIDs, datetimes and Decimals are encoded as strings and numbers.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
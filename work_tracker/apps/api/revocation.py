@@ -0,0 +1,106 @@
+from datetime import timedelta
+from hashlib import blake2b
+from math import ceil, log
+from threading import Lock
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from work_tracker.apps.tracker.versions import get_versions
+from work_tracker.apps.users.models import TokenRevocation
+
+REVOCATION_LABEL = TokenRevocation._meta.label_lower
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings, answering membership tests without false negatives and with false positives at
+    roughly the given error rate, as long as no more than 'capacity' values are added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray(ceil(self.size / 8))
+
+    def _positions(self, value: str):
+        # Derive all bit positions from two independent hashes (Kirsch-Mitzenmacher).
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(value))
+
+
+class RevocationList:
+    """
+    Per-process mirror of the Users with revoked tokens, held in a Bloom filter. The filter is refreshed incrementally
+    whenever the shared revocation version changes, so tokens of Users without revocations are accepted without
+    database access, while probable hits are confirmed against the database. The version must be kept in a cache
+    shared by all processes, see 'check_shared_cache'; the filter is rebuilt every 'rebuild_interval' regardless.
+    """
+
+    # Revocations saved this long before the last refresh are read again, covering transactions committed late.
+    refresh_margin = timedelta(minutes=1)
+    # The filter is rebuilt at this interval, dropping revocations which can no longer match any valid token.
+    rebuild_interval = timedelta(days=1)
+
+    def __init__(self):
+        self.lock = Lock()
+        self.filter = None
+        self.version = None
+        self.built_at = None
+        self.refreshed_at = None
+
+    def is_outdated(self, version, now) -> bool:
+        """
+        Return whether the filter misses revocations saved since the given version, or is due to be rebuilt.
+
+        Returns:
+            bool: True if the filter needs refreshing.
+        """
+        return version != self.version or now - self.built_at > self.rebuild_interval
+
+    def refresh(self):
+        version, now = get_versions(REVOCATION_LABEL)[REVOCATION_LABEL], timezone.now()
+        if not self.is_outdated(version, now):
+            return
+        with self.lock:
+            if not self.is_outdated(version, now):
+                return
+            if self.filter is None or now - self.built_at > self.rebuild_interval:
+                # Revocations older than the longest token lifetime can no longer match any valid token.
+                lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+                revocations = TokenRevocation.objects.filter(revoked_at__gte=now - lifetime)
+                self.filter = BloomFilter(settings.JWT_REVOCATION_CAPACITY, settings.JWT_REVOCATION_ERROR_RATE)
+                self.built_at = now
+            else:
+                revocations = TokenRevocation.objects.filter(modified_at__gte=self.refreshed_at - self.refresh_margin)
+            for user_id in revocations.values_list("user_id", flat=True).iterator():
+                self.filter.add(str(user_id))
+            self.version, self.refreshed_at = version, now
+
+    def is_revoked(self, token) -> bool:
+        """
+        Return whether the given validated token was issued before its User's tokens were revoked.
+
+        Returns:
+            bool: True if the token is revoked.
+        """
+        self.refresh()
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if str(user_id) not in self.filter:
+            return False
+        revoked_at = TokenRevocation.objects.filter(user_id=user_id).values_list("revoked_at", flat=True).first()
+        # Issue times are precise to the microsecond, see 'PreciseIssueTimeMixin'. Tokens with issue times truncated to
+        # seconds are revoked within the second of revocation as well.
+        return revoked_at is not None and token.get("iat", 0) < revoked_at.timestamp()
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,135 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin limiting the output to the field names given in the 'fields' context entry, and adding the
+    expandable fields named in the 'expand' context entry, see 'get_expandable_fields'. Both only apply to the
+    serializer the view uses, not to the serializers nested within it.
+    """
+
+    def get_expandable_fields(self) -> dict:
+        """
+        Return the fields, usually nested serializers, which are only included when requested through 'expand'.
+
+        Returns:
+            dict: Field instances by name.
+        """
+        return {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Nested serializers share the root's context, but only the root, or the child of a root list, is narrowed.
+        listed = isinstance(self.parent, serializers.ListSerializer) and self.parent is self.root
+        if self.root is not self and not listed:
+            return fields
+        requested, expand = self.context.get("fields"), self.context.get("expand")
+        expandable = self.get_expandable_fields()
+        if expand:
+            unknown = set(expand) - set(expandable) - set(fields)
+            if unknown:
+                choices = ", ".join(sorted(expandable)) or "none"
+                raise serializers.ValidationError({"expand": [f"Invalid fields: {', '.join(sorted(unknown))}. "
+                                                              f"Expandable fields are: {choices}."]})
+            fields.update({name: field for name, field in expandable.items() if name in expand and name not in fields})
+        if requested:
+            unknown = set(requested) - set(fields)
+            if unknown:
+                raise serializers.ValidationError({"fields": [f"Invalid fields: {', '.join(sorted(unknown))}. "
+                                                              f"Available fields are: {', '.join(fields)}."]})
+            fields = {name: field for name, field in fields.items() if name in requested or name in (expand or ())}
+        return fields
+
+
+class ScopedListSerializer(serializers.ListSerializer):
+    """
+    List serializer of related objects, limited by 'scope_queryset' to those the requesting User may see. Prefetches
+    made for the field by 'get_sparse_queryset' are limited the same way, and are the only prefetches trusted.
+    """
+
+    def scope_queryset(self, queryset: QuerySet) -> QuerySet:
+        return queryset
+
+    def get_attribute(self, instance):
+        queryset = super().get_attribute(instance).all()
+        # Related managers return their prefetched objects as an evaluated queryset.
+        if queryset._result_cache is not None:
+            return queryset
+        return self.scope_queryset(queryset)
+
+
+def get_sparse_queryset(queryset: QuerySet, fields: dict) -> QuerySet:
+    """
+    Return the queryset limited to the columns, joins and prefetches the given serializer fields read, replacing its
+    prefetches. Querysets of serializers with fields whose sources are not model fields, such as method fields, are
+    returned unchanged.
+
+    Returns:
+        QuerySet: Narrowed queryset.
+    """
+    try:
+        only, related, prefetches = get_field_lookups(queryset.model, fields)
+    except LookupError:
+        return queryset
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if related:
+        # Without arguments, 'select_related' follows all foreign keys.
+        queryset = queryset.select_related(*related)
+    return queryset.prefetch_related(*prefetches).only(*only)
+
+
+def get_field_lookups(model, fields: dict, prefix: str = "") -> tuple:
+    """
+    Return the lookups of the columns and related objects the serializer fields read, relative to the given model and
+    prefixed by the lookup path of the model from the queryset's model.
+
+    Returns:
+        tuple: Lookups of the columns to load, relations to join and prefetches to make.
+    """
+    only, related, prefetches = set(), set(), []
+    for field in fields.values():
+        if isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+            raise LookupError(field.field_name)
+        current, path = model, prefix
+        for attr in field.source_attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise LookupError(field.field_name)
+            lookup = f"{path}__{model_field.name}" if path else model_field.name
+            if model_field.one_to_many or model_field.many_to_many:
+                # Related objects are prefetched, narrowed to the fields of the nested serializer.
+                nested = model_field.related_model._default_manager.all()
+                child = getattr(field, "child", None)
+                if isinstance(child, serializers.BaseSerializer):
+                    try:
+                        nested_only, nested_related, nested_prefetches = get_field_lookups(nested.model, child.fields)
+                    except LookupError:
+                        pass
+                    else:
+                        # Prefetched objects are matched to their parent through their foreign key.
+                        if model_field.one_to_many:
+                            nested_only.add(model_field.field.name)
+                        if nested_related:
+                            nested = nested.select_related(*nested_related)
+                        nested = nested.prefetch_related(*nested_prefetches).only(*nested_only)
+                if isinstance(field, ScopedListSerializer):
+                    nested = field.scope_queryset(nested)
+                prefetches.append(Prefetch(lookup, queryset=nested))
+                break
+            only.add(lookup)
+            if not model_field.is_relation or attr == model_field.attname:
+                break
+            related.add(lookup)
+            current, path = model_field.related_model, lookup
+        else:
+            # Sources ending on a related object require a nested serializer to tell which of its fields are read.
+            if not isinstance(field, serializers.BaseSerializer) or getattr(field, "many", False):
+                raise LookupError(field.field_name)
+            nested_only, nested_related, nested_prefetches = get_field_lookups(current, field.fields, prefix=path)
+            only |= nested_only
+            related |= nested_related
+            prefetches += nested_prefetches
+    return only, related, prefetches
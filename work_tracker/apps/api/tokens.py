@@ -0,0 +1,111 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from uuid import UUID
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+from work_tracker.apps.tracker.versions import get_membership_generation
+from work_tracker.apps.users.models import User
+
+# Claims describing the User's memberships, see 'JWT_MEMBERSHIP_CLAIMS'.
+STAFF_CLAIM = "staff"
+PROJECTS_CLAIM = "prj"
+GENERATION_CLAIM = "gen"
+
+
+class PreciseIssueTimeMixin:
+    """
+    Token mixin recording the issue time with microsecond precision instead of whole seconds, so that tokens issued
+    within the second of a revocation are told apart from those it revokes, see 'RevocationList.is_revoked'.
+    """
+
+    def set_iat(self, claim="iat", at_time=None):
+        at_time = at_time or self.current_time
+        self.payload[claim] = round(at_time.timestamp(), 6)
+
+
+class PreciseAccessToken(PreciseIssueTimeMixin, AccessToken):
+    pass
+
+
+class PreciseRefreshToken(PreciseIssueTimeMixin, RefreshToken):
+    access_token_class = PreciseAccessToken
+
+
+def encode_ids(ids) -> str:
+    """
+    Return the given UUIDs encoded as a compact string, 22 characters per UUID.
+
+    Returns:
+        str: Concatenated UUID bytes, URL-safe base64 encoded without padding.
+    """
+    return urlsafe_b64encode(b"".join(pk.bytes for pk in ids)).decode().rstrip("=")
+
+
+def decode_ids(value: str) -> set:
+    """
+    Return the UUIDs encoded in the given string, see 'encode_ids'.
+
+    Returns:
+        set: Decoded UUIDs.
+    """
+    data = urlsafe_b64decode(value + "=" * (-len(value) % 4))
+    return {UUID(bytes=data[i:i + 16]) for i in range(0, len(data), 16)}
+
+
+def add_membership_claims(token: Token, user: User) -> Token:
+    """
+    Add the User's staff status and Project ids to the given token, when enabled by 'JWT_MEMBERSHIP_CLAIMS'. Users
+    involved in more than 'JWT_MEMBERSHIP_MAX_PROJECTS' Projects do not receive the claims, to keep tokens small.
+    Projects are collected from every shard, since a token is valid for requests to any Company.
+
+    Returns:
+        Token: Updated token.
+    """
+    if not settings.JWT_MEMBERSHIP_CLAIMS:
+        return token
+    # Read the generation first, so that membership changes made while building the claims invalidate them.
+    generation = get_membership_generation(user.pk)
+    project_ids = []
+    for shard in settings.DATABASE_SHARDS:
+        limit = settings.JWT_MEMBERSHIP_MAX_PROJECTS + 1 - len(project_ids)
+        project_ids += user.projects.using(shard).values_list("id", flat=True)[:limit]
+        if len(project_ids) > settings.JWT_MEMBERSHIP_MAX_PROJECTS:
+            break
+    if len(project_ids) <= settings.JWT_MEMBERSHIP_MAX_PROJECTS:
+        token[STAFF_CLAIM] = bool(user.is_staff or user.is_superuser)
+        token[PROJECTS_CLAIM] = encode_ids(project_ids)
+        token[GENERATION_CLAIM] = generation
+    return token
+
+
+def get_token_for_user(user: User) -> PreciseRefreshToken:
+    """
+    Return a new refresh token for the User, including membership claims if enabled. Access tokens created from the
+    refresh token inherit its claims.
+
+    Returns:
+        PreciseRefreshToken: Refresh token of the User.
+    """
+    return add_membership_claims(PreciseRefreshToken.for_user(user), user)
+
+
+def get_membership_claims(token) -> dict:
+    """
+    Return the membership claims of the given token, provided the User's memberships have not changed since the token
+    was issued.
+
+    Returns:
+        dict: Staff status and set of Project ids, or None if the token carries no current membership claims.
+    """
+    if not settings.JWT_MEMBERSHIP_CLAIMS or not isinstance(token, Token) or PROJECTS_CLAIM not in token:
+        return None
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if token.get(GENERATION_CLAIM) != get_membership_generation(user_id):
+        return None
+    try:
+        return {"is_staff": bool(token[STAFF_CLAIM]), "project_ids": decode_ids(token[PROJECTS_CLAIM])}
+    except (BinasciiError, KeyError, ValueError):
+        return None
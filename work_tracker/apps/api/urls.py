@@ -3,7 +3,17 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter, SimpleRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 
-from work_tracker.apps.api.components.tracker.views import CompanyViewSet, EntryViewSet, ProjectViewSet, TaskViewSet
+from work_tracker.apps.api.components.batch.views import BatchView
+from work_tracker.apps.api.components.tracker.views import (
+    CompanyViewSet,
+    DashboardView,
+    DeletionJobViewSet,
+    EntryViewSet,
+    ProjectViewSet,
+    ResponseCacheStatsView,
+    SearchView,
+    TaskViewSet,
+)
 from work_tracker.apps.api.components.users.views import PasswordChangeView, RegisterView
 
 if settings.DEBUG:
@@ -15,6 +25,7 @@ router.register("entry", EntryViewSet, basename="entry")
 router.register("company", CompanyViewSet, basename="company")
 router.register("project", ProjectViewSet, basename="project")
 router.register("task", TaskViewSet, basename="task")
+router.register("deletion-job", DeletionJobViewSet, basename="deletion-job")
 
 app_name = "api"
 urlpatterns = [
@@ -26,5 +37,17 @@ urlpatterns = [
     # USER ENDPOINTS
     path("user/register/", RegisterView.as_view(), name="user-register"),
     path("user/update-password/", PasswordChangeView.as_view(), name="password-change"),
+
+    # BATCH ENDPOINTS
+    path("batch/", BatchView.as_view(), name="batch"),
+
+    # DASHBOARD ENDPOINTS
+    path("dashboard/", DashboardView.as_view(), name="dashboard"),
+
+    # SEARCH ENDPOINTS
+    path("search/", SearchView.as_view(), name="search"),
+
+    # MONITORING ENDPOINTS
+    path("cache-stats/", ResponseCacheStatsView.as_view(), name="cache-stats"),
     path("", include(router.urls)),
 ]
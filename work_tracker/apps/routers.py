@@ -0,0 +1,244 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from work_tracker.apps.tracker.models import Company
+
+PRIMARY_PIN_KEY = "primary-pin:{}"
+COMPANY_SHARD_KEY = "company-shard:{}"
+# Models stored on the shard of the Company they belong to. All other models are global and stored on the default
+# database, with Users and Companies copied to every shard so that sharded queries can join them.
+SHARDED_MODELS = (
+    "tracker.project", "tracker.project_users", "tracker.task", "tracker.entry", "tracker.archivedentry",
+    "tracker.timerevent",
+)
+# Lookups of the Company owning the objects of the models shards are derived from, see 'find_company_id'.
+COMPANY_LOOKUPS = {
+    "tracker.company": "pk", "tracker.project": "company_id", "tracker.task": "project__company_id",
+    "tracker.entry": "project__company_id",
+}
+
+# Whether reads of the current request or task may be served by a replica.
+replica_reads = ContextVar("replica_reads", default=False)
+# Shard storing the Company data of the current request or task.
+current_shard = ContextVar("current_shard", default=DEFAULT_DB_ALIAS)
+
+
+@contextmanager
+def use_replicas():
+    """
+    Route reads made within the context to the replicas in 'DATABASE_REPLICAS'.
+    """
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+@contextmanager
+def use_shard(alias: str):
+    """
+    Route queries for sharded models made within the context to the given shard.
+    """
+    token = current_shard.set(alias)
+    try:
+        yield
+    finally:
+        current_shard.reset(token)
+
+
+def get_company_shard(company_id) -> str:
+    """
+    Return the shard storing the given Company's data, cached until the Company is saved.
+
+    Returns:
+        str: Database alias of the Company's shard, or the default database if the Company does not exist.
+    """
+    key = COMPANY_SHARD_KEY.format(company_id)
+    shard = cache.get(key)
+    if shard is None:
+        shard = Company.objects.filter(pk=company_id).values_list("shard", flat=True).first() or DEFAULT_DB_ALIAS
+        cache.set(key, shard, timeout=None)
+    return shard
+
+
+def find_company_id(model, pk):
+    """
+    Return the id of the Company owning the Company, Project, Task or Entry with the given primary key. Objects are
+    looked up on each shard in turn, as their shard is not known yet.
+
+    Returns:
+        UUID: Id of the owning Company, or None if the object does not exist or the primary key is invalid.
+    """
+    return next(iter(find_company_ids(model, [pk])), None)
+
+
+def find_company_ids(model, pks) -> set:
+    """
+    Return the ids of the Companies owning the Companies, Projects, Tasks or Entries with the given primary keys, see
+    'find_company_id'.
+
+    Returns:
+        set: Ids of the owning Companies, without those of missing objects and invalid primary keys.
+    """
+    valid_pks = set()
+    for pk in pks:
+        try:
+            valid_pks.add(UUID(str(pk)))
+        except ValueError:
+            continue
+    lookup = COMPANY_LOOKUPS[model._meta.label_lower]
+    if lookup == "pk" or not valid_pks:
+        return valid_pks
+    company_ids = set()
+    for shard in settings.DATABASE_SHARDS:
+        company_ids.update(model._base_manager.using(shard).filter(pk__in=valid_pks).values_list(lookup, flat=True))
+        # A single object is found on a single shard, the remaining ones need not be searched.
+        if company_ids and len(valid_pks) == 1:
+            break
+    return company_ids
+
+
+def get_object_shard(model, pk) -> str:
+    """
+    Return the shard storing the Company, Project, Task or Entry with the given primary key, see 'find_company_id'.
+
+    Returns:
+        str: Database alias of the object's shard, or the default database if there is a single shard or the object
+            does not exist.
+    """
+    if len(settings.DATABASE_SHARDS) == 1:
+        return DEFAULT_DB_ALIAS
+    company_id = find_company_id(model, pk)
+    return DEFAULT_DB_ALIAS if company_id is None else get_company_shard(company_id)
+
+
+def lock_company_shard(company_id, shard: str) -> bool:
+    """
+    Lock the Company's copy on the given shard until the current transaction ends, so that the Company cannot be moved
+    away from the shard while the transaction writes its data, see 'move_company'. Moves lock the copy exclusively, so
+    writes arriving during a move wait for it and then find the Company gone.
+
+    Returns:
+        bool: False if the Company's data has been moved to another shard, True otherwise. Companies missing from the
+            shard are left to the request's validation.
+    """
+    with connections[shard].cursor() as cursor:
+        cursor.execute(f"SELECT shard FROM {Company._meta.db_table} WHERE id = %s FOR KEY SHARE", [company_id])
+        row = cursor.fetchone()
+    return row is None or row[0] == shard
+
+
+def replicate_to_shards(instance):
+    """
+    Copy the given global object to every shard other than the default database, creating or updating the copies.
+    """
+    model = type(instance)
+    values = {field.attname: getattr(instance, field.attname) for field in model._meta.concrete_fields}
+    for shard in settings.DATABASE_SHARDS:
+        if shard == DEFAULT_DB_ALIAS:
+            continue
+        copies = model._base_manager.using(shard).filter(pk=instance.pk)
+        if not copies.update(**values):
+            model._base_manager.using(shard).bulk_create([model(**values)])
+
+
+def remove_from_shards(instance):
+    """
+    Remove the copies of the given global object from every shard other than the default database.
+    """
+    model = type(instance)
+    for shard in settings.DATABASE_SHARDS:
+        if shard != DEFAULT_DB_ALIAS:
+            model._base_manager.using(shard).filter(pk=instance.pk)._raw_delete(shard)
+
+
+def pin_primary(user):
+    """
+    Route the User's reads to the primary database for 'DATABASE_REPLICA_PIN_SECONDS', so that the User reads their
+    own writes while the replicas catch up. The pin is kept in the cache shared by all processes, as the User's next
+    request may be served by any of them, see 'check_shared_cache'.
+    """
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        cache.set(PRIMARY_PIN_KEY.format(user.pk), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user) -> bool:
+    """
+    Return whether the User's reads must be served by the primary database, see 'pin_primary'.
+
+    Returns:
+        bool: True if the User recently wrote to the primary database.
+    """
+    return user.is_authenticated and cache.get(PRIMARY_PIN_KEY.format(user.pk), False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending reads made within 'use_replicas' to a random replica, and writes of objects read from a
+    replica to the primary database. All other queries, e.g. those made by the admin or within write requests, use the
+    primary database, or the database of the object they relate to.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are written to the primary database.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary database.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class CompanyShardRouter:
+    """
+    Database router sending queries for the Projects, Tasks and Entries of a Company to the Company's shard, see
+    'Company.shard'. The shard is taken from the Company or sharded object the query relates to, falling back to the
+    shard selected by 'use_shard'. Queries for the default shard are left to the next router.
+    """
+
+    def get_shard(self, model, instance=None) -> str:
+        if model._meta.label_lower not in SHARDED_MODELS:
+            return None
+        if instance is not None:
+            if instance._meta.label_lower == "tracker.company":
+                shard = instance.shard
+            elif instance._meta.label_lower in SHARDED_MODELS and instance._state.db in settings.DATABASE_SHARDS:
+                shard = instance._state.db
+            else:
+                shard = current_shard.get()
+        else:
+            shard = current_shard.get()
+        return None if shard == DEFAULT_DB_ALIAS else shard
+
+    def db_for_read(self, model, **hints):
+        return self.get_shard(model, hints.get("instance"))
+
+    def db_for_write(self, model, **hints):
+        return self.get_shard(model, hints.get("instance"))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Sharded objects relate to global objects, such as Users, stored on the default database.
+        databases = {*settings.DATABASE_SHARDS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
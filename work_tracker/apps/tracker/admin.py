@@ -1,12 +1,85 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.postgres.search import SearchQuery
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponseRedirect
 from django.template.defaultfilters import truncatechars
+from django.urls import reverse
 
+from work_tracker.apps.routers import get_object_shard, use_shard
 from work_tracker.apps.tracker import models
+from work_tracker.apps.tracker.deletion import get_dependents, start_deletion
 from work_tracker.apps.tracker.forms import EntryAdditionForm
 
 
+class BackgroundDeletionAdmin(admin.ModelAdmin):
+    """
+    Admin deleting objects in the background along with everything depending on them, see 'DeletionJob'. The
+    confirmation page summarises the dependent objects by counting them, instead of collecting every one of them.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        deleted_objects, model_count = [], {}
+        for obj in objs:
+            deleted_objects.append(str(obj))
+            shard = obj.shard if isinstance(obj, models.Company) else obj._state.db
+            for model, queryset in get_dependents(type(obj), obj.pk, shard):
+                name = model._meta.verbose_name_plural
+                model_count[name] = model_count.get(name, 0) + queryset.count()
+        model_count[self.opts.verbose_name_plural] = len(deleted_objects)
+        return deleted_objects, model_count, set(), []
+
+    def delete_model(self, request, obj):
+        start_deletion(obj, user=request.user)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            start_deletion(obj, user=request.user)
+
+    def response_delete(self, request, obj_display, obj_id):
+        message = f"The {self.opts.verbose_name} “{obj_display}” is being deleted in the background."
+        self.message_user(request, message, messages.SUCCESS)
+        if self.has_change_permission(request):
+            url = reverse(f"admin:{self.opts.app_label}_{self.opts.model_name}_changelist")
+        else:
+            url = reverse("admin:index")
+        return HttpResponseRedirect(url)
+
+
+class CompanyShardAdmin(admin.ModelAdmin):
+    """
+    Admin serving the forms of sharded objects from the shard of the Company they belong to, see 'Company.shard'. The
+    Company is that of the changed object or, for added objects, that of the Company, Project or Task chosen in the
+    form. Lists only show the objects stored on the default shard.
+    """
+    # Form fields referring to the Company of added objects, along with the model they refer to.
+    shard_fields = (("company", models.Company), ("project", models.Project), ("task", models.Task))
+
+    def get_request_shard(self, request, object_id=None) -> str:
+        """
+        Return the shard of the Company the admin request concerns.
+
+        Returns:
+            str: Database alias of the Company's shard, or the default database.
+        """
+        if object_id is not None:
+            return get_object_shard(self.model, object_id)
+        for field, model in self.shard_fields:
+            if request.POST.get(field):
+                return get_object_shard(model, request.POST[field])
+        return DEFAULT_DB_ALIAS
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        # The form's transaction runs on the shard, as do the queries validating its choices.
+        with use_shard(self.get_request_shard(request, object_id)):
+            return super().changeform_view(request, object_id, form_url, extra_context)
+
+    def delete_view(self, request, object_id, extra_context=None):
+        with use_shard(self.get_request_shard(request, object_id)):
+            return super().delete_view(request, object_id, extra_context)
+
+
 @admin.register(models.Company)
-class CompanyAdmin(admin.ModelAdmin):
+class CompanyAdmin(BackgroundDeletionAdmin):
     list_display = ("id", "created_at", "name", "short_description")
     search_fields = ("name",)
     ordering = ("name",)
@@ -24,7 +97,7 @@ class CompanyAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(CompanyShardAdmin, BackgroundDeletionAdmin):
     list_display = ("id", "created_at", "project_users", "company", "name")
     search_fields = ("name",)
     ordering = ("name",)
@@ -45,14 +118,21 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(CompanyShardAdmin, BackgroundDeletionAdmin):
     list_display = ("id", "created_at", "user", "code", "name", "project", "type", "status")
-    search_fields = ("name", "user", "code")
+    search_fields = ("code", "name", "description")
     ordering = ("status",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Search the full-text index over 'search_fields', rather than scanning every Task using 'ILIKE'.
+        if not search_term:
+            return queryset, False
+        query = SearchQuery(search_term, config=models.SEARCH_CONFIG, search_type="websearch")
+        return queryset.annotate(search=models.TASK_SEARCH_VECTOR).filter(search=query), False
+
 
 @admin.register(models.Entry)
-class EntryAdmin(admin.ModelAdmin):
+class EntryAdmin(CompanyShardAdmin):
     list_display = ("id", "created_at", "entry_user", "task", "hours", "bill", "status")
     ordering = ("status",)
     form = EntryAdditionForm
@@ -63,7 +143,7 @@ class EntryAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.select_related("task")
+        return qs.select_related("task", "user")
 
     @staticmethod
     def entry_user(obj: models.Entry) -> str:
@@ -73,4 +153,17 @@ class EntryAdmin(admin.ModelAdmin):
         Returns:
             str: Email address of Entry user.
         """
-        return obj.task.user.email
+        return obj.user.email
+
+
+@admin.register(models.DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "model", "name", "status", "deleted", "total", "user")
+    list_filter = ("model", "status")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "work_tracker.apps.tracker"
+
+    def ready(self):
+        import work_tracker.apps.tracker.signals  # noqa F401
@@ -0,0 +1,84 @@
+"""
+Archive of completed Entries of closed fiscal years, see 'ArchivedEntry'. Entries are moved to the archive in batches
+by the 'archive_entries' command, and reads covering archived periods combine both tables.
+"""
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from work_tracker.apps.tracker.enums import EntryStatus
+from work_tracker.apps.tracker.models import ArchivedEntry, Entry, TimerEvent
+
+ARCHIVED_FIELDS = (
+    "id", "task_id", "user_id", "comment", "start_time", "end_time", "total_time", "hours", "bill", "created_at"
+)
+
+
+def get_archive_cutoff(today: date = None) -> datetime:
+    """
+    Return the start of the oldest fiscal year whose Entries are kept in the Entry table, see
+    'ENTRY_ARCHIVE_RETENTION_YEARS'. Completed Entries which ended before it are archived.
+
+    Returns:
+        datetime: Start of the oldest retained fiscal year.
+    """
+    today = today or timezone.localdate()
+    year = today.year if today.month >= settings.FISCAL_YEAR_START_MONTH else today.year - 1
+    start = date(year - settings.ENTRY_ARCHIVE_RETENTION_YEARS, settings.FISCAL_YEAR_START_MONTH, 1)
+    return timezone.make_aware(datetime.combine(start, time.min))
+
+
+def archive_entries(using: str = DEFAULT_DB_ALIAS, cutoff: datetime = None, batch_size: int = 1000) -> int:
+    """
+    Move the completed Entries which ended before the cutoff from the Entry table to the archive, one batch per
+    transaction. Entries are removed without signals, as archiving does not remove them for sync clients.
+
+    Returns:
+        int: Number of archived Entries.
+    """
+    cutoff = cutoff or get_archive_cutoff()
+    queryset = Entry.objects.using(using).filter(status=EntryStatus.COMPLETE, end_time__lt=cutoff)
+    archived = 0
+    while True:
+        with transaction.atomic(using=using):
+            batch = list(queryset.order_by("start_time").values(*ARCHIVED_FIELDS)[:batch_size])
+            if not batch:
+                return archived
+            ids = [values["id"] for values in batch]
+            ArchivedEntry.objects.using(using).bulk_create([ArchivedEntry(**values) for values in batch])
+            TimerEvent.objects.using(using).filter(entry_id__in=ids).update(entry=None)
+            Entry.objects.using(using).filter(pk__in=ids)._raw_delete(using)
+        archived += len(batch)
+
+
+def get_entry_totals(user, start: datetime = None, end: datetime = None) -> list:
+    """
+    Return the number of Entries and their total time, hours and bill per Task of the User, for Entries started within
+    the given range. The archive is only read if the range starts before the archive cutoff.
+
+    Returns:
+        list: Dicts of totals, ordered by Task id.
+    """
+    filters = {"user": user}
+    if start is not None:
+        filters["start_time__gte"] = start
+    if end is not None:
+        filters["start_time__lt"] = end
+    querysets = [Entry.objects.filter(**filters)]
+    if start is None or start < get_archive_cutoff():
+        querysets.append(ArchivedEntry.objects.filter(**filters))
+
+    totals = {}
+    for queryset in querysets:
+        rows = queryset.order_by().values("task_id").annotate(
+            entries=Count("id"), total_time=Sum("total_time"), hours=Sum("hours"), bill=Sum("bill")
+        )
+        for row in rows:
+            total = totals.setdefault(row["task_id"], {"task_id": row["task_id"], "entries": 0, "total_time": 0,
+                                                       "hours": 0, "bill": 0})
+            for field in ("entries", "total_time", "hours", "bill"):
+                total[field] += row[field]
+    return [totals[task_id] for task_id in sorted(totals)]
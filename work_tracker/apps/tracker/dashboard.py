@@ -0,0 +1,124 @@
+"""
+Aggregates of a User's personal dashboard, see 'get_dashboard_data'. The dashboard's queries are independent of each
+other, so they run concurrently on a pool of 'DASHBOARD_WORKERS' threads, each keeping its own database connections.
+Dashboards are cached per User and shard under 'DASHBOARD_KEY' until one of the User's Entries or Tasks changes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from work_tracker.apps.tracker.enums import EntryStatus, TaskStatus
+from work_tracker.apps.tracker.models import Entry, Task
+
+DASHBOARD_KEY = "dashboard:{}:{}"
+CLOSED_TASK_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CLOSED)
+
+
+@lru_cache
+def get_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard")
+
+
+def release_connections():
+    """
+    Close the calling pool thread's database connections that failed, or that are older than 'DASHBOARD_CONN_MAX_AGE'
+    seconds, and keep the others for the thread's next dashboard. 'CONN_MAX_AGE' applies to requests: with its default
+    of 0, every query of every dashboard would open a new connection.
+    """
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        # Connections the thread opened since its last call expire after 'DASHBOARD_CONN_MAX_AGE' seconds instead.
+        if getattr(connection, "dashboard_connection", None) is not connection.connection:
+            connection.dashboard_connection = connection.connection
+            connection.close_at = monotonic() + settings.DASHBOARD_CONN_MAX_AGE
+        connection.close_if_unusable_or_obsolete()
+
+
+def run_concurrently(*functions) -> list:
+    """
+    Call the functions on the dashboard's thread pool, within the caller's context, such as its database shard.
+    Functions are called in order by the calling thread if 'DASHBOARD_WORKERS' is 0.
+
+    Returns:
+        list: Results of the functions, in the order given.
+    """
+    if not settings.DASHBOARD_WORKERS:
+        return [function() for function in functions]
+
+    def run(function):
+        try:
+            return function()
+        finally:
+            # Threads of the pool are not part of a request, which closes its connections when finished.
+            release_connections()
+
+    executor = get_executor(settings.DASHBOARD_WORKERS)
+    futures = [executor.submit(copy_context().run, run, function) for function in functions]
+    return [future.result() for future in futures]
+
+
+def get_totals(**filters) -> dict:
+    return {field: Sum(field, filter=Q(**filters), default=0) for field in ("total_time", "hours", "bill")}
+
+
+def get_dashboard_data(user, today: date = None) -> dict:
+    """
+    Return the User's running Entry, the totals of the User's Entries started today and this week, the totals per
+    Project of this week and the User's open Tasks.
+
+    Returns:
+        dict: Dashboard data.
+    """
+    today = today or timezone.localdate()
+    day_start = timezone.make_aware(datetime.combine(today, time.min))
+    week_start = day_start - timedelta(days=today.weekday())
+    entries = Entry.objects.filter(user=user)
+    week_entries = entries.filter(start_time__gte=week_start)
+
+    def get_timer():
+        statuses = (EntryStatus.ACTIVE, EntryStatus.PAUSED)
+        return entries.select_related("user").filter(status__in=statuses).order_by("-start_time").first()
+
+    def get_period_totals():
+        totals = week_entries.aggregate(
+            **{f"today_{field}": value for field, value in get_totals(start_time__gte=day_start).items()},
+            **{f"week_{field}": value for field, value in get_totals().items()},
+        )
+        return {
+            period: {field: totals[f"{period}_{field}"] for field in ("total_time", "hours", "bill")}
+            for period in ("today", "week")
+        }
+
+    def get_project_totals():
+        totals = week_entries.order_by("project__name").values("project_id", "project__name")
+        return [
+            {"project": values.pop("project__name"), **values}
+            for values in totals.annotate(**get_totals())
+        ]
+
+    def get_open_tasks():
+        return list(
+            Task.objects.select_related("project").filter(user=user).exclude(status__in=CLOSED_TASK_STATUSES)
+            .order_by("status", "id")
+        )
+
+    timer, period_totals, projects, open_tasks = run_concurrently(
+        get_timer, get_period_totals, get_project_totals, get_open_tasks
+    )
+    return {"timer": timer, **period_totals, "projects": projects, "open_tasks": open_tasks}
+
+
+def invalidate_dashboard(user_id):
+    """
+    Remove the User's cached dashboards of all shards.
+    """
+    cache.delete_many([DASHBOARD_KEY.format(user_id, shard) for shard in settings.DATABASE_SHARDS])
@@ -0,0 +1,241 @@
+"""
+Deletion of Companies, Projects and Tasks in the background, see 'DeletionJob'. Django's deletion collector loads
+every dependent Project, Task and Entry into memory to cascade a deletion, so instead the dependent objects are
+deleted in batches of 'DELETION_BATCH_SIZE' using set-based deletes, one batch per transaction, before the deleted
+object itself. Raw deletes skip signals, so their effects, such as Tombstones for sync clients, are applied per batch.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from work_tracker.apps.tracker.dashboard import invalidate_dashboard
+from work_tracker.apps.tracker.enums import DeletionStatus
+from work_tracker.apps.tracker.models import (
+    ArchivedEntry,
+    Company,
+    DeletionJob,
+    Entry,
+    Project,
+    Task,
+    TimerEvent,
+    Tombstone,
+)
+from work_tracker.apps.tracker.versions import bump_membership_generation, bump_version
+
+logger = logging.getLogger(__name__)
+
+DELETED_MODELS = {model._meta.model_name: model for model in (Company, Project, Task)}
+# Models counted towards a job's progress. Memberships and the Timer events of Entries are removed alongside them.
+COUNTED_MODELS = (Project, Task, Entry, ArchivedEntry)
+# Models whose deleted objects are listed with their owner, see 'delete_batch'.
+OWNED_MODELS = (Entry, Task, Project.users.through)
+# Lookups of the Companies, Projects and Tasks whose deletion removes the object, see 'find_deletion_job'.
+PARENT_LOOKUPS = {
+    Company: {},
+    Project: {"company": "company_id"},
+    Task: {"project": "project_id", "company": "project__company_id"},
+    Entry: {"task": "task_id", "project": "project_id", "company": "project__company_id"},
+}
+
+
+@lru_cache
+def get_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deletion")
+
+
+def get_dependents(model, object_id, using: str) -> list:
+    """
+    Return the models and querysets of the objects depending on the given Company, Project or Task, ordered so that
+    each batch only removes objects nothing else refers to.
+
+    Returns:
+        list: Tuples of model and queryset.
+    """
+    through = Project.users.through
+    projects = Project.objects.using(using).filter(**{"company_id" if model is Company else "pk": object_id})
+    if model is Task:
+        tasks = Task.objects.using(using).filter(pk=object_id)
+    else:
+        tasks = Task.objects.using(using).filter(project__in=projects)
+    dependents = [
+        (Entry, Entry.objects.using(using).filter(task__in=tasks)),
+        (ArchivedEntry, ArchivedEntry.objects.using(using).filter(task__in=tasks)),
+    ]
+    if model is not Task:
+        dependents += [(Task, tasks), (through, through.objects.using(using).filter(project__in=projects))]
+    if model is Company:
+        dependents.append((Project, projects))
+    return dependents
+
+
+def find_deletion_job(model, pk) -> DeletionJob:
+    """
+    Return the unfinished DeletionJob removing the Company, Project, Task or Entry with the given primary key, either
+    deleting the object itself or one it belongs to. The object is read from the current shard.
+
+    Returns:
+        DeletionJob: Unfinished job, or None if the object is not being deleted, does not exist or the primary key is
+            invalid.
+    """
+    try:
+        pk = UUID(str(pk))
+    except ValueError:
+        return None
+    lookups = PARENT_LOOKUPS[model]
+    objects = {model._meta.model_name: pk}
+    if lookups:
+        values = model._base_manager.filter(pk=pk).values_list(*lookups.values()).first()
+        if values is None:
+            return None
+        objects.update(zip(lookups, values))
+    condition = Q()
+    for model_name, object_id in objects.items():
+        if model_name in DELETED_MODELS:
+            condition |= Q(model=model_name, object_id=object_id)
+    return DeletionJob.objects.exclude(status=DeletionStatus.COMPLETE).filter(condition).first()
+
+
+def start_deletion(instance, user=None) -> DeletionJob:
+    """
+    Create a DeletionJob for the given Company, Project or Task, or resume its unfinished one, and run it once the
+    current transaction commits, see 'submit_deletion_job'. Concurrent deletions of the same object share one job.
+
+    Returns:
+        DeletionJob: Job deleting the object.
+    """
+    lookup = {"model": instance._meta.model_name, "object_id": instance.pk}
+    shard = instance.shard if isinstance(instance, Company) else instance._state.db
+    try:
+        # Unfinished jobs are unique per object, so concurrent deletions of the object create a single job.
+        job, _ = DeletionJob.objects.exclude(status=DeletionStatus.COMPLETE).get_or_create(
+            **lookup, defaults={"name": str(instance)[:300], "shard": shard, "user": user}
+        )
+    except IntegrityError:
+        # The job created by a concurrent deletion, which runs it, may have completed in the meantime.
+        return DeletionJob.objects.filter(**lookup).latest("created_at")
+    transaction.on_commit(lambda: submit_deletion_job(job.pk))
+    return job
+
+
+def submit_deletion_job(job_id):
+    """
+    Run the DeletionJob on a pool of 'DELETION_WORKERS' threads, or in the calling thread if it is 0.
+    """
+    if not settings.DELETION_WORKERS:
+        run_deletion_job(job_id)
+        return
+
+    def run():
+        try:
+            run_deletion_job(job_id)
+        except Exception:
+            logger.exception("Deletion job %s failed.", job_id)
+        finally:
+            # Threads of the pool are not part of a request, which closes its connections when finished.
+            close_old_connections()
+
+    get_executor(settings.DELETION_WORKERS).submit(run)
+
+
+def run_deletion_job(job_id, batch_size: int = None, stale_before: datetime = None) -> DeletionJob:
+    """
+    Claim and run the pending or failed DeletionJob, or the running one not updated since 'stale_before', e.g. after
+    its worker stopped. Jobs claimed elsewhere are left alone. Failed jobs keep their error and may be run again.
+
+    Returns:
+        DeletionJob: Finished job, or None if the job could not be claimed.
+    """
+    claimable = Q(status__in=(DeletionStatus.PENDING, DeletionStatus.FAILED))
+    if stale_before is not None:
+        claimable |= Q(status=DeletionStatus.RUNNING, modified_at__lt=stale_before)
+    jobs = DeletionJob.objects.filter(pk=job_id)
+    if not jobs.filter(claimable).update(status=DeletionStatus.RUNNING, error="", modified_at=timezone.now()):
+        return None
+
+    job = jobs.get()
+    try:
+        delete_object(job, batch_size or settings.DELETION_BATCH_SIZE)
+    except Exception as exc:
+        jobs.update(status=DeletionStatus.FAILED, error=str(exc), modified_at=timezone.now())
+        raise
+    jobs.update(status=DeletionStatus.COMPLETE, modified_at=timezone.now())
+    return jobs.get()
+
+
+def delete_object(job: DeletionJob, batch_size: int):
+    """
+    Delete the job's object, first removing its dependent objects in batches and recording progress on the job.
+    """
+    model, using = DELETED_MODELS[job.model], job.shard
+    dependents = get_dependents(model, job.object_id, using)
+    # Jobs resumed after a failure count the objects deleted before as well.
+    remaining = sum(queryset.count() for dep_model, queryset in dependents if dep_model in COUNTED_MODELS)
+    total = job.deleted + remaining + 1
+    DeletionJob.objects.filter(pk=job.pk).update(total=total, modified_at=timezone.now())
+
+    user_ids = set()
+    for dep_model, queryset in dependents:
+        fields = ("pk", "user_id") if dep_model in OWNED_MODELS else ("pk",)
+        while True:
+            with transaction.atomic(using=using), transaction.atomic():
+                batch = list(queryset.order_by().values_list(*fields)[:batch_size])
+                if not batch:
+                    break
+                delete_batch(dep_model, batch, using)
+                if dep_model in (Entry, Task):
+                    user_ids.update(user_id for _, user_id in batch)
+                if dep_model in COUNTED_MODELS:
+                    DeletionJob.objects.filter(pk=job.pk).update(
+                        deleted=F("deleted") + len(batch), modified_at=timezone.now()
+                    )
+
+    for dep_model in {dep_model for dep_model, _ in dependents} & {Project, Task, Entry}:
+        bump_version(dep_model._meta.label_lower)
+    for user_id in user_ids:
+        invalidate_dashboard(user_id)
+
+    # Nothing depends on the object anymore, as the API rejects writes to it while it is being deleted, see
+    # 'find_deletion_job', so it is deleted normally, sending its signals.
+    instance = model._base_manager.using(DEFAULT_DB_ALIAS if model is Company else using).filter(pk=job.object_id)
+    with transaction.atomic(using=using), transaction.atomic():
+        if instance.exists():
+            instance.get().delete()
+        DeletionJob.objects.filter(pk=job.pk).update(deleted=F("deleted") + 1, modified_at=timezone.now())
+
+
+def delete_batch(model, batch: list, using: str):
+    """
+    Delete the batch of objects, given as tuples of their primary key and owner, applying the effects of the signals
+    their deletion would send.
+    """
+    ids = [row[0] for row in batch]
+    if model is Entry:
+        # Timer events keep their outcome when the Entry they applied to is removed.
+        TimerEvent.objects.using(using).filter(entry_id__in=ids).update(entry=None)
+        record_tombstones(model, batch)
+    elif model in (Project, Task):
+        if model is Task:
+            TimerEvent.objects.using(using).filter(task_id__in=ids).update(task=None)
+        record_tombstones(model, [(object_id, None) for object_id in ids])
+    elif model is Project.users.through:
+        for user_id in {user_id for _, user_id in batch}:
+            bump_membership_generation(user_id)
+    model.objects.using(using).filter(pk__in=ids)._raw_delete(using)
+
+
+def record_tombstones(model, batch: list):
+    """
+    Create or refresh the Tombstones of the removed objects, given as tuples of their primary key and owner.
+    """
+    model_name = model._meta.model_name
+    Tombstone.objects.filter(model=model_name, object_id__in=[object_id for object_id, _ in batch]).delete()
+    Tombstone.objects.bulk_create(
+        [Tombstone(model=model_name, object_id=object_id, user_id=user_id) for object_id, user_id in batch]
+    )
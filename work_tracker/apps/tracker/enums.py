@@ -36,3 +36,17 @@ class EntryAction(Enum):
     PAUSE = 1
     RESUME = 2
     COMPLETE = 3
+
+
+class TimerAction(Enum):
+    START = 1
+    PAUSE = 2
+    RESUME = 3
+    COMPLETE = 4
+
+
+class DeletionStatus(Enum):
+    PENDING = 1
+    RUNNING = 2
+    COMPLETE = 3
+    FAILED = 4
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from work_tracker.apps.tracker.archive import archive_entries, get_archive_cutoff
+from work_tracker.apps.tracker.versions import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed Entries of fiscal years which ended at least 'ENTRY_ARCHIVE_RETENTION_YEARS' ago to the "
+        "archive, in batches. Meant to be scheduled after each fiscal year closes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of Entries moved per transaction.")
+        parser.add_argument("--database", action="append", help="Database to archive, all shards by default.")
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff()
+        for alias in options["database"] or settings.DATABASE_SHARDS:
+            archived = archive_entries(using=alias, cutoff=cutoff, batch_size=options["batch_size"])
+            self.stdout.write(f"{alias}: archived {archived} Entries which ended before {cutoff:%Y-%m-%d}.")
+        bump_version("tracker.entry")
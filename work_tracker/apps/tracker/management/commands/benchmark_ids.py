@@ -0,0 +1,58 @@
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from work_tracker.apps.tracker.ids import uuid7
+
+TABLE = "benchmark_ids"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the insert throughput and primary key index size of random UUIDv4 and time-ordered UUIDv7 keys, "
+        "using a temporary table shaped like the Entry table's primary key."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000, help="Number of rows inserted per key type.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of rows inserted per query.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to benchmark.")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark requires a PostgreSQL database.")
+        results = {
+            "uuid4": self.benchmark(connection, uuid4, options["rows"], options["batch_size"]),
+            "uuid7": self.benchmark(connection, uuid7, options["rows"], options["batch_size"]),
+        }
+        for name, (rate, index_size) in results.items():
+            self.stdout.write(f"{name}: {rate:.0f} rows/s, primary key index of {index_size / 1024 ** 2:.1f}MB")
+        speedup = results["uuid7"][0] / results["uuid4"][0]
+        self.stdout.write(self.style.SUCCESS(f"uuid7 inserts {speedup:.2f}x as fast as uuid4"))
+
+    @staticmethod
+    def benchmark(connection, generate, rows: int, batch_size: int) -> tuple:
+        """
+        Insert the given number of rows keyed by the generator into a temporary table, one transaction per batch.
+
+        Returns:
+            tuple: Rows inserted per second and size of the primary key index, in bytes.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {TABLE} (id uuid PRIMARY KEY, created_at timestamptz DEFAULT now())"
+            )
+            start = perf_counter()
+            for offset in range(0, rows, batch_size):
+                ids = [(generate(),) for _ in range(min(batch_size, rows - offset))]
+                with transaction.atomic(using=connection.alias):
+                    cursor.executemany(f"INSERT INTO {TABLE} (id) VALUES (%s)", ids)
+            elapsed = perf_counter() - start
+            cursor.execute(f"SELECT pg_relation_size('{TABLE}_pkey')")
+            index_size = cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {TABLE}")
+        return rows / elapsed, index_size
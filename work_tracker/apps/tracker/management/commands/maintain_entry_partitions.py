@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from work_tracker.apps.tracker.partitions import is_partitioned, maintain_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the Entry partitions of the current and upcoming months, and BRIN indexes on partitions of past "
+        "months. Meant to be scheduled at least monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=3, help="Number of upcoming months to create.")
+        parser.add_argument(
+            "--brin-after", type=int, default=1, help="Number of months after which partitions get a BRIN index."
+        )
+        parser.add_argument("--database", action="append", help="Database to maintain, all shards by default.")
+
+    def handle(self, *args, **options):
+        for alias in options["database"] or settings.DATABASE_SHARDS:
+            connection = connections[alias]
+            if not is_partitioned(connection):
+                self.stdout.write(f"{alias}: Entries are not partitioned, skipping.")
+                continue
+            with transaction.atomic(using=alias):
+                result = maintain_partitions(
+                    connection, months_ahead=options["months_ahead"], brin_after=options["brin_after"]
+                )
+            self.stdout.write(
+                f"{alias}: created {', '.join(result['created']) or 'no partitions'}, "
+                f"{len(result['indexed'])} partitions BRIN indexed."
+            )
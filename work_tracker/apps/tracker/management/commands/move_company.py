@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from work_tracker.apps.routers import replicate_to_shards
+from work_tracker.apps.tracker.models import ArchivedEntry, Company, Entry, Project, Task, TimerEvent
+from work_tracker.apps.tracker.versions import bump_version
+from work_tracker.apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a Company's Projects, Tasks and Entries to another shard while the Company remains in use. Data is "
+        "copied without locks, after which writes to the Company are blocked briefly to copy remaining changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("company", help="Id of the Company to move.")
+        parser.add_argument("shard", help="Database alias of the target shard.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of objects copied per query.")
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(pk=options["company"])
+        except (Company.DoesNotExist, ValueError):
+            raise CommandError(f"Company '{options['company']}' does not exist.")
+        source, target = company.shard, options["shard"]
+        if target not in settings.DATABASE_SHARDS:
+            raise CommandError(f"'{target}' is not a shard, choose one of: {', '.join(settings.DATABASE_SHARDS)}.")
+        if source == target:
+            raise CommandError(f"Company '{company}' is already stored on '{target}'.")
+        self.batch_size = options["batch_size"]
+
+        # Global objects saved before the target shard was added may lack a copy on it.
+        querysets = dict(self.get_querysets(company, source))
+        user_ids = set(querysets[Task].values_list("user_id", flat=True))
+        user_ids |= set(querysets[Project.users.through].values_list("user_id", flat=True))
+        user_ids |= set(querysets[TimerEvent].values_list("user_id", flat=True))
+        for obj in [company, *User.objects.filter(pk__in=user_ids)]:
+            replicate_to_shards(obj)
+
+        # Copy all data, while the Company remains in use on the source shard. Rows are stamped with 'modified_at'
+        # before their transaction commits, so changes are copied again from 'SYNC_WINDOW_SECONDS' before the copy.
+        window = timedelta(seconds=settings.SYNC_WINDOW_SECONDS)
+        started_at = timezone.now() - window
+        for model, queryset in self.get_querysets(company, source):
+            self.copy(model, queryset, target)
+        self.stdout.write(f"Copied '{company}' to '{target}', copying remaining changes.")
+
+        # Block writes to the Company's data on the source shard, copy the changes made in the meantime and switch the
+        # Company over. The target's copy commits first, then the switch, and the source's locks are released last.
+        with transaction.atomic(using=source), transaction.atomic(), transaction.atomic(using=target):
+            locked_at = timezone.now() - window
+            self.lock(company, source)
+            for model, queryset in reversed(self.get_querysets(company, source)):
+                self.remove_deleted(model, queryset, target)
+            for model, queryset in self.get_querysets(company, source):
+                if model is ArchivedEntry:
+                    queryset = queryset.filter(archived_at__gte=started_at)
+                elif model is not Project.users.through:
+                    queryset = queryset.filter(modified_at__gte=started_at)
+                self.copy(model, queryset, target)
+            company.shard = target
+            company.save(update_fields=("shard", "modified_at"))
+
+        # Writes blocked by the locks, or routed using the old shard by code other than the API, may still reach the
+        # source shard. They are copied over, unless the target's copy is newer, before the source data is removed.
+        with transaction.atomic(using=source), transaction.atomic(using=target):
+            self.lock(company, source)
+            for model, queryset in self.get_querysets(company, source):
+                self.copy_late(model, queryset, target, since=locked_at)
+            # Remove the data from the source shard, starting with the most dependent objects. Raw deletes skip
+            # signals, which would record the moved objects as removed.
+            for model, queryset in reversed(self.get_querysets(company, source)):
+                queryset._raw_delete(source)
+        for label in ("tracker.project", "tracker.task", "tracker.entry"):
+            bump_version(label)
+        self.stdout.write(self.style.SUCCESS(f"Moved '{company}' from '{source}' to '{target}'."))
+
+    def lock(self, company: Company, source: str):
+        """
+        Lock the Company's copy and rows on the source shard until the current transaction ends. Locking the copy
+        waits for the API writes in progress and blocks further ones, see 'lock_company_shard'. Locking the rows blocks
+        other writes to them, as well as inserts referring to them through foreign keys. Other Companies on the source
+        shard remain writable.
+        """
+        list(Company.objects.using(source).select_for_update().filter(pk=company.pk).values_list("pk", flat=True))
+        for model, queryset in self.get_querysets(company, source):
+            list(queryset.select_for_update(of=("self",)).values_list("pk", flat=True))
+
+    @staticmethod
+    def get_querysets(company: Company, shard: str) -> list:
+        """
+        Return the models and querysets of the Company's data on the given shard, ordered by their dependencies.
+
+        Returns:
+            list: Tuples of model and queryset.
+        """
+        through = Project.users.through
+        return [
+            (Project, Project.objects.using(shard).filter(company_id=company.pk)),
+            (through, through.objects.using(shard).filter(project__company_id=company.pk)),
+            (Task, Task.objects.using(shard).filter(project__company_id=company.pk)),
+            (Entry, Entry.objects.using(shard).filter(project__company_id=company.pk)),
+            (ArchivedEntry, ArchivedEntry.objects.using(shard).filter(task__project__company_id=company.pk)),
+            # Timer events keep their Task when they failed or their Entry was removed.
+            (TimerEvent, TimerEvent.objects.using(shard).filter(task__project__company_id=company.pk)),
+        ]
+
+    def copy(self, model, queryset, target: str):
+        """
+        Copy the objects of the queryset to the target shard in batches, replacing existing copies.
+        """
+        if model is Project.users.through:
+            # Memberships have sequential ids, so they are replaced as a whole and get new ids on the target shard.
+            memberships = [model(project_id=obj.project_id, user_id=obj.user_id) for obj in queryset]
+            with transaction.atomic(using=target):
+                queryset.using(target)._raw_delete(target)
+                model.objects.using(target).bulk_create(memberships, batch_size=self.batch_size)
+            return
+        batch = []
+        for obj in queryset.order_by("pk").iterator(chunk_size=self.batch_size):
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                self.write(model, batch, target)
+                batch = []
+        if batch:
+            self.write(model, batch, target)
+
+    @staticmethod
+    def write(model, batch: list, target: str):
+        # Replaced objects may be referenced by others, which foreign key constraints only check on commit.
+        with transaction.atomic(using=target):
+            model.objects.using(target).filter(pk__in=[obj.pk for obj in batch])._raw_delete(target)
+            model.objects.using(target).bulk_create(batch)
+
+    def copy_late(self, model, queryset, target: str, since):
+        """
+        Copy the objects of the queryset changed on the source shard since the given time to the target shard, unless
+        their copy on the target shard changed later. Memberships carry no modification time and are not copied.
+        """
+        if model is Project.users.through:
+            return
+        field = "archived_at" if model is ArchivedEntry else "modified_at"
+        late = list(queryset.filter(**{f"{field}__gte": since}))
+        copied = dict(model.objects.using(target).filter(pk__in=[obj.pk for obj in late]).values_list("pk", field))
+        batch = [obj for obj in late if obj.pk not in copied or copied[obj.pk] < getattr(obj, field)]
+        if batch:
+            self.write(model, batch, target)
+
+    @staticmethod
+    def remove_deleted(model, queryset, target: str):
+        """
+        Remove copies of objects which were deleted from the source shard after being copied.
+        """
+        if model is Project.users.through:
+            return
+        source_ids = set(queryset.values_list("pk", flat=True))
+        copied_ids = set(queryset.using(target).values_list("pk", flat=True))
+        model.objects.using(target).filter(pk__in=copied_ids - source_ids)._raw_delete(target)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from work_tracker.apps.tracker.deletion import run_deletion_job
+from work_tracker.apps.tracker.enums import DeletionStatus
+from work_tracker.apps.tracker.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the unfinished deletions of Companies, Projects and Tasks, such as failed ones or those interrupted by a "
+        "restart. Deletions running elsewhere are skipped unless their progress stalled for '--stale' seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.DELETION_BATCH_SIZE,
+            help="Number of dependent objects removed per transaction.",
+        )
+        parser.add_argument(
+            "--stale", type=int, default=600, help="Seconds after which running deletions are considered interrupted."
+        )
+
+    def handle(self, *args, **options):
+        stale_before = timezone.now() - timedelta(seconds=options["stale"])
+        jobs = DeletionJob.objects.exclude(status=DeletionStatus.COMPLETE).order_by("created_at")
+        for job_id in jobs.values_list("id", flat=True):
+            try:
+                job = run_deletion_job(job_id, batch_size=options["batch_size"], stale_before=stale_before)
+            except Exception as exc:
+                self.stderr.write(f"Deletion job {job_id} failed: {exc}")
+                continue
+            if job is None:
+                self.stdout.write(f"Deletion job {job_id} is running elsewhere, skipped.")
+            else:
+                self.stdout.write(f"{job}: deleted {job.deleted} of {job.total} objects.")
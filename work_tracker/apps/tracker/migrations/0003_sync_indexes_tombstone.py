@@ -0,0 +1,61 @@
+# Generated by Django 4.0.10 on 2026-10-19 08:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('created_at', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False)),
+                ('modified_at', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.UUIDField()),
+            ],
+            options={
+                'ordering': ('modified_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['modified_at', 'id'], name='tracker_company_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['modified_at', 'id'], name='tracker_entry_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['modified_at', 'id'], name='tracker_project_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['modified_at', 'id'], name='tracker_task_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['modified_at', 'id'], name='tracker_tombstone_sync_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tombstone',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='tracker_tombstone_unique'),
+        ),
+    ]
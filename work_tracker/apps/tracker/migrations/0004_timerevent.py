@@ -0,0 +1,43 @@
+# Generated by Django 4.0.10 on 2026-10-19 08:49
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import enumfields.fields
+import model_utils.fields
+import uuid
+import work_tracker.apps.tracker.enums
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0003_sync_indexes_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimerEvent',
+            fields=[
+                ('created_at', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False)),
+                ('modified_at', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('key', models.UUIDField()),
+                ('action', enumfields.fields.EnumIntegerField(enum=work_tracker.apps.tracker.enums.TimerAction)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('result', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timer_events', to='tracker.entry')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timer_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('created_at',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timerevent',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='tracker_timerevent_unique_key'),
+        ),
+    ]
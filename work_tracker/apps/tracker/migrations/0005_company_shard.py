@@ -0,0 +1,41 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0004_timerevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='shard',
+            field=models.CharField(db_index=True, default='default', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='company',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='tracker.company'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='users',
+            field=models.ManyToManyField(db_constraint=False, related_name='projects', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='timerevent',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='timer_events', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from work_tracker.apps.tracker.partitions import is_partitioned, partition_table, unpartition_table
+
+
+def partition_entries(apps, schema_editor):
+    # Partitioning is only supported on PostgreSQL, other databases keep a regular Entry table.
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql" and not is_partitioned(connection):
+        partition_table(connection)
+
+
+def unpartition_entries(apps, schema_editor):
+    connection = schema_editor.connection
+    if is_partitioned(connection):
+        unpartition_table(connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_company_shard'),
+    ]
+
+    # The partitioned Entry table's primary key is (id, start_time), so Entry ids are no longer unique in the
+    # database and may not be referenced by foreign key constraints. The constraint of 'TimerEvent.entry' is dropped,
+    # and 'Entry.save' keeps ids unique instead, see 'partitions'.
+    operations = [
+        migrations.AlterField(
+            model_name='timerevent',
+            name='entry',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timer_events', to='tracker.entry'),
+        ),
+        migrations.RunPython(partition_entries, unpartition_entries),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_partition_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEntry',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('comment', models.TextField(blank=True)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('total_time', models.PositiveIntegerField()),
+                ('hours', models.DecimalField(decimal_places=6, max_digits=10)),
+                ('bill', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False)),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_entries', to='tracker.task')),
+            ],
+            options={
+                'verbose_name_plural': 'Archived entries',
+                'ordering': ('start_time',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedentry',
+            index=models.Index(fields=['task', 'start_time'], name='tracker_archivedentry_task_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:16
+
+from django.db import migrations, models
+import work_tracker.apps.tracker.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_archivedentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entry',
+            name='id',
+            field=models.UUIDField(default=work_tracker.apps.tracker.ids.time_ordered_id, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='id',
+            field=models.UUIDField(default=work_tracker.apps.tracker.ids.time_ordered_id, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_entry_owner(apps, schema_editor):
+    # Copy the owner and Project of each Entry's Task, in a single UPDATE per table.
+    Task = apps.get_model("tracker", "Task")
+    tasks = Task.objects.using(schema_editor.connection.alias).filter(pk=OuterRef("task_id"))
+    for model_name, fields in (("Entry", ("user_id", "project_id")), ("ArchivedEntry", ("user_id",))):
+        model = apps.get_model("tracker", model_name)
+        values = {field: Subquery(tasks.values(field)[:1]) for field in fields}
+        model.objects.using(schema_editor.connection.alias).filter(user__isnull=True).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_entry_owner'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_entry_owner, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import enumfields.fields
+import model_utils.fields
+import uuid
+import work_tracker.apps.tracker.enums
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0013_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('created_at', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False)),
+                ('modified_at', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.UUIDField()),
+                ('name', models.CharField(max_length=300)),
+                ('shard', models.CharField(default='default', max_length=50)),
+                ('status', enumfields.fields.EnumIntegerField(default=1, enum=work_tracker.apps.tracker.enums.DeletionStatus)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deletionjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', work_tracker.apps.tracker.enums.DeletionStatus['COMPLETE']), _negated=True), fields=('model', 'object_id'), name='tracker_deletionjob_unique_unfinished'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.0.10 on 2026-10-19 10:50
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_task(apps, schema_editor):
+    # Copy the Task of each Timer event's Entry, in a single UPDATE.
+    Entry = apps.get_model("tracker", "Entry")
+    TimerEvent = apps.get_model("tracker", "TimerEvent")
+    entries = Entry.objects.using(schema_editor.connection.alias).filter(pk=OuterRef("entry_id"))
+    TimerEvent.objects.using(schema_editor.connection.alias).filter(entry__isnull=False).update(
+        task_id=Subquery(entries.values("task_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_deletionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timerevent',
+            name='task',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timer_events', to='tracker.task'),
+        ),
+        migrations.RunPython(backfill_task, migrations.RunPython.noop),
+    ]
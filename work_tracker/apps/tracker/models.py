@@ -1,20 +1,37 @@
 from uuid import uuid4
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections, models, router, transaction
 from enumfields import EnumIntegerField
+from model_utils.fields import AutoCreatedField
 
-from work_tracker.apps.tracker.enums import EntryStatus, TaskStatus, TaskType
+from work_tracker.apps.tracker.enums import DeletionStatus, EntryStatus, TaskStatus, TaskType, TimerAction
+from work_tracker.apps.tracker.ids import time_ordered_id
+from work_tracker.apps.tracker.partitions import lock_entry_id
 from work_tracker.apps.users.models import AmountField, TimeStampedModel, User
 
+# Text search configuration of the search vectors. Searches must use the same vectors and configuration to be served
+# by the GIN indexes built from them, which PostgreSQL keeps up to date on every write.
+SEARCH_CONFIG = "english"
+TASK_SEARCH_VECTOR = SearchVector("code", "name", weight="A", config=SEARCH_CONFIG) + SearchVector(
+    "description", weight="B", config=SEARCH_CONFIG
+)
+ENTRY_SEARCH_VECTOR = SearchVector("comment", config=SEARCH_CONFIG)
+
 
 class Company(TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid4)
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True)
+    # Database alias storing the Company's Projects, Tasks and Entries, see 'DATABASE_SHARDS'.
+    shard = models.CharField(max_length=50, default="default", db_index=True)
 
     class Meta:
         ordering = ("name",)
         verbose_name_plural = "Companies"
+        indexes = (models.Index(fields=("modified_at", "id"), name="tracker_company_sync_idx"),)
 
     def __str__(self):
         return self.name
@@ -22,22 +39,25 @@ class Company(TimeStampedModel):
 
 class Project(TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid4)
-    users = models.ManyToManyField(User, related_name="projects")
-    company = models.ForeignKey(Company, related_name="projects", on_delete=models.CASCADE)
+    # Projects are stored on their Company's shard, which holds no User or Company tables.
+    users = models.ManyToManyField(User, related_name="projects", db_constraint=False)
+    company = models.ForeignKey(Company, related_name="projects", on_delete=models.CASCADE, db_constraint=False)
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True)
 
     class Meta:
         ordering = ("name",)
+        indexes = (models.Index(fields=("modified_at", "id"), name="tracker_project_sync_idx"),)
 
     def __str__(self):
         return self.name
 
 
 class Task(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4)
-    user = models.ForeignKey(User, related_name="tasks", on_delete=models.PROTECT)
-    project = models.ForeignKey(Project, related_name="tasks", on_delete=models.CASCADE)
+    id = models.UUIDField(primary_key=True, default=time_ordered_id)
+    # Both are indexed by the composite indexes below, which also serve the list filters and ordering.
+    user = models.ForeignKey(User, related_name="tasks", on_delete=models.PROTECT, db_constraint=False, db_index=False)
+    project = models.ForeignKey(Project, related_name="tasks", on_delete=models.CASCADE, db_index=False)
     name = models.CharField(max_length=150)
     code = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -46,14 +66,46 @@ class Task(TimeStampedModel):
 
     class Meta:
         ordering = ("status",)
+        indexes = (
+            models.Index(fields=("modified_at", "id"), name="tracker_task_sync_idx"),
+            models.Index(fields=("project", "status"), name="tracker_task_project_idx"),
+            models.Index(fields=("user", "status"), name="tracker_task_user_idx"),
+            models.Index(fields=("type", "status"), name="tracker_task_type_idx"),
+            models.Index(fields=("status", "id"), name="tracker_task_status_idx"),
+            models.Index(fields=("code",), name="tracker_task_code_idx"),
+            GinIndex(TASK_SEARCH_VECTOR, name="tracker_task_search_idx"),
+        )
 
     def __str__(self):
         return f"{self.code} | {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        task.stored_user_id = task.__dict__.get("user_id")
+        task.stored_project_id = task.__dict__.get("project_id")
+        return task
+
+    def save(self, *args, **kwargs):
+        # Previous owner of a reassigned Task, see 'entry_task_changed'.
+        stored_user_id = getattr(self, "stored_user_id", None)
+        self.moved_from_user_id = stored_user_id if stored_user_id not in (None, self.user_id) else None
+        # Whether the Task's Entries need the new owner or Project, see 'task_saved'. Tasks whose stored owner or
+        # Project is unknown are assumed to be reassigned.
+        stored = (stored_user_id, getattr(self, "stored_project_id", None))
+        self.reassigned = None in stored or stored != (self.user_id, self.project_id)
+        super().save(*args, **kwargs)
+        self.stored_user_id, self.stored_project_id = self.user_id, self.project_id
+
 
 class Entry(TimeStampedModel):
-    id = models.UUIDField(primary_key=True, default=uuid4)
+    id = models.UUIDField(primary_key=True, default=time_ordered_id)
     task = models.ForeignKey(Task, related_name="entries", on_delete=models.CASCADE)
+    # Owner and Project of the Entry's Task, copied from the Task so that Entries are filtered without joining Tasks.
+    user = models.ForeignKey(
+        User, related_name="entries", on_delete=models.PROTECT, db_constraint=False, db_index=False
+    )
+    project = models.ForeignKey(Project, related_name="entries", on_delete=models.CASCADE, db_index=False)
     comment = models.TextField(blank=True)
     start_time = models.DateTimeField()
     pause_time = models.DateTimeField(null=True)
@@ -66,9 +118,155 @@ class Entry(TimeStampedModel):
     class Meta:
         ordering = ("start_time",)
         verbose_name_plural = "Entries"
+        indexes = (
+            models.Index(fields=("modified_at", "id"), name="tracker_entry_sync_idx"),
+            models.Index(fields=("user", "created_at"), name="tracker_entry_user_idx"),
+            models.Index(fields=("user", "start_time"), name="tracker_entry_user_start_idx"),
+            models.Index(fields=("project", "start_time"), name="tracker_entry_project_idx"),
+            # Few Entries are running at a time, so they are indexed separately from completed Entries.
+            models.Index(
+                fields=("user", "status"),
+                condition=~models.Q(status=EntryStatus.COMPLETE),
+                name="tracker_entry_open_idx",
+            ),
+            GinIndex(ENTRY_SEARCH_VECTOR, name="tracker_entry_search_idx"),
+        )
 
     def __str__(self):
         return (
-            f"Entry by {self.task.user.email} for {self.task.code} created on "
+            f"Entry by {self.user.email} for {self.task.code} created on "
             f'{self.created_at.strftime("%Y-%m-%d %H:%M:%S")}'
         )
+
+    def save(self, *args, **kwargs):
+        # Copy the owner and Project of a newly assigned Task. Reassigned Tasks update their Entries in bulk instead.
+        user_id = self.user_id
+        if self.user_id is None or self.project_id is None or Entry.task.is_cached(self):
+            self.user_id, self.project_id = self.task.user_id, self.task.project_id
+        # Previous owner of an Entry moved to another User's Task, see 'entry_moved'.
+        self.moved_from_user_id = user_id if user_id not in (None, self.user_id) else None
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # The partitioned table's primary key includes 'start_time', so the uniqueness of ids is checked here, see
+        # 'partitions'. Clients may choose the ids of the Entries they start offline.
+        using = kwargs.get("using") or router.db_for_write(Entry, instance=self)
+        with transaction.atomic(using=using):
+            lock_entry_id(connections[using], self.pk)
+            if Entry._base_manager.using(using).filter(pk=self.pk).exists():
+                raise IntegrityError(f"Entry '{self.pk}' already exists.")
+            super().save(*args, **kwargs)
+
+
+class ArchivedEntry(models.Model):
+    """
+    Completed Entry of a closed fiscal year, moved out of the Entry table by the 'archive_entries' command. Archived
+    Entries keep only the fields and indexes needed for reporting, so that they barely add to storage and the Entry
+    table and its indexes only hold recent Entries.
+    """
+    id = models.UUIDField(primary_key=True)
+    task = models.ForeignKey(Task, related_name="archived_entries", on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(
+        User, related_name="archived_entries", on_delete=models.PROTECT, db_constraint=False, db_index=False
+    )
+    comment = models.TextField(blank=True)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    total_time = models.PositiveIntegerField()
+    hours = models.DecimalField(max_digits=10, decimal_places=6)
+    bill = AmountField()
+    created_at = models.DateTimeField()
+    archived_at = AutoCreatedField()
+
+    class Meta:
+        ordering = ("start_time",)
+        verbose_name_plural = "Archived entries"
+        indexes = (
+            models.Index(fields=("task", "start_time"), name="tracker_archivedentry_task_idx"),
+            models.Index(fields=("user", "start_time"), name="tracker_archivedentry_user_idx"),
+        )
+
+    def __str__(self):
+        return f"Archived entry for {self.task.code} started on {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+class TimerEvent(TimeStampedModel):
+    """
+    Timer event recorded by an offline client and replayed against its Entries. The outcome of applying the event is
+    stored under the client-generated key, so that uploading the same event again returns the stored outcome.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4)
+    user = models.ForeignKey(User, related_name="timer_events", on_delete=models.CASCADE, db_constraint=False)
+    key = models.UUIDField()
+    action = EnumIntegerField(TimerAction)
+    # Entries are partitioned on PostgreSQL, where their primary key is (id, start_time), so the Entry is not
+    # referenced by a foreign key constraint, see 'partitions'.
+    entry = models.ForeignKey(
+        Entry, related_name="timer_events", null=True, blank=True, on_delete=models.SET_NULL, db_constraint=False
+    )
+    # Task the event applied to, kept when the event failed or its Entry was removed, so that the event stays with the
+    # Task's Company, see 'move_company'.
+    task = models.ForeignKey(
+        Task, related_name="timer_events", null=True, blank=True, on_delete=models.SET_NULL, db_constraint=False
+    )
+    status_code = models.PositiveSmallIntegerField()
+    result = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ("created_at",)
+        constraints = (models.UniqueConstraint(fields=("user", "key"), name="tracker_timerevent_unique_key"),)
+
+    def __str__(self):
+        return f"{self.action.name} event {self.key} by {self.user.email}"
+
+
+class Tombstone(TimeStampedModel):
+    """
+    Record of a removed object, allowing sync clients to drop their local copy. Tombstones are ordered by the same
+    (modified_at, id) cursor as the objects they replace.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4)
+    model = models.CharField(max_length=50)
+    object_id = models.UUIDField()
+    # Owner of the removed object, for feeds scoped to the requesting User. Empty for objects visible to all Users.
+    user = models.ForeignKey(User, related_name="+", null=True, blank=True, on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ("modified_at", "id")
+        indexes = (models.Index(fields=("modified_at", "id"), name="tracker_tombstone_sync_idx"),)
+        constraints = (models.UniqueConstraint(fields=("model", "object_id"), name="tracker_tombstone_unique"),)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} removed on {self.modified_at.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+class DeletionJob(TimeStampedModel):
+    """
+    Deletion of a Company, Project or Task together with everything depending on it, run in the background by
+    'run_deletion_job'. Dependent objects are deleted in batches, with 'deleted' out of 'total' reporting progress.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4)
+    model = models.CharField(max_length=50)
+    object_id = models.UUIDField()
+    name = models.CharField(max_length=300)
+    # Database alias storing the object and its dependent objects, see 'Company.shard'.
+    shard = models.CharField(max_length=50, default="default")
+    status = EnumIntegerField(DeletionStatus, default=DeletionStatus.PENDING)
+    total = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    user = models.ForeignKey(User, related_name="+", null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        ordering = ("-created_at",)
+        constraints = (
+            # An object has at most one unfinished deletion, which failed deletions resume.
+            models.UniqueConstraint(
+                fields=("model", "object_id"),
+                condition=~models.Q(status=DeletionStatus.COMPLETE),
+                name="tracker_deletionjob_unique_unfinished",
+            ),
+        )
+
+    def __str__(self):
+        return f"Deletion of {self.model} {self.name}"
@@ -0,0 +1,230 @@
+"""
+Monthly range partitioning of the Entry table on 'start_time', PostgreSQL only.
+
+The partitioned table's primary key is (id, start_time), as it must include the partition key. As a result:
+
+- Entry ids alone are not unique in the database. 'Entry.save' keeps them unique instead, checking the id is unused
+  while holding 'lock_entry_id'. Bulk inserts bypass the check and must only write unused or just removed ids.
+- Entry ids cannot be referenced by foreign key constraints, so 'TimerEvent.entry' has none. Django's deletion
+  collector and 'deletion.delete_batch' clear the Timer events of removed Entries instead.
+
+Entries outside the range of all monthly partitions are stored in the default partition, until a partition for their
+month is created.
+"""
+from datetime import date, datetime, time
+
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils import timezone
+
+TABLE = "tracker_entry"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Return the first day of the month the given number of months after the given month.
+
+    Returns:
+        date: First day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(month: date) -> datetime:
+    return timezone.make_aware(datetime.combine(month, time.min), timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def lock_entry_id(connection: BaseDatabaseWrapper, entry_id):
+    """
+    Lock the given Entry id until the current transaction ends, so that concurrent inserts of the id are serialised
+    and the later one sees the earlier one's Entry. PostgreSQL only, other databases enforce the id's uniqueness.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [f"{TABLE}:{entry_id}"])
+
+
+def is_partitioned(connection: BaseDatabaseWrapper) -> bool:
+    """
+    Return whether the Entry table of the given database is partitioned.
+
+    Returns:
+        bool: True if the table is partitioned.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid WHERE relname = %s", [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partitions(connection: BaseDatabaseWrapper) -> list:
+    """
+    Return the monthly partitions of the Entry table, excluding the default partition.
+
+    Returns:
+        list: Tuples of partition name and first day of the partition's month, ordered by month.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class parent ON parent.oid = inhparent "
+            "JOIN pg_class child ON child.oid = inhrelid WHERE parent.relname = %s AND child.relname LIKE %s",
+            [TABLE, f"{TABLE}\\_p%"],
+        )
+        names = sorted(row[0] for row in cursor.fetchall())
+    return [(name, date(int(name[-6:-2]), int(name[-2:]), 1)) for name in names]
+
+
+def create_partition(connection: BaseDatabaseWrapper, month: date) -> bool:
+    """
+    Create the partition storing the Entries starting in the given month, moving matching Entries out of the default
+    partition.
+
+    Returns:
+        bool: True if the partition was created, False if it already existed.
+    """
+    name = partition_name(month)
+    if name in dict(get_partitions(connection)):
+        return False
+    start, end = month_start(month), month_start(add_months(month, 1))
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # Entries of the new partition's month may not remain in the default partition when it is attached.
+        cursor.execute(f"CREATE TABLE {quote(name)} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE start_time >= %s AND start_time < %s RETURNING *) "
+            f"INSERT INTO {quote(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)", [start, end]
+        )
+    return True
+
+
+def create_brin_index(connection: BaseDatabaseWrapper, name: str):
+    """
+    Index the given partition's 'start_time' using a BRIN index. Partitions of past months are append-only in
+    practice, so their rows are physically ordered by 'start_time' and a few pages of BRIN index replace a B-tree.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote(name + '_start_brin')} ON {quote(name)} USING brin (start_time)"
+        )
+
+
+def maintain_partitions(connection: BaseDatabaseWrapper, months_ahead: int = 3, brin_after: int = 1) -> dict:
+    """
+    Create the partitions of the current and upcoming months, and BRIN indexes on the partitions of months ended more
+    than 'brin_after' months ago.
+
+    Returns:
+        dict: Names of the partitions created and indexed.
+    """
+    current = timezone.now().date().replace(day=1)
+    created = [
+        partition_name(add_months(current, offset))
+        for offset in range(months_ahead + 1)
+        if create_partition(connection, add_months(current, offset))
+    ]
+    indexed = []
+    for name, month in get_partitions(connection):
+        if add_months(month, 1 + brin_after) <= current:
+            create_brin_index(connection, name)
+            indexed.append(name)
+    return {"created": created, "indexed": indexed}
+
+
+def get_table_definition(connection: BaseDatabaseWrapper, table: str) -> tuple:
+    """
+    Return the statements recreating the indexes and foreign keys of the given table, other than its primary key.
+
+    Returns:
+        tuple: Index definitions and foreign key constraints, as tuples of name and definition.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [table])
+        indexes = [(name, definition) for name, definition in cursor.fetchall() if not name.endswith("_pkey")]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        return indexes, cursor.fetchall()
+
+
+def restore_table_definition(connection: BaseDatabaseWrapper, table: str, old: str, indexes: list, foreign_keys: list):
+    """
+    Recreate the indexes and foreign keys of the renamed table 'old' on 'table', see 'get_table_definition'.
+    """
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for _, definition in indexes:
+            for prefix in (" ON ONLY public.", " ON public.", " ON "):
+                definition = definition.replace(f"{prefix}{old} ", f" ON {table} ")
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}")
+
+
+def partition_table(connection: BaseDatabaseWrapper, months_ahead: int = 3):
+    """
+    Convert the Entry table to a partitioned table, keeping its data, indexes and foreign keys.
+    """
+    old = f"{TABLE}_unpartitioned"
+    with connection.cursor() as cursor:
+        # Deferred foreign key checks of rows written earlier in the transaction would prevent dropping the table.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+        cursor.execute(f"SELECT MIN(start_time) FROM {old}")
+        first = cursor.fetchone()[0]
+        indexes, foreign_keys = get_table_definition(connection, old)
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (start_time)"
+        )
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+
+    # Create the partitions of all months holding Entries before copying them.
+    month = (first or timezone.now()).astimezone(timezone.utc).date().replace(day=1)
+    current = timezone.now().date().replace(day=1)
+    while month < current:
+        create_partition(connection, month)
+        month = add_months(month, 1)
+    maintain_partitions(connection, months_ahead=months_ahead)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old}")
+        # Index and constraint names are freed by dropping the old table.
+        cursor.execute(f"DROP TABLE {old}")
+        cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, start_time)")
+    restore_table_definition(connection, TABLE, old, indexes, foreign_keys)
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+def unpartition_table(connection: BaseDatabaseWrapper):
+    """
+    Convert the partitioned Entry table back to a regular table, keeping its data, indexes and foreign keys.
+    """
+    old = f"{TABLE}_partitioned"
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+        indexes, foreign_keys = get_table_definition(connection, old)
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old}")
+        cursor.execute(f"DROP TABLE {old}")
+        cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)")
+    restore_table_definition(connection, TABLE, old, indexes, foreign_keys)
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL DEFERRED")
@@ -0,0 +1,38 @@
+"""
+Ranked full-text search over Tasks and Entry comments, served by the GIN indexes over 'TASK_SEARCH_VECTOR' and
+'ENTRY_SEARCH_VECTOR'.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, F, QuerySet, Value
+
+from work_tracker.apps.tracker.models import ENTRY_SEARCH_VECTOR, SEARCH_CONFIG, TASK_SEARCH_VECTOR, Entry, Task
+
+RESULT_FIELDS = ("kind", "object_id", "task_pk", "project_pk", "text", "rank")
+
+
+def search(text: str, user, project_ids: set = None) -> QuerySet:
+    """
+    Return the Tasks of the given Projects and the User's own Entries matching the search text, ordered by rank.
+    Search text follows web search syntax, e.g. quoted phrases and '-' to exclude words. Staff Users pass no Project
+    ids, searching the Tasks of all Projects.
+
+    Returns:
+        QuerySet: Union of Task and Entry results, as dicts of 'RESULT_FIELDS'.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    tasks = Task.objects.annotate(search=TASK_SEARCH_VECTOR).filter(search=query)
+    if project_ids is not None:
+        tasks = tasks.filter(project_id__in=project_ids)
+    entries = Entry.objects.annotate(search=ENTRY_SEARCH_VECTOR).filter(search=query, user=user)
+
+    # Both sides of the union select the same annotations in the same order.
+    tasks = tasks.annotate(
+        kind=Value("task", output_field=CharField()), object_id=F("id"), task_pk=F("id"), project_pk=F("project_id"),
+        text=F("name"), rank=SearchRank(TASK_SEARCH_VECTOR, query),
+    )
+    entries = entries.annotate(
+        kind=Value("entry", output_field=CharField()), object_id=F("id"), task_pk=F("task_id"),
+        project_pk=F("project_id"), text=F("comment"), rank=SearchRank(ENTRY_SEARCH_VECTOR, query),
+    )
+    results = tasks.order_by().values(*RESULT_FIELDS).union(entries.order_by().values(*RESULT_FIELDS), all=True)
+    return results.order_by("-rank", "kind", "object_id")
@@ -0,0 +1,165 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from work_tracker.apps.routers import COMPANY_SHARD_KEY, remove_from_shards, replicate_to_shards
+from work_tracker.apps.tracker.dashboard import invalidate_dashboard
+from work_tracker.apps.tracker.deletion import record_tombstones
+from work_tracker.apps.tracker.models import ArchivedEntry, Company, Entry, Project, Task, Tombstone
+from work_tracker.apps.tracker.versions import bump_membership_generation, bump_version
+from work_tracker.apps.users.models import User
+
+
+def record_tombstone(instance, user_id=None):
+    """
+    Create or refresh the Tombstone of a removed object, moving it to the end of the sync feed.
+    """
+    Tombstone.objects.update_or_create(
+        model=instance._meta.model_name, object_id=instance.pk, defaults={"user_id": user_id}
+    )
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def company_changed(sender, instance, signal, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    if signal is post_save:
+        replicate_to_shards(instance)
+    else:
+        remove_from_shards(instance)
+    # The Company may have moved to another shard. Requests made before the change commits may cache the old shard, so
+    # the cached shard is removed again on commit.
+    key = COMPANY_SHARD_KEY.format(instance.pk)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(pre_delete, sender=Company)
+def company_deleting(sender, instance, **kwargs):
+    # Deletions only cascade within a database, so remove the Projects stored on the Company's shard explicitly.
+    if instance.shard != DEFAULT_DB_ALIAS:
+        Project.objects.using(instance.shard).filter(company_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+def company_project_task_deleted(sender, instance, **kwargs):
+    record_tombstone(instance)
+
+
+@receiver(post_delete, sender=Entry)
+def entry_deleted(sender, instance, **kwargs):
+    # Entries are only synced to the User owning the Entry's task.
+    record_tombstone(instance, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=Entry)
+def entry_moved(sender, instance, created, **kwargs):
+    # Entries are only synced to their owner, so the previous owner of an Entry moved to another User's Task is told to
+    # drop it.
+    if not created and getattr(instance, "moved_from_user_id", None):
+        record_tombstone(instance, user_id=instance.moved_from_user_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, using, **kwargs):
+    # Keep the owner and Project copied to the Task's Entries in sync when the Task is reassigned.
+    if created or not getattr(instance, "reassigned", True):
+        return
+    entries = Entry.objects.using(using).filter(task=instance)
+    # Entries are only synced to their owner, so the previous owner is told to drop the moved Entries.
+    moved = list(entries.exclude(user_id=instance.user_id).values_list("pk", "user_id"))
+    if moved:
+        record_tombstones(Entry, moved)
+    changed = ~Q(user_id=instance.user_id) | ~Q(project_id=instance.project_id)
+    entries.filter(changed).update(
+        user_id=instance.user_id, project_id=instance.project_id, modified_at=timezone.now()
+    )
+    ArchivedEntry.objects.using(using).filter(task=instance).exclude(user_id=instance.user_id).update(
+        user_id=instance.user_id
+    )
+
+
+@receiver(post_save, sender=Entry)
+@receiver(post_delete, sender=Entry)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def entry_task_changed(sender, instance, using, **kwargs):
+    # Reassigned Tasks and moved Entries leave the dashboard of their previous owner as well.
+    for user_id in {instance.user_id, getattr(instance, "moved_from_user_id", None)} - {None}:
+        # Requests made before the change commits may cache the outdated dashboard, so it is removed again on commit.
+        invalidate_dashboard(user_id)
+        transaction.on_commit(partial(invalidate_dashboard, user_id), using=using)
+
+
+@receiver(post_save, sender=User)
+def user_deactivated(sender, instance, **kwargs):
+    if not instance.is_active and instance.deactivated_at:
+        record_tombstone(instance)
+    else:
+        Tombstone.objects.filter(model=User._meta.model_name, object_id=instance.pk).delete()
+
+
+@receiver(m2m_changed, sender=Project.users.through)
+def project_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    membership_changed(instance, action, reverse, pk_set)
+    # Membership changes are not saved on the Project itself, so mark the affected Projects as modified.
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        projects = Project.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        projects = Project.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        projects = Project.objects.filter(users=instance)
+    else:
+        return
+    projects.update(modified_at=timezone.now())
+    bump_version(Project._meta.label_lower)
+
+
+def membership_changed(instance, action, reverse, pk_set):
+    """
+    Increment the membership generation of every User whose Projects changed, outdating their token claims.
+    """
+    if reverse and action in ("post_add", "post_remove", "pre_clear"):
+        user_ids = {instance.pk}
+    elif not reverse and action in ("post_add", "post_remove"):
+        user_ids = pk_set
+    elif not reverse and action == "pre_clear":
+        user_ids = set(instance.users.values_list("id", flat=True))
+    else:
+        return
+    for user_id in user_ids:
+        bump_membership_generation(user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    # Staff status is part of the membership claims.
+    if not created:
+        bump_membership_generation(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def reference_data_changed(sender, **kwargs):
+    # Invalidate cached responses built from the changed model.
+    bump_version(sender._meta.label_lower)
+
+
+@receiver(post_save, sender=User)
+def user_details_changed(sender, instance, created, update_fields, **kwargs):
+    # Cached Project responses only include the id, email and name of their members, see 'ProjectDetailSerializer'.
+    # New Users are not members of any Project yet, and logins only update 'last_login'.
+    if created or update_fields is not None and not {"email", "name"}.intersection(update_fields):
+        return
+    if getattr(instance, "details_changed", True):
+        bump_version(sender._meta.label_lower)
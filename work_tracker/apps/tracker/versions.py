@@ -0,0 +1,113 @@
+from time import time_ns
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+VERSION_KEY = "model-version:{}"
+MODIFIED_KEY = "model-modified:{}"
+MEMBERSHIP_KEY = "membership-generation:{}"
+
+
+def get_versions(*labels: str) -> dict:
+    """
+    Return the current version counter of each of the given models, identified by their lowercase model label.
+    Counters missing from the cache are initialised to the current time, so that they can never fall back to a version
+    which has been used before.
+
+    Returns:
+        dict: Version counter per model label.
+    """
+    keys = {label: VERSION_KEY.format(label) for label in labels}
+    versions = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in versions:
+            cache.add(key, time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return {label: versions[key] for label, key in keys.items()}
+
+
+def get_last_modified(*labels: str):
+    """
+    Return the latest time at which any of the given models changed. Times missing from the cache are initialised
+    from the models' latest 'modified_at' value.
+
+    Returns:
+        datetime: Time of the latest change, or None if none of the models have any objects.
+    """
+    keys = {label: MODIFIED_KEY.format(label) for label in labels}
+    modified = cache.get_many(keys.values())
+    for label, key in keys.items():
+        if key not in modified:
+            model = apps.get_model(label)
+            modified[key] = model.objects.aggregate(modified_at=Max("modified_at"))["modified_at"]
+            cache.add(key, modified[key], timeout=None)
+    return max((value for value in modified.values() if value), default=None)
+
+
+def _increment(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time_ns(), timeout=None)
+
+
+def bump_version(label: str):
+    """
+    Increment the version counter of the given model, invalidating everything cached under its version.
+
+    The counter is incremented again once the current transaction commits, as requests reading between both
+    increments may still have cached the data preceding the change under the first incremented version.
+    """
+    key = VERSION_KEY.format(label)
+    _increment(key)
+    cache.set(MODIFIED_KEY.format(label), timezone.now(), timeout=None)
+    transaction.on_commit(lambda: _increment(key))
+
+
+def get_membership_generation(user_id) -> int:
+    """
+    Return the User's membership generation, which changes every time the User's Project memberships or staff status
+    change. Generations are counters of their own rather than model versions, as nothing reads their modification
+    time.
+
+    Returns:
+        int: Membership generation of the User.
+    """
+    key = MEMBERSHIP_KEY.format(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Missing generations start at the current time, never falling back to one issued before.
+        cache.add(key, time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_membership_generation(user_id):
+    """
+    Increment the User's membership generation, marking membership claims issued to the User so far as outdated. The
+    generation is incremented again once the current transaction commits, see 'bump_version'.
+    """
+    key = MEMBERSHIP_KEY.format(user_id)
+    _increment(key)
+    transaction.on_commit(lambda: _increment(key))
+
+
+def get_user_version(user_id) -> int:
+    """
+    Return the version of the User's stored data, which changes every time the User is saved or deleted.
+
+    Returns:
+        int: Version of the User.
+    """
+    label = f"user:{user_id}"
+    return get_versions(label)[label]
+
+
+def bump_user_version(user_id):
+    """
+    Increment the version of the User's stored data, invalidating all cached copies of the User.
+    """
+    bump_version(f"user:{user_id}")
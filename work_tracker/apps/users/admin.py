@@ -4,7 +4,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from work_tracker.apps.users.forms import UserAdminChangeForm, UserAdminCreateForm
-from work_tracker.apps.users.models import User
+from work_tracker.apps.users.models import TokenRevocation, User
 
 
 @admin.register(User)
@@ -32,6 +32,7 @@ class UserAdmin(auth_admin.UserAdmin):
         obj.deactivated_at = timezone.now()
         obj.is_active = False
         obj.save()
+        TokenRevocation.objects.revoke(obj)
 
     def delete_queryset(self, request, queryset):
         for obj in queryset:
@@ -4,6 +4,7 @@ from uuid import uuid4
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from model_utils.fields import AutoCreatedField, AutoLastModifiedField
 
@@ -76,9 +77,19 @@ class User(AbstractEmailUser, TimeStampedModel):
 
     REQUIRED_FIELDS = []
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.stored_details = (user.__dict__.get("email"), user.__dict__.get("name"))
+        return user
+
     def save(self, **kwargs):
         self.name = " ".join(map(str, [self.first_name, self.last_name])).strip()
-        return super().save(**kwargs)
+        # Whether the details other models' responses include have changed, see 'user_details_changed'. Users whose
+        # stored details are unknown are assumed to have changed.
+        self.details_changed = getattr(self, "stored_details", None) != (self.email, self.name)
+        super().save(**kwargs)
+        self.stored_details = (self.email, self.name)
 
     def get_short_name(self) -> str:
         """
@@ -97,3 +108,30 @@ class User(AbstractEmailUser, TimeStampedModel):
             str: User full name.
         """
         return self.name or self.email
+
+
+class TokenRevocationManager(models.Manager):
+    def revoke(self, user):
+        """
+        Revoke all tokens issued to the User so far.
+        """
+        revocation, _ = self.update_or_create(user=user, defaults={"revoked_at": timezone.now()})
+        return revocation
+
+
+class TokenRevocation(TimeStampedModel):
+    """
+    Revocation of all JWT tokens issued to a User before 'revoked_at', e.g. when the User is deactivated or changes
+    their password.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid4)
+    user = models.OneToOneField(User, related_name="token_revocation", on_delete=models.CASCADE)
+    revoked_at = models.DateTimeField()
+
+    objects = TokenRevocationManager()
+
+    class Meta:
+        indexes = (models.Index(fields=("modified_at",), name="users_tokenrevocation_mod_idx"),)
+
+    def __str__(self):
+        return f"{self.user} - {self.revoked_at}"
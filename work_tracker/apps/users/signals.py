@@ -0,0 +1,33 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from work_tracker.apps.routers import remove_from_shards, replicate_to_shards
+from work_tracker.apps.tracker.versions import bump_user_version, bump_version
+from work_tracker.apps.users.models import TokenRevocation, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Invalidate copies of the User cached for request authentication.
+    bump_user_version(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def replicate_user(sender, instance, using, **kwargs):
+    # Users are global, with a copy on every shard for queries joining them.
+    if using == DEFAULT_DB_ALIAS:
+        replicate_to_shards(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        remove_from_shards(instance)
+
+
+@receiver(post_save, sender=TokenRevocation)
+def tokens_revoked(sender, instance, **kwargs):
+    # Trigger a refresh of every process' revocation list.
+    bump_version(sender._meta.label_lower)